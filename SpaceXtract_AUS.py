@@ -1,7 +1,5 @@
-import io,json,os
+import io,json,os,uuid
 import pathlib
-from docx import Document
-from docx.shared import Inches,Mm,Pt
 import datetime
 from pathlib import Path
 import pandas as pd
@@ -10,14 +8,21 @@ import math
 import numpy as np
 import plotly.graph_objects as go
 
-import honeybee_ies as hb2ies
 from honeybee.model import Model as HBModel
-from ladybug_geometry.geometry2d.pointvector import Vector2D
-from honeybee_vtk.model import Model as VTKModel
 
 from pollination_streamlit_viewer import viewer
 from pollination_streamlit_io import get_hbjson
 
+from model_cache import AdjacencyCache, ModelCache, VTKJSCache
+from workers import SCRATCH_ROOT, SessionScratch, WorkerPool, remove_stale_sessions
+from exports import EXPORT_TYPES, ExportJobs
+from envelope import SECTOR_NAMES, envelope_from_table, facade_sectors, orientation_sweep, relative_compactness
+import ncc19
+from charts import ncc19_charts
+from instrumentation import StageRecorder, stage
+from profiling import PROFILE_RUNS, RunProfiler
+from report import ReportDetails, ncc19_report, orientation_rows
+
 
 import streamlit as st
 
@@ -39,7 +44,7 @@ with st.sidebar:
                 caption='This tool accepts .json files exported from Rhino or Ladybyug-tools using Pollination and will automatically extracts building envelope information. You can also export the 3D model into a .gem file for IES users.') 
     
     north_ = st.number_input("**North Angle (0° by default (Y-axis)):**", 0.0,360.0, 0.0 , 1.0, key = 'north',help = "Counter-Clockwise Rotation")
-    vectors = [math.cos(math.radians(north_+90)), math.sin(math.radians(north_+90))]
+    facade_sectors_ = st.selectbox("**Facade Breakdown Sectors:**", list(SECTOR_NAMES), index = 1, help = "Number of orientation sectors of the facade breakdown table")
     solve_adjacency = st.checkbox("Solve Adjacencies Between Rooms", help = "In case you have not done this before uploading the model, Please check this box to calculate the internal wall surface areas correctly!")
 
 #MAIN PAGE
@@ -51,29 +56,63 @@ st.info("**3- If you want to calculate the conditioned spaces only, they should
 
 st.subheader("Upload .hbjson Model:")
 
-if 'temp' not in st.session_state:
-     st.session_state.temp = Path('/tmp')
-     st.session_state.temp.mkdir(parents=True, exist_ok=True)
+@st.cache_resource
+def shared_worker_pool() -> WorkerPool:
+    """Worker processes shared by every session of the server."""
+    remove_stale_sessions(SCRATCH_ROOT)
+    return WorkerPool()
+
+@st.cache_resource
+def shared_disk_caches() -> tuple:
+    """Adjacency and vtkjs caches shared by every session of the server."""
+    return AdjacencyCache(SCRATCH_ROOT.joinpath('adjacency')), VTKJSCache(SCRATCH_ROOT.joinpath('vtkjs'))
+
+@st.cache_resource
+def shared_export_jobs() -> ExportJobs:
+    """GEM and IDF exports shared by every session of the server."""
+    return ExportJobs(SCRATCH_ROOT.joinpath('exports'), shared_worker_pool())
+
+worker_pool = shared_worker_pool()
+adjacency_cache, vtkjs_cache = shared_disk_caches()
+export_jobs = shared_export_jobs()
+
+if 'scratch' not in st.session_state:
+    #each session gets its own folder, removed when the session ends
+    st.session_state.scratch = SessionScratch()
+    st.session_state.temp = st.session_state.scratch.folder
+    st.session_state.user_id = uuid.uuid4().hex
+
+def run_recorder() -> StageRecorder:
+    """Stage recorder of the current run, shared by the upload callback and the script."""
+    if st.session_state.get('recorder') is None:
+        st.session_state.recorder = StageRecorder(st.session_state.get('trace_memory', False))
+    return st.session_state.recorder.start()
+
+def run_profiler() -> RunProfiler:
+    """Profiler of the current run when profiling is on, shared like the stage recorder."""
+    if not (PROFILE_RUNS or st.session_state.get('profile_runs', False)):
+        return None
+    if st.session_state.get('profiler') is None:
+        st.session_state.profiler = RunProfiler()
+    return st.session_state.profiler.start()
+
+run_recorder()
+run_profiler()
+
+def run_in_pool(fn, *args):
+    """Run a heavy job of this session in the shared worker pool."""
+    return worker_pool.run(st.session_state.user_id, fn, *args)
+
+if 'model_cache' not in st.session_state:
+    #the rooms are intersected in as many chunks as the user can have jobs in the pool
+    st.session_state.model_cache = ModelCache(st.session_state.temp, adjacency_cache=adjacency_cache, run=run_in_pool,
+                                              adjacency_chunks=worker_pool.max_per_user)
 
 def create_vtkjs(hbjson_path: Path):
     if not hbjson_path:
         return
-    
-    model = VTKModel.from_hbjson(hbjson_path.as_posix())
-    
-    vtkjs_dir = st.session_state.temp.joinpath('vtkjs')
-    if not vtkjs_dir.exists():
-        vtkjs_dir.mkdir(parents=True, exist_ok=True)
 
-    vtkjs_file = vtkjs_dir.joinpath(f'{hbjson_path.stem}.vtkjs')
-    
-    if not vtkjs_file.is_file():
-        model.to_vtkjs(
-            folder=vtkjs_dir.as_posix(),
-            name=hbjson_path.stem
-        )
-
-    return vtkjs_file
+    return vtkjs_cache.get(hbjson_path, run=run_in_pool)
 
 def show_model(hbjson_path: Path):
     """Render HBJSON."""
@@ -85,25 +124,27 @@ def show_model(hbjson_path: Path):
     
     
 def callback_once():
+    run_recorder()
+    run_profiler()
+    entry = None
     if 'hbjson' in st.session_state.get_hbjson:
-        hb_model = HBModel.from_dict(st.session_state.get_hbjson['hbjson'])
-        
-        if solve_adjacency:
-            hb_model.solve_adjacency(intersect=True, overwrite=False, air_boundary=False, adiabatic=False, tolerance=None, angle_tolerance=None)
-    
-        if hb_model:
-            hbjson_path = st.session_state.temp.joinpath(f'{hb_model.identifier}.hbjson')
-            hbjson_path.write_text(json.dumps(hb_model.to_dict()))
-            show_model(hbjson_path)
-        
-       
-    return hb_model
+        entry = st.session_state.model_cache.get(st.session_state.get_hbjson['hbjson'], solve_adjacency)
+
+        #only rebuild the viewer content when the displayed model changes
+        content_key = (entry.key, solve_adjacency)
+        if st.session_state.get('content_key') != content_key:
+            show_model(entry.hbjson_paths[solve_adjacency])
+            st.session_state.content_key = content_key
+
+    return entry
 
 
 hbjson = get_hbjson('get_hbjson', on_change=callback_once)
 
 if st.session_state.get_hbjson is not None:
-    st.subheader(f'Visualizing {callback_once().display_name} Model')
+    #only the HBJSON files of the model are kept, the full Model is built by the viewer and the exports
+    model_entry = callback_once()
+    st.subheader(f'Visualizing {model_entry.display_name} Model')
     if 'content' in st.session_state:
         viewer(
             content=st.session_state.content,
@@ -115,26 +156,42 @@ if st.session_state.get_hbjson is not None:
         )
 
     exports = st.columns([5,5,10])
+    hbjson_path = model_entry.hbjson_paths[solve_adjacency]
+
+    #EXPORT AS GEM / IDF FILE, in the worker pool from the cached model
+    for i, kind in enumerate(EXPORT_TYPES):
+        with exports[i]:
+            if st.button(f"**Export as {EXPORT_TYPES[kind]['label']}**"):
+                export_jobs.submit(st.session_state.user_id, model_entry.key, solve_adjacency, kind, hbjson_path,
+                                   model_entry.file_hashes[solve_adjacency])
+
+    exports_running = export_jobs.pending(model_entry.key, solve_adjacency)
+
+    @st.fragment(run_every = 1.0 if exports_running else None)
+    def export_downloads():
+        """Progress of the running exports and downloads of the finished ones."""
+        cols = st.columns([5,5,10])
+        for i, kind in enumerate(EXPORT_TYPES):
+            stage, fraction, error = export_jobs.progress(model_entry.key, solve_adjacency, kind)
+            with cols[i]:
+                if stage == 'done':
+                    st.download_button(
+                        label=f"Download {EXPORT_TYPES[kind]['label']}",
+                        data=export_jobs.result(model_entry.key, solve_adjacency, kind).read_bytes(),
+                        file_name=f"{model_entry.display_name}{EXPORT_TYPES[kind]['suffix']}",
+                        key=f'download_{kind}'
+                    )
+                elif stage == 'failed':
+                    st.error(f"Export failed: {error}")
+                elif stage is not None:
+                    st.progress(fraction, text=f"Exporting {EXPORT_TYPES[kind]['label']}: {stage}")
+
+        #one full rerun once everything has finished stops the refresh
+        if exports_running and not export_jobs.pending(model_entry.key, solve_adjacency):
+            st.rerun()
+
+    export_downloads()
 
-    with exports[0]:
-        # EXPORT AS GEM FILE
-        path_to_ies_folder = pathlib.Path('./gem/')
-        path_to_ies_folder.mkdir(parents=True, exist_ok=True)
-
-        if st.button("**Export as .GEM File (for IES Users)**"):
-            
-            data=hb2ies.writer.model_to_ies(model =callback_once(), folder = path_to_ies_folder)
-            
-
-    with exports[1]:
-        #EXPORT AS IDF FILE
-        if st.button("**Export as .IDF File (for ENERGYPLUS Users)**"):
-                
-            data=callback_once().to.idf(callback_once())
-            with open(f'./idf/{callback_once().display_name}.idf', 'w') as file:
-                file.write(data)
-
-    
 else:
     st.info('Load a model!')
 
@@ -144,27 +201,6 @@ with st.sidebar:
 
     area_calc_method = st.radio("**Facade Area Calculation Methodology:**", options = ['Conditioned Zones', 'Entire Building'], help = 'Entire Building option need to be selected for embodied carbon calculations')
 
-    bldg_classes_ncc19 = {'Class 2 - apartment building (Common Area)':2,
-    'Class 3 - student accommodation':3,
-    'Class 3 - hotel':3,
-    'Class 3 - other':3,
-    'Class 5 - office building':5,
-    'Class 6 - department stores, shopping centres':6,
-    'Class 6 - display glazing':6,
-    'Class 6 - restaurants, cafes, bars':6,
-    'Class 8 - factory':8,
-    'Class 9a - health-care buildings':'9a',
-    'Class 9a - ward':'9a ward',
-    'Class 9b - churches, chapels or the like':'9b',
-    'Class 9b - early childhood centres':'9b',
-    'Class 9b - public halls, function rooms or the like':'9b',
-    'Class 9b - schools':'9b',
-    'Class 9b - single auditorium theatres and cinemas':'9b',
-    'Class 9b - sports venues or the like':'9b',
-    'Class 9b - theatres and cinemas with multiple auditoria, art galleries or the like':'9b',
-    'Class 9c - aged care building':'9c'}
-
-
     bldg_type_ashrae = {'Nonresidential':0,
     'Residential':1,
     'Semiheated':2}
@@ -178,15 +214,6 @@ with st.sidebar:
     }
 
 
-    aus_climate_zone = {'Climate Zone 1 - High humidity summer, warm winter':1,
-    'Climate Zone 2 - Warm humid summer, mild winter':2,
-    'Climate Zone 3 - Hot dry summer, warm winter':3,
-    'Climate Zone 4 - Hot dry summer, cool winter':4,
-    'Climate Zone 5 - Warm temperate':5,
-    'Climate Zone 6 - Mild temperate':6,
-    'Climate Zone 7 - Cool temperate':7,
-    'Climate Zone 8 - Alpine':8}
-
     ashrae_climate_zone = {'Climate Zone 0':0, 'Climate Zone 1':1,
     'Climate Zone 2':2,
     'Climate Zone 3':3,
@@ -200,206 +227,48 @@ with st.sidebar:
     with st.expander("NCC19 Facade Calculator", expanded = True):
         internal_walls = st.checkbox("Include Internal Walls?")
         building_state = st.selectbox('**Building State:**',['ACT','NT','QLD','NSW','SA','TAS','VIC','WA'], index = 2)
-        building_class = st.selectbox('**Building Classification:**',bldg_classes_ncc19, index = 4)
-        climate_zone = st.selectbox('**Climate Zone:**',aus_climate_zone, index = 1)
+        building_class = st.selectbox('**Building Classification:**',ncc19.BUILDING_CLASSES, index = 4)
+        climate_zone = st.selectbox('**Climate Zone:**',ncc19.CLIMATE_ZONES, index = 1)
         ex_wall_dts = st.number_input('**External Wall R-value:**', value = 1.4)
         glass_u_dts = st.number_input('**Glass U-value:**', value = 3.5)
         glass_shgc_dts = st.number_input('**Glass SHGC:**', value = 0.5)
+        north_sweep = st.checkbox("North-Angle Sweep", help = "Check NCC19 compliance for every north angle from 0° to 360°")
+        if north_sweep:
+            sweep_step = st.number_input('**Sweep Step (°):**', 1.0, 45.0, 1.0, 1.0)
+        spec_sweep = st.checkbox("Specification Sweep", help = "Check NCC19 compliance for every combination of wall R-value, glass U-value and glass SHGC")
+        if spec_sweep:
+            sweep_wall_r = st.slider('**External Wall R-value Range:**', 0.5, 6.0, (1.0, 4.0), 0.1)
+            sweep_glass_u = st.slider('**Glass U-value Range:**', 1.0, 6.0, (1.5, 5.8), 0.1)
+            sweep_glass_shgc = st.slider('**Glass SHGC Range:**', 0.1, 0.9, (0.2, 0.8), 0.01)
+
+    cache_stats = st.session_state.model_cache.stats
+    pool_stats = worker_pool.stats
+    st.caption(f"Model cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses | "
+               f"Rooms: {cache_stats['room_hits']} reused / {cache_stats['room_misses']} rebuilt | "
+               f"Workers: {pool_stats['jobs']} jobs on {pool_stats['workers']} ({pool_stats['queued']} queued)")
+    if st.session_state.get_hbjson is not None and solve_adjacency and model_entry.adjacency_stats:
+        adjacency_stats = model_entry.adjacency_stats
+        st.caption(f"Adjacency: {adjacency_stats['candidate_pairs']} of {adjacency_stats['all_pairs']} room pairs "
+                   f"intersected in {adjacency_stats['seconds']:.1f} s ({adjacency_stats['chunks']} chunks)")
 
 
 
 #Calculating Building Geometry Areas/Details
 if st.session_state.get_hbjson is not None:
-    model = callback_once()
-
-    #Extracting properties based on rooms
-    model_data = {'display_name':[], 'Conditioning Status':[], 'Program Type': [], 'volume (m3)': [],'floor_area (m2)': [],'roof_area (m2)':[],  'exterior_wall_area (m2)': [],
-                    'exterior_aperture_area (m2)': [], 'exterior_skylight_area (m2)':[]}
-
-    internal_srf_area = []
-    UG_wall_area = []
-    UG_roof_area = []
-    adjacent_Gfloors = []
-    room_id = []
-
-    for room in model.rooms:
-        model_data['display_name'].append(room.display_name)
-        model_data['Conditioning Status'].append(room.properties.energy.is_conditioned)
-        model_data['Program Type'].append(room.properties.energy.program_type._identifier)
-        model_data['volume (m3)'].append(round(room.volume,2))
-        model_data['floor_area (m2)'].append(round(room.floor_area,2)) #includes both Surface and Ground BC floors
-        model_data['roof_area (m2)'].append(round((room.exterior_roof_area - room.exterior_skylight_aperture_area),2))#exterior_roof_area includes BOTH the area of opaque and transparent parts of the roofs
-        model_data['exterior_wall_area (m2)'].append(round((room.exterior_wall_area - room.exterior_aperture_area),2)) #exterior_wall_area includes BOTH the area of opaque and transparent parts of the walls
-        model_data['exterior_aperture_area (m2)'].append(round(room.exterior_aperture_area,2))
-        model_data['exterior_skylight_area (m2)'].append(round(room.exterior_skylight_aperture_area,2))
-    
-        for face in room.faces:
-            room_id.append(room.display_name)
-            #internal walls 
-            if face.boundary_condition.name == 'Surface' and face.azimuth > 0 and face.type.name != 'AirBoundary':
-                internal_srf_area.append(round(face.area,2))
-            else:
-                internal_srf_area.append(0)
-            #UG walls 
-            if face.boundary_condition.name == 'Ground' and face.type.name == 'Wall':
-                UG_wall_area.append(round(face.area,2))
-            else:
-                UG_wall_area.append(0)
-            #UG Roofs
-            if face.boundary_condition.name == 'Ground' and face.type.name == 'Floor':
-                adjacent_Gfloors = round(face.area,2)
-            if face.boundary_condition.name == 'Ground' and face.type.name == 'RoofCeiling' and round(face.area,2) != adjacent_Gfloors:
-                UG_roof_area.append(round(face.area,2)) 
-            else:
-                UG_roof_area.append(0)
-    
-    internal = DataFrame([room_id,internal_srf_area],['ROOM_ID','Internal_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
-    UndergroundWalls = DataFrame([room_id,UG_wall_area],['ROOM_ID','UG_Wall_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
-    UndergroundRoofs = DataFrame([room_id,UG_roof_area],['ROOM_ID','UG_Roof_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
-    
-    model_data = DataFrame.from_dict(model_data).sort_values('display_name').set_index('display_name')
-
-
-    model_data['internal_wall_area (m2)'] = internal['Internal_Faces']
-    model_data['underground_wall_area (m2)'] = UndergroundWalls['UG_Wall_Faces']
-    model_data['underground_roof_area (m2)'] = UndergroundRoofs['UG_Roof_Faces']
-
-    model_shade = {'External Shades':[]}
-
-    for shade in model.outdoor_shades:
-        model_shade['External Shades'].append(shade.area)
-
-    model_shade = DataFrame.from_dict(model_shade).sum()
-    model_shade = pd.DataFrame(model_shade, columns = [f'Total Area (m2)'])
-
-    #Extracting room index based on facade calc methodology
-
-    target_rooms_index = []
-
-    for i,room in enumerate(range(len(model_data.index))):
-        
-        if (area_calc_method == 'Conditioned Zones') and (model.rooms[room].properties.energy.is_conditioned == True):
-            target_rooms_index.append(i)
-            
-        elif area_calc_method == 'Entire Building':
-            target_rooms_index.append(i)
-
-    #Surface Areas based on directions
-    roof_faces_area = []
-    floor_faces_area = []
-    vert_face_area = []
-    face_orientation = []
-
-    # aperture_orientation = {'North':[],'East':[],'South':[],'West':[]}
-    aperture_orientation = {'North':[],'East':[],'South':[],'West':[]}
-    aperture_area_north = []
-    aperture_area_south = []
-    aperture_area_east = []
-    aperture_area_west = []
-
-    model_roof = {'Roof-Ceilings':[]}
-    model_floor = {'Floors':[]}
-    
-
-    for room_index in target_rooms_index:
-        
-        for aperture in range(len(model.rooms[room_index].exterior_apertures)):
-            if model.rooms[room_index].exterior_apertures[aperture].normal.z != 1: #excluding skylights if any
-                
-                aper_azimuth = model.rooms[room_index].exterior_apertures[aperture].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
-
-                if  aper_azimuth <= 45 or aper_azimuth > 315:
-                    aperture_area_north.append(model.rooms[room_index].exterior_apertures[aperture].area)
-
-                elif aper_azimuth > 45 and aper_azimuth <= 135:
-                    aperture_area_east.append(model.rooms[room_index].exterior_apertures[aperture].area)
-                    
-                elif 135 < aper_azimuth <= 225:
-                    aperture_area_south.append(model.rooms[room_index].exterior_apertures[aperture].area)
-                    
-                elif 225 < aper_azimuth <= 315:
-                    aperture_area_west.append(model.rooms[room_index].exterior_apertures[aperture].area)
-        
-        
-    
-        for face in range(len(model.rooms[room_index].faces)):
-            if internal_walls:
-                if (model.rooms[room_index].faces[face].type.name == 'Wall'):
-                    
-                    vert_face_azimuth = model.rooms[room_index].faces[face].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
-
-                    if vert_face_azimuth <= 45 or vert_face_azimuth > 315:
-                        face_orientation.append('North')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-
-                    elif vert_face_azimuth > 45 and vert_face_azimuth <= 135:
-                        face_orientation.append('East')                                
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-
-                    elif vert_face_azimuth > 135 and vert_face_azimuth <= 225:
-                        face_orientation.append('South')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-                
-                    elif vert_face_azimuth > 225 and vert_face_azimuth <= 315:
-                        face_orientation.append('West')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-            else:
-                if (model.rooms[room_index].faces[face].boundary_condition.name == 'Outdoors') and (model.rooms[room_index].faces[face].type.name != 'RoofCeiling') and (model.rooms[room_index].faces[face].type.name != 'Floor'):
-                    
-                    vert_face_azimuth = model.rooms[room_index].faces[face].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
-
-                    if vert_face_azimuth <= 45 or vert_face_azimuth > 315:
-                        face_orientation.append('North')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-
-                    elif vert_face_azimuth > 45 and vert_face_azimuth <= 135:
-                        face_orientation.append('East')                                
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-
-                    elif vert_face_azimuth > 135 and vert_face_azimuth <= 225:
-                        face_orientation.append('South')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-                
-                    elif vert_face_azimuth > 225 and vert_face_azimuth <= 315:
-                        face_orientation.append('West')
-                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
-
-            #checking horizontal faces
-            if model.rooms[room_index].faces[face].type.name == 'RoofCeiling':
-                horiz_face_area = model.rooms[room_index].faces[face].area
-                roof_faces_area.append(round(horiz_face_area,2))
-                
-            if model.rooms[room_index].faces[face].type.name == 'Floor': #if there is any exposed floor, if not returns 0
-                horiz_face_area = model.rooms[room_index].faces[face].area
-                floor_faces_area.append(round(horiz_face_area,2))
-    
-    
-    aperture_orientation['North'] = round(sum(aperture_area_north),2)
-    aperture_orientation['East'] = round(sum(aperture_area_east),2)
-    aperture_orientation['South'] = round(sum(aperture_area_south),2)
-    aperture_orientation['West'] = round(sum(aperture_area_west),2)
-    model_apertures = DataFrame.from_dict([aperture_orientation]).transpose()
-    model_apertures.rename(columns = {0:'Aperture Area (m2)'}, inplace= True)
-    model_apertures = model_apertures.sort_index()
-    
-
-    model_faces_vertical = DataFrame([face_orientation,vert_face_area]).transpose()
-    model_faces_vertical.rename(columns = {0:'Face Orientation', 1:'Face Area (m2)'}, inplace= True)
-    model_faces_vertical = model_faces_vertical.groupby('Face Orientation').sum()
-    model_faces_vertical = model_faces_vertical.sort_index()
-
-
-    model_faces_vertical['ExWall Area (m2)'] = round((model_faces_vertical['Face Area (m2)'] - model_apertures['Aperture Area (m2)']).astype(float),2)
-    model_faces_vertical['WWR (%)'] = round(((model_apertures['Aperture Area (m2)'] / model_faces_vertical['Face Area (m2)'])*100).astype(float),2)
-    model_faces_vertical['WWR (%)'].fillna(0, inplace=True)
-
-    model_roof['Roof-Ceilings'] = roof_faces_area    
-    model_roof_DF = DataFrame.from_dict(model_roof).sum()
-    model_roof_DF = pd.DataFrame(model_roof_DF, columns = [f'Calculated {area_calc_method} Area (m2)'])
-    
-    model_floor['Floors'] = floor_faces_area
-    model_floor_DF = DataFrame.from_dict(model_floor).sum()
-    model_floor_DF = pd.DataFrame(model_floor_DF, columns = [f'Calculated {area_calc_method} Area (m2)'])
+    #faces are only walked once per model, a new north angle only re-bins their azimuths
+    model_table = model_entry.get_face_table(solve_adjacency)
+    with stage('envelope'):
+        envelope = envelope_from_table(model_table, area_calc_method, internal_walls, north_)
+    with stage('facade sectors'):
+        facade_breakdown = facade_sectors(model_table, area_calc_method, internal_walls, north_, facade_sectors_)
+
+    model_data = envelope['model_data']
+    model_shade = envelope['model_shade']
+    target_rooms_index = envelope['target_rooms_index']
+    model_apertures = envelope['model_apertures']
+    model_faces_vertical = envelope['model_faces_vertical']
+    model_roof_DF = envelope['model_roof']
+    model_floor_DF = envelope['model_floor']
 
 else:
     st.warning('**LOAD THE MODEL!**', icon = '⚠️')
@@ -408,12 +277,7 @@ else:
 #Plotting Building Information Dataframes
 if st.session_state.get_hbjson is not None:
     #Building Relative Compactness (RC) = 6 * Building Volume (V) ^ 2/3 / Building Surface Area (A)
-    ##Source: https://www.sciencedirect.com/science/article/abs/pii/S037877881400574X?via%3Dihub
-
-    building_volume = model_data['volume (m3)'].sum()
-    Building_area = model_data[['floor_area (m2)','roof_area (m2)','exterior_wall_area (m2)','exterior_aperture_area (m2)','exterior_skylight_area (m2)']].sum().sum() #internal walls excluded 
-
-    build_RC = (6 * (pow(building_volume,2/3))) / Building_area
+    build_RC = relative_compactness(model_data)
 
     st.header(f'**Building Relative Compactness (RC)** is :red[{round(build_RC,2)}].')
 
@@ -431,7 +295,7 @@ if st.session_state.get_hbjson is not None:
     export_as_csv = st.download_button(
             label="Download Data as a CSV File.csv",
             data=model_data.to_csv(index=True),
-            file_name=f'{model.display_name} Space Calculations.csv'
+            file_name=f'{model_entry.display_name} Space Calculations.csv'
         )
     
     st.markdown('---')
@@ -461,6 +325,9 @@ if st.session_state.get_hbjson is not None:
             st.dataframe(model_roof_DF, use_container_width=True)
             st.dataframe(model_floor_DF, use_container_width=True)
 
+        st.subheader(f'**Facade Breakdown ({facade_sectors_} Sectors)**')
+        st.dataframe(facade_breakdown, use_container_width=True)
+
     st.markdown('---')
 
 
@@ -468,539 +335,182 @@ if st.session_state.get_hbjson is not None:
 if st.session_state.get_hbjson is not None and target_rooms_index != []:
     st.header("Reference Building Fabric Performance - NCC19 Facade Calculator")
 
-    # Get the path to the user's home directory
-    home = str(Path.home())
-    # Define the path to the Downloads folder
-    downloads_folder = os.path.join(home, "Downloads")
-    
-    if not os.path.exists("images"):
-        os.mkdir("images")
-    #R Target
-    R_target = []
-    for i in range(0,4):
-        if model_faces_vertical['WWR (%)'].iloc[i] <= 20:
-            if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
-                if aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 5 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7 or aus_climate_zone[climate_zone] == 8:
-                    R_target.append(1.4)
-                elif aus_climate_zone[climate_zone] == 1:
-                    R_target.append(2.4)
-            elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-                if aus_climate_zone[climate_zone] == 1 or aus_climate_zone[climate_zone] == 3:
-                    R_target.append(3.3)
-                elif aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5:
-                    R_target.append(1.4)
-                elif aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
-                    R_target.append(2.8)
-                elif aus_climate_zone[climate_zone] == 8:
-                    R_target.append(3.8)
-        elif model_faces_vertical['WWR (%)'].iloc[i] > 20:
-            R_target.append(1.0)
-
-    Wall_U_Value = []
-    for i in range(0,4):
-        if model_faces_vertical['WWR (%)'].iloc[i] <= 20 and 1/ex_wall_dts >= 1/R_target[i]:
-            Wall_U_Value.append(1/R_target[i]) 
-        else:
-            if model_faces_vertical['WWR (%)'].iloc[i] > 20 and 1/ex_wall_dts >= 1/R_target[i]:
-                Wall_U_Value.append(1/R_target[i])
-            else:
-                Wall_U_Value.append(1/ex_wall_dts)
-
-
-    shading_multi = 1.0 #assuming no shades for reference buildings and will be equal for all orientations
+    with stage('ncc19'):
+        ncc = ncc19.evaluate_orientations(model_faces_vertical.join(model_apertures), ncc19.BUILDING_CLASSES[building_class],
+                                          ncc19.CLIMATE_ZONES[climate_zone], ex_wall_dts, glass_u_dts, glass_shgc_dts)
 
-    #Target Wall Glazing U-values
-    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
-        target_wall_glazing_U = 2.0
-    else:
-        if aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5:
-            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-                target_wall_glazing_U = 2.0 
-        elif aus_climate_zone[climate_zone] == 1 or aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
-            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-                target_wall_glazing_U = 1.1
-        elif aus_climate_zone[climate_zone] == 8:
-            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-                target_wall_glazing_U = 0.9
-
-    u_value_glazing = []
-    wall_glazing_u_value = []
-    solar_admittance_single = []
-    sum_UA = []
-
-    for i in range(0,4):
-        x = (target_wall_glazing_U*model_faces_vertical['Face Area (m2)'].iloc[i]-(Wall_U_Value[i]*(model_faces_vertical['Face Area (m2)'].iloc[i]-model_apertures['Aperture Area (m2)'].iloc[i])))/model_apertures['Aperture Area (m2)'].iloc[i]
-        UA = ((1/ex_wall_dts)*model_faces_vertical['ExWall Area (m2)'].iloc[i]) + (glass_u_dts*model_apertures['Aperture Area (m2)'].iloc[i])
-        sum_UA.append(((1/ex_wall_dts)*model_faces_vertical['ExWall Area (m2)'].iloc[i]) + (glass_u_dts*model_apertures['Aperture Area (m2)'].iloc[i]))
-        wall_glazing_u_value.append(round(UA/model_faces_vertical['Face Area (m2)'].iloc[i],2))
-        
-        if x == np.inf:
-            u_value_glazing.append(0) #Y66
-        else:
-            u_value_glazing.append(x)
-        #----
-        if model_apertures['Aperture Area (m2)'].iloc[i] == 0 :
-            solar_admittance_single.append(0)
-        elif model_apertures['Aperture Area (m2)'].iloc[i] > 0 :
-            solar_admittance_single.append(round((shading_multi*glass_shgc_dts*model_apertures['Aperture Area (m2)'].iloc[i]) / model_faces_vertical['Face Area (m2)'].iloc[i],2))
-
-
-    dts_glazing_U = DataFrame([u_value_glazing,model_apertures['Aperture Area (m2)'].values]).transpose()
-    dts_glazing_U.rename(columns = {0:'U-Value Glazing', 1:'Vision Area'},index = {0:'East',1:'North',2:'South',3:'West'}, inplace= True)
-    
-    dts_glazing_U['Area Weighted U-value Glazing'] = dts_glazing_U['U-Value Glazing']*model_apertures['Aperture Area (m2)']
-    if dts_glazing_U['Area Weighted U-value Glazing'].sum() == 0:
-        Reference_Building_glazing_U_value = 0
-    else:
-        Reference_Building_glazing_U_value = round(dts_glazing_U['Area Weighted U-value Glazing'].sum()/model_apertures['Aperture Area (m2)'].sum(),2)
-    Reference_Building_wall_U_value = (Wall_U_Value[0]*model_faces_vertical['ExWall Area (m2)'].iloc[0]+Wall_U_Value[1]*model_faces_vertical['ExWall Area (m2)'].iloc[1]+Wall_U_Value[2]*model_faces_vertical['ExWall Area (m2)'].iloc[2]+Wall_U_Value[3]*model_faces_vertical['ExWall Area (m2)'].iloc[3]) / model_faces_vertical['ExWall Area (m2)'].sum()
-
-    #Solar admittancce targets
-    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
-        if aus_climate_zone[climate_zone] ==2 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 5 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
-            solar_admittance = {'East':0.13, 'North':0.13,'South':0.13, 'West':0.13}
-        elif aus_climate_zone[climate_zone] ==1:
-            solar_admittance = {'East':0.12, 'North':0.12,'South':0.12, 'West':0.12}
-        elif aus_climate_zone[climate_zone] ==3:
-            solar_admittance = {'East':0.16, 'North':0.16,'South':0.16, 'West':0.16}
-        elif aus_climate_zone[climate_zone] ==8:
-            solar_admittance = {'East':0.20, 'North':0.20,'South':0.42, 'West':0.36}
-    elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-        if aus_climate_zone[climate_zone] ==1:
-            solar_admittance = {'East':0.07, 'North':0.07,'South':0.10, 'West':0.07}
-        elif aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] ==6:
-            solar_admittance = {'East':0.07, 'North':0.07,'South':0.07, 'West':0.07}
-        elif aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5 :
-            solar_admittance = {'East':0.10, 'North':0.10,'South':0.10, 'West':0.10}
-        elif aus_climate_zone[climate_zone] == 7:
-            solar_admittance = {'East':0.07, 'North':0.07,'South':0.08, 'West':0.07}
-        elif aus_climate_zone[climate_zone] == 8:
-            solar_admittance = {'East':0.08, 'North':0.08,'South':0.08, 'West':0.08}
-    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
-        if aus_climate_zone[climate_zone] == 1:
-            solar_admittance_weight_coe = {'East':1.39, 'North':1.47,'South':1, 'West':1.41}
-        elif aus_climate_zone[climate_zone] == 2:
-            solar_admittance_weight_coe = {'East':1.58, 'North':1.95,'South':1, 'West':1.68}
-        elif aus_climate_zone[climate_zone] == 3:
-            solar_admittance_weight_coe = {'East':1.63, 'North':1.95,'South':1, 'West':1.65}
-        elif aus_climate_zone[climate_zone] == 4:
-            solar_admittance_weight_coe = {'East':1.72, 'North':2.05,'South':1, 'West':1.69}
-        elif aus_climate_zone[climate_zone] == 5:
-            solar_admittance_weight_coe = {'East':1.72, 'North':2.28,'South':1, 'West':1.75}
-        elif aus_climate_zone[climate_zone] == 6:
-            solar_admittance_weight_coe = {'East':1.62, 'North':2.12,'South':1, 'West':1.67}
-        elif aus_climate_zone[climate_zone] == 7:
-            solar_admittance_weight_coe = {'East':1.84, 'North':2.4,'South':1, 'West':1.92}
-        elif aus_climate_zone[climate_zone] == 8:
-            solar_admittance_weight_coe = {'East':1.92, 'North':1.88,'South':1, 'West':1.25}
-    elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
-        if aus_climate_zone[climate_zone] == 1:
-            solar_admittance_weight_coe = {'East':1.3, 'North':1.47,'South':1, 'West':1.37}
-        elif aus_climate_zone[climate_zone] == 2:
-            solar_admittance_weight_coe = {'East':1.49, 'North':1.77,'South':1, 'West':1.54}
-        elif aus_climate_zone[climate_zone] == 3:
-            solar_admittance_weight_coe = {'East':1.48, 'North':1.72,'South':1, 'West':1.5}
-        elif aus_climate_zone[climate_zone] == 4:
-            solar_admittance_weight_coe = {'East':1.37, 'North':1.55,'South':1, 'West':1.36}
-        elif aus_climate_zone[climate_zone] == 5:
-            solar_admittance_weight_coe = {'East':1.48, 'North':1.88,'South':1, 'West':1.52}
-        elif aus_climate_zone[climate_zone] == 6:
-            solar_admittance_weight_coe = {'East':1.28, 'North':1.52,'South':1, 'West':1.33}
-        elif aus_climate_zone[climate_zone] == 7:
-            solar_admittance_weight_coe = {'East':1.35, 'North':1.6,'South':1, 'West':1.4}
-        elif aus_climate_zone[climate_zone] == 8:
-            solar_admittance_weight_coe = {'East':1.26, 'North':1.24,'South':1, 'West':1.05}
-        
-    
-    if model_faces_vertical['WWR (%)'].iloc[0] == 0:
-        East = 0
-    else:
-        East = [round(solar_admittance['East']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[0]/100)),2)]
-
-    if model_faces_vertical['WWR (%)'].iloc[1] == 0:
-        North = 0
-    else:
-        North = [round(solar_admittance['North']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[1]/100)),2)]
-
-    if model_faces_vertical['WWR (%)'].iloc[2] == 0:
-        South = 0
-    else:
-        South = [round(solar_admittance['South']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[2]/100)),2)]
-
-    if model_faces_vertical['WWR (%)'].iloc[3] == 0:
-        West = 0
-    else:
-        West = [round(solar_admittance['West']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[3]/100)),2)]
-
-
-    dts_shgc_single = {'East':East,
-                'North':North,
-                'South':South,
-                'West':West}
-    
-    
-    dts_shgc_single = DataFrame.from_dict(dts_shgc_single).transpose()
-    dts_shgc_single.rename(columns = {0:'SHGC'},inplace= True)
-    
-
-    #SA COE based on WWR%
-    if model_faces_vertical['WWR (%)'].iloc[0] < 20: #East
-        solar_admittance_weight_coe_east = 0
-    elif model_faces_vertical['WWR (%)'].iloc[0] >= 20:
-        solar_admittance_weight_coe_east = solar_admittance_weight_coe['East']
-    if model_faces_vertical['WWR (%)'].iloc[1] < 20: #North
-        solar_admittance_weight_coe_north = 0
-    elif model_faces_vertical['WWR (%)'].iloc[1] >= 20:
-        solar_admittance_weight_coe_north = solar_admittance_weight_coe['North']
-    if model_faces_vertical['WWR (%)'].iloc[2] < 20: #South
-        solar_admittance_weight_coe_south = 0
-    elif model_faces_vertical['WWR (%)'].iloc[2] >= 20:
-        solar_admittance_weight_coe_south = solar_admittance_weight_coe['South']
-    if model_faces_vertical['WWR (%)'].iloc[3] < 20: #West
-        solar_admittance_weight_coe_west = 0
-    elif model_faces_vertical['WWR (%)'].iloc[3] >= 20:
-        solar_admittance_weight_coe_west = solar_admittance_weight_coe['West']
-
-
-    #Total Values
-    reference_ac_energy = model_faces_vertical['Face Area (m2)'].iloc[0]*solar_admittance_weight_coe_east*solar_admittance['East'] + model_faces_vertical['Face Area (m2)'].iloc[1]*solar_admittance_weight_coe_north*solar_admittance['North'] + model_faces_vertical['Face Area (m2)'].iloc[2]*solar_admittance_weight_coe_south*solar_admittance['South'] + model_faces_vertical['Face Area (m2)'].iloc[3]*solar_admittance_weight_coe_west*solar_admittance['West']
-    if reference_ac_energy == 0:
-        dts_shgc_total = 0
-    else:
-        dts_shgc_total = reference_ac_energy/((solar_admittance_weight_coe_east*dts_glazing_U['Vision Area'].iloc[0]*shading_multi)+(solar_admittance_weight_coe_north*dts_glazing_U['Vision Area'].iloc[1]*shading_multi)+(solar_admittance_weight_coe_south*dts_glazing_U['Vision Area'].iloc[2]*shading_multi)+(solar_admittance_weight_coe_west*dts_glazing_U['Vision Area'].iloc[3]*shading_multi))
-
-    wall_glazing_value_total = sum(sum_UA) / model_faces_vertical['Face Area (m2)'].sum()
-    proposed_ac_energy = model_faces_vertical['Face Area (m2)'].iloc[0]*solar_admittance_weight_coe_east*solar_admittance_single[0]+model_faces_vertical['Face Area (m2)'].iloc[1]*solar_admittance_weight_coe_north*solar_admittance_single[1]+model_faces_vertical['Face Area (m2)'].iloc[2]*solar_admittance_weight_coe_south*solar_admittance_single[2]+model_faces_vertical['Face Area (m2)'].iloc[3]*solar_admittance_weight_coe_west*solar_admittance_single[3]
+    #figures are rebuilt only when the compliance result changes
+    with stage('ncc19 charts'):
+        ncc_charts = ncc19_charts(ncc)
+    wall_glazing_u_bar = ncc_charts['wall_glazing_u_bar']
+    sa_bar = ncc_charts['sa_bar']
+    wall_glazing_u_total_bar = ncc_charts['wall_glazing_u_total_bar']
+    AC_energy = ncc_charts['AC_energy']
 
     st.subheader("Method 1:")
     cols = st.columns(4)
-    with cols[0]:
-        st.metric("East Wall U-Value(W/m².K", round(Wall_U_Value[0],2))
-    with cols[1]:
-        st.metric("North Wall U-Value(W/m².K)", round(Wall_U_Value[1],2))
-    with cols[2]:
-        st.metric("South Wall U-Value(W/m².K)", round(Wall_U_Value[2],2))
-    with cols[3]:
-        st.metric("West Wall U-Value(W/m².K)", round(Wall_U_Value[3],2))
+    for i, orientation in enumerate(ncc19.ORIENTATIONS):
+        with cols[i]:
+            st.metric(f"{orientation} Wall U-Value(W/m².K)", round(ncc.wall_u[i],2))
     cols = st.columns(4)
-    with cols[0]:
-        if dts_glazing_U['U-Value Glazing'].iloc[0] == 0:
-            st.metric("East Glazing U-Value(W/m².K)",None)
-        else:
-            if dts_glazing_U['U-Value Glazing'].iloc[0] > 5.8:
-                st.metric("East Glazing U-Value(W/m².K)",5.8)
-            elif Reference_Building_glazing_U_value < 1.5:
-                st.metric("East Glazing U-Value(W/m².K)",1.5)
-            else:
-                st.metric("East Glazing U-Value(W/m².K)", round(dts_glazing_U['U-Value Glazing'].iloc[0],2))
-    with cols[1]:
-        if dts_glazing_U['U-Value Glazing'].iloc[1] == 0:
-            st.metric("North Glazing U-Value(W/m².K)",None)
-        else:
-            if dts_glazing_U['U-Value Glazing'].iloc[1] > 5.8:
-                st.metric("North Glazing U-Value(W/m².K)",5.8)
-            elif Reference_Building_glazing_U_value < 1.5:
-                st.metric("North Glazing U-Value(W/m².K)",1.5)
-            else:
-                st.metric("North Glazing U-Value(W/m².K)", round(dts_glazing_U['U-Value Glazing'].iloc[1],2))
-    with cols[2]:
-        if dts_glazing_U['U-Value Glazing'].iloc[2] == 0:
-            st.metric("South Glazing U-Value(W/m².K)",None)
-        else:
-            if dts_glazing_U['U-Value Glazing'].iloc[2] >= 5.8:
-                st.metric("South Glazing U-Value(W/m².K)",5.8)
-            elif Reference_Building_glazing_U_value <= 1.5:
-                st.metric("South Glazing U-Value(W/m².K)",1.5)
-            else:
-                st.metric("South Glazing U-Value(W/m².K)", round(dts_glazing_U['U-Value Glazing'].iloc[2],2))
-    with cols[3]:
-        if dts_glazing_U['U-Value Glazing'].iloc[3] == 0:
-            st.metric("West Glazing U-Value(W/m².K)",None)
-        else:
-            if dts_glazing_U['U-Value Glazing'].iloc[3] > 5.8:
-                st.metric("West Glazing U-Value(W/m².K)",5.8)
-            elif Reference_Building_glazing_U_value < 1.5:
-                st.metric("West Glazing U-Value(W/m².K)",1.5)
-            else:
-                st.metric("West Glazing U-Value(W/m².K)", round(dts_glazing_U['U-Value Glazing'].iloc[3],2))
+    for i, orientation in enumerate(ncc19.ORIENTATIONS):
+        with cols[i]:
+            st.metric(f"{orientation} Glazing U-Value(W/m².K)", ncc.glazing_u_display[i])
     cols = st.columns(4)
-    with cols[0]:
-        if dts_shgc_single['SHGC'].iloc[0] > 0.81:
-            st.metric("East Glazing SHGC",0.81)
-        elif dts_shgc_single['SHGC'].iloc[0] == 0:
-            st.metric("East Glazing SHGC",0.0)
-        elif dts_shgc_single['SHGC'].iloc[0] < 0.16:
-            st.metric("East Glazing SHGC",0.16)
-        else:
-            st.metric("East Glazing SHGC",dts_shgc_single.iloc[0])
-    with cols[1]:
-        if dts_shgc_single['SHGC'].iloc[1] > 0.81:
-            st.metric("North Glazing SHGC",0.81)
-        elif dts_shgc_single['SHGC'].iloc[1] == 0:
-            st.metric("North Glazing SHGC", 0.0)
-        elif dts_shgc_single['SHGC'].iloc[1] < 0.16:
-            st.metric("North Glazing SHGC",0.16)
-        else: 
-            st.metric("North Glazing SHGC",dts_shgc_single.iloc[1])
-    with cols[2]:
-        if dts_shgc_single['SHGC'].iloc[2] > 0.81:
-            st.metric("South Glazing SHGC",0.81)
-        elif dts_shgc_single['SHGC'].iloc[2] == 0:
-            st.metric("South Glazing SHGC", 0.0)
-        elif dts_shgc_single['SHGC'].iloc[2] < 0.16:
-            st.metric("South Glazing SHGC",0.16)
-        else: 
-            st.metric("South Glazing SHGC",dts_shgc_single.iloc[2])
-    with cols[3]:
-        if dts_shgc_single['SHGC'].iloc[3] > 0.81:
-            st.metric("West Glazing SHGC",0.81)
-        elif dts_shgc_single['SHGC'].iloc[3] == 0:
-            st.metric("West Glazing SHGC",0.0)
-        elif dts_shgc_single['SHGC'].iloc[3] < 0.16:
-            st.metric("West Glazing SHGC",0.16)
-        else: 
-            st.metric("West Glazing SHGC",dts_shgc_single.iloc[3])
-
-    def CheckForLess_WallGlazing(list, val):
-
-            # traverse in the list
-            for x in list:
-
-                # compare with all the
-                # values with value
-                if val <= x:
-                    return False
-            return True
-    
-    def CheckForLess_SA(list1, list2):
-
-            # traverse in the list
-            for x in list1:
-                for y in list2:
-
-                    # compare with all the
-                    # values with value
-                    if y <= x:
-                        return False
-            return True
+    for i, orientation in enumerate(ncc19.ORIENTATIONS):
+        with cols[i]:
+            st.metric(f"{orientation} Glazing SHGC", ncc.shgc_display[i])
 
     cols = st.columns([5,1,5])
 
     with cols[0]:
-        #Bar chart Wall glazing U value
-        wall_glazing_u_bar = go.Figure(data=[go.Bar(x=['East','North', 'South','West'],
-                                                y=wall_glazing_u_value,marker_color='lightslategray',text=wall_glazing_u_value)])
-    
-        wall_glazing_u_bar.update_layout(
-                    yaxis = dict(title = "Wall Glazing U-Value W/m².K"),
-                    shapes=[
-                        {
-                            'type': 'line',
-                            'xref': 'paper',
-                            'x0': 0,
-                            'y0': target_wall_glazing_U,
-                            'x1': 1,
-                            'y1': target_wall_glazing_U,
-                            'line': {
-                                'color': 'rgb(50, 171, 96)',
-                                'width': 2,
-                                'dash': 'dash',
-                            },
-                        },
-                    ],
-                        )
-        wall_glazing_u_bar.add_annotation(
-            x=0
-            , y=target_wall_glazing_U
-            , text=f'DtS Threshold'
-            , yanchor='bottom'
-            , showarrow=True
-            , arrowhead=1
-            , arrowsize=1
-            , arrowwidth=2
-            , arrowcolor="#636363"
-            , ax=-20
-            , ay=-30
-            , font=dict(size=15, color="black", family="Arial")
-            , align="left"
-            ,)
-        
         st.plotly_chart(wall_glazing_u_bar, use_container_width=True)
 
-        # Export the figure to PNG using Kaleido
-        wall_glazing_u_bar.write_image('wall_glazing_u_bar.png')
-
-        path_to_figure_folder = os.path.join(downloads_folder, 'wall_glazing_u_bar.png')
-
-        # Write the content to the file
-        with open(path_to_figure_folder, "w") as file:
-            file.write(wall_glazing_u_bar)
-
-
-        if (CheckForLess_WallGlazing(wall_glazing_u_value, target_wall_glazing_U)):
+        if ncc.method1_wall_glazing:
             st.subheader("**:green[Compliant Solution]**")
-            method1_wall_glazing = 'Compliant Solution'
         else:
             st.subheader("**:red[Non-Compliant Solution]**")
-            method1_wall_glazing = 'Non-Compliant Solution'
             st.markdown("**Recommendation: Increasing  external wall r-value OR reducing glass U-value**")
 
     with cols[1]:
         ""
         
     with cols[2]:
-        #Bar chart solar admittance
-        sa_bar = go.Figure(data=[go.Bar(x=list(solar_admittance.keys()),
-                                                    y=solar_admittance_single,marker_color='lightslategray',text=solar_admittance_single)])
-        
-        sa_bar.update_layout(
-                    yaxis = dict(title = "Solar Admittance"), showlegend = False)
-        
-        sa_bar.add_trace(
-            go.Scatter(
-                x=list(solar_admittance.keys()),
-                y=list(solar_admittance.values()),
-                name="DtS Threshold",
-                mode='lines+markers',   
-            ),
-        )
-
-        sa_bar.add_annotation(
-            x=0
-            , y=solar_admittance['North']
-            , text=f'DtS Threshold'
-            , yanchor='bottom'
-            , showarrow=True
-            , arrowhead=1
-            , arrowsize=1
-            , arrowwidth=2
-            , arrowcolor="#636363"
-            , ax=-20
-            , ay=-30
-            , font=dict(size=15, color="black", family="Arial")
-            , align="right"
-            ,)
-        
         st.plotly_chart(sa_bar, use_container_width=True)
-        # sa_bar.write_image("sa_bar.png")
         
-        if CheckForLess_SA(solar_admittance_single,list(solar_admittance.values())):
+        if ncc.method1_sa:
             st.subheader("**:green[Compliant Solution]**")
-            method1_sa = 'Compliant Solution'
         else:
             st.subheader("**:red[Non-Compliant Solution]**")
-            method1_sa = 'Non-Compliant Solution'
             st.markdown("**Recommendation: Reducing glass SHGC**")
 
     st.subheader("Method 2:")
     cols = st.columns(3)
     with cols[0]:
-        st.metric("Reference Building Wall U-value",round(Reference_Building_wall_U_value,2))
+        st.metric("Reference Building Wall U-value",round(ncc.reference_wall_u,2))
     with cols[1]:  
-        if Reference_Building_glazing_U_value > 5.8 or Reference_Building_glazing_U_value == 0:
-            st.metric("Reference Building Glazing U-value",5.8)
-            Reference_Building_glazing_U_value = 5.8
-        elif Reference_Building_glazing_U_value < 1.5:
-            st.metric("Reference Building Glazing U-value",1.5)
-            Reference_Building_glazing_U_value = 1.5
-        else:
-            st.metric("Reference Building Glazing U-value",Reference_Building_glazing_U_value)
-            Reference_Building_glazing_U_value = Reference_Building_glazing_U_value
+        st.metric("Reference Building Glazing U-value",ncc.reference_glazing_u)
     with cols[2]:
-        if dts_shgc_total > 0.81 or dts_shgc_total == 0:
-            st.metric("Reference Building Glazing SHGC",0.81)
-            dts_shgc_total = 0.81
-        elif dts_shgc_total == np.inf:
-            st.metric("Reference Building Glazing SHGC",0)
-            dts_shgc_total = 0
-        elif dts_shgc_total < 0.16 and  dts_shgc_total > 0:
-            st.metric("Reference Building Glazing SHGC",0.16)
-            dts_shgc_total = 0.16
-        else:
-            st.metric("Reference Building Glazing SHGC",round(dts_shgc_total,2))
-            dts_shgc_total = round(dts_shgc_total,2)
+        st.metric("Reference Building Glazing SHGC",ncc.reference_shgc)
 
     cols = st.columns([3,3,3])
 
     with cols[0]:
-        #Bar chart Wall glazing U value total
-        wall_glazing_u_total_bar = go.Figure(data=[go.Bar(x=['Proposed Design','DtS Reference'],
-                                                y=[round(wall_glazing_value_total,2),target_wall_glazing_U],marker_color=['lightgreen','lightslategray'],text=[round(wall_glazing_value_total,2),target_wall_glazing_U])])
-        wall_glazing_u_total_bar.update_layout(
-                    yaxis = dict(title = "Wall Glazing U-Value W/m².K Total"))
-
         st.plotly_chart(wall_glazing_u_total_bar, use_container_width=True)
-        # wall_glazing_u_total_bar.write_image("wall_glazing_u_total_bar.png")
 
-        if wall_glazing_value_total <= target_wall_glazing_U:
+        if ncc.method2_wall_glazing:
             st.subheader("**:green[Compliant Solution]**")
-            method2_wall_glazing = 'Compliant Solution'
         else:
             st.subheader("**:red[Non-Compliant Solution]**")
-            method2_wall_glazing = 'Non-Compliant Solution'
             st.markdown("**Recommendation: Increasing  external wall r-value OR reducing glass U-value**")
 
     with cols[1]:
         ""
         
     with cols[2]:
-        #Bar chart AC energy total
-        AC_energy = go.Figure(data=[go.Bar(x=['Proposed Design','DtS Reference'],
-                                                y=[round(proposed_ac_energy,2),round(reference_ac_energy,2)],marker_color=['lightgreen','lightslategray'],text=[round(proposed_ac_energy,2),round(reference_ac_energy,2)])])
-        AC_energy.update_layout(
-                    yaxis = dict(title = "AC Energy Value"))
-        AC_energy.update_traces(marker_color='rgb(158,202,225)', marker_line_color='rgb(8,48,107)',
-            marker_line_width=1.5, opacity=0.6)
-
-        AC_energy.update_yaxes(range=[0,50])
-
         st.plotly_chart(AC_energy, use_container_width=True)
-        # AC_energy.write_image("AC_energy.png")
         
-        if proposed_ac_energy <= reference_ac_energy:
+        if ncc.method2_ac_energy:
             st.subheader("**:green[Compliant Solution]**")
-            method2_ac_energy = 'Compliant Solution'
         else:
             st.subheader("**:red[Non-Compliant Solution]**")
-            method2_ac_energy  = 'Non-Compliant Solution'
             st.markdown("**Recommendation: Reducing glass SHGC**")
     
 
     with cols[2]:
         ""
-    #Generating the report
-    if method1_wall_glazing == 'Compliant Solution' and method1_sa == 'Compliant Solution':
-        method1_compliance = 'Compliant Solution'
-    else:
-        method1_compliance = 'Non-Compliant Solution'
 
-    if method2_wall_glazing == 'Compliant Solution' and method2_ac_energy == 'Compliant Solution':
-        method2_compliance = 'Compliant Solution'
-    else:
-        method2_compliance = 'Non-Compliant Solution'
-
-    NCC19 = Document()
-    section = NCC19.sections[0]
-    section.page_height = Mm(350)
-    section.page_width = Mm(297)
-    section.left_margin = Mm(20)
-    section.right_margin = Mm(20)
-    section.top_margin = Mm(25.4)
-    section.bottom_margin = Mm(25.4)
-    section.header_distance = Mm(12.7)
-    section.footer_distance = Mm(12.7)
-    style = NCC19.styles['Normal']
-    font = style.font
-    font.name = 'Arial'
-    font.size = Pt(12)
-
-    x = 2.5
-    h_res = x
-    w_res = 2*x
+    #North-angle sweep: all angles in one batch from the cached face table
+    if north_sweep:
+        st.subheader("North-Angle Sweep:")
+        sweep_norths = np.arange(0, 360, sweep_step)
+        with stage('north sweep'), np.errstate(divide='ignore', invalid='ignore'):
+            sweep_face_area, sweep_aperture_area = orientation_sweep(model_table, sweep_norths, area_calc_method, internal_walls)
+            sweep = ncc19.evaluate_arrays(sweep_face_area, sweep_aperture_area, ncc19.BUILDING_CLASSES[building_class],
+                                          ncc19.CLIMATE_ZONES[climate_zone], ex_wall_dts, glass_u_dts, glass_shgc_dts)
+
+        sweep_polar = dict(angularaxis = dict(rotation = 90, direction = 'counterclockwise'))
+        cols = st.columns(2)
+        with cols[0]:
+            sweep_u_chart = go.Figure()
+            sweep_u_chart.add_trace(go.Scatterpolar(r=sweep['wall_glazing_u_total'], theta=sweep_norths, mode='lines', name='Proposed Total (Method 2)'))
+            sweep_u_chart.add_trace(go.Scatterpolar(r=sweep['wall_glazing_u'].max(axis=1), theta=sweep_norths, mode='lines', name='Worst Orientation (Method 1)'))
+            sweep_u_chart.add_trace(go.Scatterpolar(r=np.full(len(sweep_norths), sweep['target_wall_glazing_u']), theta=sweep_norths, mode='lines',
+                                                    name='DtS Target', line=dict(dash='dash', color='lightslategray')))
+            sweep_u_chart.update_layout(title = "Wall Glazing U-Value W/m².K vs North Angle", polar = sweep_polar)
+            st.plotly_chart(sweep_u_chart, use_container_width=True)
+        with cols[1]:
+            sweep_ac_chart = go.Figure()
+            sweep_ac_chart.add_trace(go.Scatterpolar(r=sweep['proposed_ac_energy'], theta=sweep_norths, mode='lines', name='Proposed Design'))
+            sweep_ac_chart.add_trace(go.Scatterpolar(r=sweep['reference_ac_energy'], theta=sweep_norths, mode='lines', name='DtS Reference',
+                                                     line=dict(dash='dash', color='lightslategray')))
+            sweep_ac_chart.update_layout(title = "AC Energy Value vs North Angle", polar = sweep_polar)
+            st.plotly_chart(sweep_ac_chart, use_container_width=True)
+
+        sweep_data = DataFrame({'North Angle (°)': sweep_norths})
+        for i, orientation in enumerate(ncc19.ORIENTATIONS):
+            sweep_data[f'WWR-{orientation} (%)'] = sweep['wwr'][:, i]
+        sweep_data['Max Wall Glazing U-Value'] = sweep['wall_glazing_u'].max(axis=1)
+        sweep_data['Max Solar Admittance'] = sweep['solar_admittance'].max(axis=1)
+        sweep_data['Wall Glazing U-Value Total'] = np.round(sweep['wall_glazing_u_total'], 2)
+        sweep_data['Proposed AC Energy'] = np.round(sweep['proposed_ac_energy'], 2)
+        sweep_data['Reference AC Energy'] = np.round(sweep['reference_ac_energy'], 2)
+        sweep_data['Method 1'] = [ncc19.compliance_text(c) for c in sweep['method1_compliance']]
+        sweep_data['Method 2'] = [ncc19.compliance_text(c) for c in sweep['method2_compliance']]
+
+        #consecutive north angles with the same outcome are grouped into one range
+        sweep_group = (sweep_data[['Method 1','Method 2']] != sweep_data[['Method 1','Method 2']].shift()).any(axis=1).cumsum()
+        sweep_ranges = sweep_data.groupby(sweep_group).agg(**{
+            'From (°)': ('North Angle (°)', 'first'),
+            'To (°)': ('North Angle (°)', 'last'),
+            'Method 1': ('Method 1', 'first'),
+            'Method 2': ('Method 2', 'first')}).reset_index(drop=True)
+
+        cols = st.columns([2,3])
+        with cols[0]:
+            st.dataframe(sweep_ranges, use_container_width=True, hide_index=True)
+        with cols[1]:
+            st.dataframe(sweep_data.set_index('North Angle (°)'), use_container_width=True)
+
+    #Specification sweep: every R-value, U-value and SHGC combination in one batch
+    if spec_sweep:
+        st.subheader("Specification Sweep:")
+        with stage('specification sweep'):
+            spec = ncc19.specification_sweep(model_faces_vertical['Face Area (m2)'].values, model_apertures['Aperture Area (m2)'].values,
+                                             ncc19.BUILDING_CLASSES[building_class], ncc19.CLIMATE_ZONES[climate_zone],
+                                             np.round(np.arange(sweep_wall_r[0], sweep_wall_r[1] + 0.05, 0.1), 2),
+                                             np.round(np.arange(sweep_glass_u[0], sweep_glass_u[1] + 0.05, 0.1), 2),
+                                             np.round(np.arange(sweep_glass_shgc[0], sweep_glass_shgc[1] + 0.005, 0.01), 2))
+
+        cols = st.columns(3)
+        with cols[0]:
+            st.metric("Combinations Evaluated", len(spec['compliance']))
+        with cols[1]:
+            st.metric("Compliant Combinations", int(spec['compliance'].sum()))
+        with cols[2]:
+            st.metric("Least Demanding Specifications", int(spec['pareto'].sum()))
+
+        pareto = spec['pareto']
+        spec_pareto = DataFrame({
+            'External Wall R-value': spec['ex_wall_r'][pareto],
+            'Glass U-value': spec['glass_u'][pareto],
+            'Glass SHGC': spec['glass_shgc'][pareto],
+            'Wall Glazing U-Value Total': np.round(spec['wall_glazing_u_total'][pareto], 2),
+            'Total UA (W/K)': np.round(spec['ua'][pareto].sum(axis=1), 2),
+            'Proposed AC Energy': np.round(spec['proposed_ac_energy'][pareto], 2),
+            'Method 1': [ncc19.compliance_text(c) for c in spec['method1_compliance'][pareto]],
+            'Method 2': [ncc19.compliance_text(c) for c in spec['method2_compliance'][pareto]]})
+
+        if spec_pareto.empty:
+            st.markdown("**:red[No compliant specification in the selected ranges.]**")
+        else:
+            st.markdown("**Compliant specifications with no other compliant option that has a lower wall R-value, a higher glass U-value and a higher glass SHGC:**")
+            st.dataframe(spec_pareto, use_container_width=True, hide_index=True)
 
+    #Report details, the report itself is only built when requested
     cols = st.columns(4)
     with cols[0]:
-        project_name = st.text_input("**Building Name / Address:**", value = f'{callback_once().display_name}')
+        project_name = st.text_input("**Building Name / Address:**", value = f'{model_entry.display_name}')
     with cols[1]:
         name = st.text_input("**Your Name / Position:**", value = 'Your Name/Position is required!')
     with cols[2]:
@@ -1009,79 +519,66 @@ if st.session_state.get_hbjson is not None and target_rooms_index != []:
     with cols[3]:
         levels = st.text_input("**Storeys Above Ground:**", value = 1)
 
-    header = NCC19.sections[0].header
-
-    header.paragraphs[0].text = f'NCC19 Facade Calculator | Date: {Date} | Approved by: {name}'
-    NCC19.add_heading(f'NCC 2019 DtS Project Summary for {project_name}', 0)
-    NCC19.add_paragraph('The summary below provides an overview of where compliance has been achieved for Specification J1.5a - Calculation of U-Value and solar admittance - Method 1 (Single Aspect) and Method 2 (Multiple Apects).')
-    NCC19.add_paragraph(f'This {building_class} located in {building_state} with a {climate_zone} in {levels} level(s)')
-    
-    paragraph = NCC19.add_paragraph()
-    entire_model = pd.concat([model_faces_vertical,model_apertures], axis = 1)
-    entire_model.reset_index(inplace = True)
-    entire_model.rename(columns={'index':'Face Direction'}, inplace= True)
-    t = NCC19.add_table(entire_model.shape[0]+1, entire_model.shape[1])
-
-    # Adding style to a table 
-    t.style = 'Medium Shading 1'
-
-    # add the header rows.
-    for j in range(entire_model.shape[-1]):
-        t.cell(0,j).text = entire_model.columns[j]
-
-    # add the rest of the data frame
-    for i in range(entire_model.shape[0]):
-        for j in range(entire_model.shape[-1]):
-            t.cell(i+1,j).text = str(entire_model.values[i,j])
-
-
-    NCC19.add_heading('METHOD 1:', 1)
-    paragraph = NCC19.add_paragraph()
-    run = paragraph.add_run()
-    run.add_picture('wall_glazing_u_bar.png', width=Inches(w_res), height= Inches(h_res))
-    run_2 = paragraph.add_run()
-    run_2.add_picture('sa_bar.png', width=Inches(w_res), height= Inches(h_res))
-    
-    NCC19.add_heading('METHOD 2:', 1)
-    paragraph = NCC19.add_paragraph()
-    run = paragraph.add_run()
-    run.add_picture('wall_glazing_u_total_bar.png', width=Inches(w_res), height= Inches(h_res))
-    run_2 = paragraph.add_run()
-    run_2.add_picture('AC_energy.png', width=Inches(w_res), height= Inches(h_res))
-
-    NCC19.add_paragraph('The minimum NCC19 DtS thermal envelope requirements are as follows:')
-    
-    t2 = NCC19.add_table(rows=1, cols=3)
-    t2_cells = t2.rows[0].cells
-    t2_cells[0].text = 'External Walls R-value'
-    t2_cells[1].text = 'Glass U-value'
-    t2_cells[2].text = 'Glass SHGC'
-    
-    row_cells = t2.add_row().cells
-    row_cells[0].text = f'{round(1/Reference_Building_wall_U_value,2)}'
-    row_cells[1].text = f'{Reference_Building_glazing_U_value}'
-    row_cells[2].text = f'{round(dts_shgc_total,2)}'
-
-    t2.style = 'Medium Shading 1'
-
-    NCC19.add_paragraph('')
-
-    p0 = NCC19.add_paragraph(f'Therefore, the proposed thermal envelope performance including an ')
-    
-    p0.add_run(f'External Wall R-value of {ex_wall_dts}, and Glass U-value & SHGC of {glass_u_dts} / {glass_shgc_dts}').bold= True
-    p0.add_run(' is a ')
-    p0.add_run(f'{method1_compliance}').bold= True
-    p0.add_run(' against NCC19 DtS Reference Method 1, and ')
-    p0.add_run(f'{method2_compliance}').bold= True
-    p0.add_run(' against NCC19 DtS Reference Method 2.')
-
-    # NCC19.add_heading(f'Project Details', 1)
-
-    buffer = io.BytesIO()
-    NCC19.save(buffer)
-    export_as_word = st.download_button(
-            label="Generate NCC19 Facade Calculator Report.docx",
-            data=buffer,
-            file_name=f'NCC19 Facade Calculator - {project_name}.docx',
-            mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
\ No newline at end of file
+    report_details = ReportDetails(project_name, name, str(Date), str(levels), building_class, building_state, climate_zone,
+                                   ex_wall_dts, glass_u_dts, glass_shgc_dts)
+    report_args = (ncc, orientation_rows(pd.concat([model_faces_vertical,model_apertures], axis = 1)), report_details)
+
+    if st.button("Generate NCC19 Facade Calculator Report.docx"):
+        st.session_state.report_args = report_args
+
+    #the download stays available until any input of the report changes
+    if st.session_state.get('report_args') == report_args:
+        with st.spinner('Generating the report...'), stage('report'):
+            report_bytes = ncc19_report(*report_args)
+        export_as_word = st.download_button(
+                label="Download NCC19 Facade Calculator Report.docx",
+                data=report_bytes,
+                file_name=f'NCC19 Facade Calculator - {project_name}.docx',
+                mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            )
+
+
+#Profile of this run, written to the scratch folder of the session with the model and the sidebar parameters
+profile_paths = None
+if st.session_state.get('profiler') is not None:
+    st.session_state.profiler.stop()
+    sidebar_parameters = {
+        'north': north_, 'facade_sectors': facade_sectors_, 'solve_adjacency': solve_adjacency,
+        'area_calc_method': area_calc_method, 'internal_walls': internal_walls,
+        'building_state': building_state, 'building_class': building_class, 'climate_zone': climate_zone,
+        'ex_wall_r': ex_wall_dts, 'glass_u': glass_u_dts, 'glass_shgc': glass_shgc_dts,
+        'north_sweep_step': sweep_step if north_sweep else None,
+        'spec_sweep_ranges': (sweep_wall_r, sweep_glass_u, sweep_glass_shgc) if spec_sweep else None}
+    uploaded = st.session_state.get_hbjson is not None
+    profile_paths = st.session_state.profiler.write(
+        st.session_state.scratch.joinpath('profiles'), f'run_{datetime.datetime.now():%Y%m%d_%H%M%S_%f}',
+        model_key=model_entry.key if uploaded else None, model_name=model_entry.display_name if uploaded else None,
+        parameters=sidebar_parameters)
+    st.session_state.profiler = None
+
+#Diagnostics: the stages of this run, recorded since the upload callback
+with st.sidebar:
+    with st.expander("Diagnostics", expanded = False):
+        st.checkbox("Trace Peak Memory", key = 'trace_memory',
+                    help = "Slows down every run while it is on. Peaks include the allocations of other sessions running at the same time.")
+        st.checkbox("Profile Runs", key = 'profile_runs', disabled = PROFILE_RUNS,
+                    help = "Writes a cProfile and a flame graph profile of every run to the scratch folder of the session while it is on. Always on when the server runs with SPACEXTRACT_PROFILE=1.")
+        if profile_paths is not None:
+            st.caption(f"Profile written to {profile_paths['json'].parent}")
+            for kind, label in (('prof', 'cProfile (.prof)'), ('collapsed', 'Flame Graph Stacks (.collapsed)')):
+                if kind in profile_paths:
+                    st.download_button(f"Download {label}", data=profile_paths[kind].read_bytes(),
+                                       file_name=profile_paths[kind].name, key=f'profile_{kind}')
+        run_stages = DataFrame(st.session_state.recorder.records())
+        if run_stages.empty:
+            st.caption("No stage ran in this run.")
+        else:
+            st.dataframe(DataFrame({
+                'Stage': ['\u2003' * depth + name for depth, name in zip(run_stages['depth'], run_stages['name'])],
+                'Wall (ms)': (run_stages['wall'] * 1000).round(1),
+                'CPU (ms)': (run_stages['cpu'] * 1000).round(1),
+                'Peak Memory (MB)': (pd.to_numeric(run_stages['peak_memory']) / 1024 ** 2).round(1)}),
+                use_container_width=True, hide_index=True)
+
+st.session_state.recorder.stop()
+st.session_state.recorder = None
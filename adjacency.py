@@ -0,0 +1,206 @@
+"""Adjacency solving of HBJSON rooms restricted to rooms that can touch.
+
+Model.solve_adjacency(intersect=True) splits every room against the geometry
+of every other room and then matches the faces of every pair of rooms, which
+grows with the square of the number of rooms although a room of a tower only
+touches the rooms of its own and of the next floors. Here the bounding boxes
+of the rooms are read from the HBJSON dictionary and sorted along one axis to
+find the pairs of rooms whose boxes overlap within the tolerance, and the
+intersection and the matching only run on those pairs. The intersection of a
+room only depends on the original geometry of its neighbours, so the rooms
+are split in chunks that can run in separate processes. The result is the
+same as the one of Model.solve_adjacency.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from honeybee.boundarycondition import Surface
+from honeybee.model import Model as HBModel
+from ladybug_geometry.geometry3d.polyface import Polyface3D
+
+from face_table import ORPHAN_KEYS, hbjson_tolerance
+from instrumentation import stage
+
+
+def room_bounds(rooms: list) -> tuple:
+    """Bounding boxes of room dictionaries as (rooms, 3) arrays of min and max points."""
+    mins = np.zeros((len(rooms), 3))
+    maxs = np.zeros((len(rooms), 3))
+    for i, room in enumerate(rooms):
+        points = np.array([p for face in room['faces'] for p in face['geometry']['boundary']], dtype=float)
+        mins[i] = points.min(axis=0)
+        maxs[i] = points.max(axis=0)
+    return mins, maxs
+
+
+def _sweep(mins: np.ndarray, maxs: np.ndarray, tolerance: float, axis: int) -> tuple:
+    # rooms sorted by their min along the axis, each one is followed by the
+    # rooms that start before it ends
+    order = np.argsort(mins[:, axis], kind='stable')
+    ends = np.searchsorted(mins[order, axis], maxs[order, axis] + tolerance, side='right')
+    return order, ends - np.arange(len(order)) - 1
+
+
+def candidate_pairs(mins: np.ndarray, maxs: np.ndarray, tolerance: float) -> np.ndarray:
+    """Pairs of rooms whose bounding boxes overlap within the tolerance.
+
+    The boxes are swept along the axis where the fewest of them overlap,
+    e.g. the vertical axis of a tower, and the overlaps of the other two axes
+    are checked on the pairs found.
+
+    Args:
+        mins: (rooms, 3) array of the min points of the room boxes.
+        maxs: (rooms, 3) array of the max points of the room boxes.
+        tolerance: Gap between two boxes under which they are considered
+            overlapping.
+
+    Returns:
+        (pairs, 2) int64 array of room indices (i, j) with i < j, sorted by i
+        and then by j.
+    """
+    sweeps = [_sweep(mins, maxs, tolerance, axis) for axis in range(3)]
+    order, counts = min(sweeps, key=lambda sweep: sweep[1].sum())
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    first = np.repeat(np.arange(len(order)), counts)
+    second = first + 1 + np.arange(counts.sum()) - offsets
+
+    a, b = order[first], order[second]
+    overlap = np.all((mins[a] <= maxs[b] + tolerance) & (mins[b] <= maxs[a] + tolerance), axis=1)
+    pairs = np.sort(np.column_stack([a[overlap], b[overlap]]), axis=1).astype(np.int64)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def neighbours(rooms: int, pairs: np.ndarray) -> list:
+    """Sorted indices of the rooms paired with each room."""
+    both = np.concatenate([pairs, pairs[:, ::-1]])
+    both = both[np.lexsort((both[:, 1], both[:, 0]))]
+    return np.split(both[:, 1], np.searchsorted(both[:, 0], np.arange(1, rooms)))
+
+
+def _split(rooms: list, split: list, others: list, tolerance: float, angle_tolerance: float):
+    # the geometry of the other rooms is taken before any of them is split,
+    # like Room.intersect_adjacency does
+    geometry = [room.geometry for room in rooms]
+    for i, room_others in zip(split, others):
+        rooms[i].coplanar_split([geometry[j] for j in room_others], tolerance, angle_tolerance)
+        rooms[i].remove_duplicate_faces(tolerance)
+
+
+def _match(rooms: list, pairs, tolerance: float):
+    # Room.solve_adjacency(rooms, tolerance, remove_mismatched_sub_faces=True) on the pairs only
+    for i, j in pairs:
+        room_1, room_2 = rooms[i], rooms[j]
+        if not Polyface3D.overlapping_bounding_boxes(room_1.geometry, room_2.geometry, tolerance):
+            continue
+        for face_1 in room_1._faces:
+            for face_2 in room_2._faces:
+                if isinstance(face_2.boundary_condition, Surface):
+                    continue
+                if face_1.geometry.is_centered_adjacent(face_2.geometry, tolerance):
+                    try:
+                        face_1.set_adjacency(face_2)
+                    except AssertionError:
+                        face_1.remove_sub_faces()
+                        face_2.remove_sub_faces()
+                        face_1.set_adjacency(face_2)
+                    break
+
+
+def _geometry_only(hbjson: dict, rooms: list) -> dict:
+    # the orphaned geometry is neither intersected nor matched
+    return {**{key: value for key, value in hbjson.items() if key not in ORPHAN_KEYS}, 'rooms': rooms}
+
+
+def intersect_rooms(hbjson: dict, split: list, others: list) -> list:
+    """Split some rooms of an HBJSON dictionary against their neighbours.
+
+    Only takes and returns plain dictionaries so it can run in a worker process.
+
+    Args:
+        hbjson: HBJSON dictionary holding the rooms to split and their neighbours.
+        split: Indices of the rooms to split.
+        others: Sorted indices of the neighbours of each room to split.
+
+    Returns:
+        The abridged dictionaries of the split rooms.
+    """
+    hb_model = HBModel.from_dict(hbjson)
+    rooms = list(hb_model.rooms)
+    _split(rooms, split, others, hb_model.tolerance, hb_model.angle_tolerance)
+    return [rooms[i].to_dict(abridged=True) for i in split]
+
+
+def match_rooms(hbjson: dict, pairs: list) -> list:
+    """Match the faces of pairs of rooms of an HBJSON dictionary and return the abridged rooms."""
+    hb_model = HBModel.from_dict(hbjson)
+    rooms = list(hb_model.rooms)
+    _match(rooms, pairs, hb_model.tolerance)
+    return [room.to_dict(abridged=True) for room in rooms]
+
+
+def intersect_and_match(hbjson: dict, pairs: list) -> list:
+    """Split and match the rooms of an HBJSON dictionary in one go and return the abridged rooms."""
+    hb_model = HBModel.from_dict(hbjson)
+    rooms = list(hb_model.rooms)
+    _split(rooms, range(len(rooms)), neighbours(len(rooms), np.array(pairs, dtype=np.int64).reshape(-1, 2)),
+           hb_model.tolerance, hb_model.angle_tolerance)
+    _match(rooms, pairs, hb_model.tolerance)
+    return [room.to_dict(abridged=True) for room in rooms]
+
+
+def solve_adjacency(hbjson: dict, run=None, chunks: int = 1) -> tuple:
+    """Intersect and solve the adjacencies of the rooms of an HBJSON dictionary.
+
+    Args:
+        hbjson: HBJSON dictionary. It is not changed.
+        run: Optional function run(fn, *args) used to run the intersection
+            elsewhere, e.g. WorkerPool.run of a user. It is called from
+            several threads at once when there is more than one chunk.
+        chunks: Number of chunks of rooms intersected at the same time. The
+            faces are then matched in one more job. With one chunk the rooms
+            are intersected and matched in a single job.
+
+    Returns:
+        A tuple with the abridged room dictionaries with solved adjacencies
+        and a dictionary of statistics: the number of rooms, of all pairs of
+        rooms and of candidate pairs, the number of chunks, the seconds spent
+        on the spatial index and the total seconds.
+    """
+    run = run or (lambda fn, *args: fn(*args))
+    start = time.perf_counter()
+    rooms = hbjson.get('rooms') or []
+    with stage('adjacency index'):
+        mins, maxs = room_bounds(rooms)
+        #both boxes are grown by the tolerance so no pair honeybee would look at is missed
+        pairs = candidate_pairs(mins, maxs, 2 * hbjson_tolerance(hbjson))
+    index_seconds = time.perf_counter() - start
+
+    chunks = max(1, min(chunks, len(rooms)))
+    if chunks == 1:
+        solved = run(intersect_and_match, _geometry_only(hbjson, rooms), pairs.tolist())
+    else:
+        room_neighbours = neighbours(len(rooms), pairs)
+
+        def intersect_chunk(split: np.ndarray) -> list:
+            # each job gets the rooms it splits and their neighbours, in model order
+            needed = np.union1d(split, np.concatenate([room_neighbours[i] for i in split]))
+            position = {room: k for k, room in enumerate(needed.tolist())}
+            others = [[position[j] for j in room_neighbours[i].tolist()] for i in split]
+            return run(intersect_rooms, _geometry_only(hbjson, [rooms[i] for i in needed.tolist()]),
+                       [position[i] for i in split.tolist()], others)
+
+        with ThreadPoolExecutor(chunks) as threads:
+            split_rooms = [room for chunk in threads.map(intersect_chunk, np.array_split(np.arange(len(rooms)), chunks))
+                           for room in chunk]
+        solved = run(match_rooms, _geometry_only(hbjson, split_rooms), pairs.tolist())
+
+    stats = {
+        'rooms': len(rooms),
+        'all_pairs': len(rooms) * (len(rooms) - 1) // 2,
+        'candidate_pairs': len(pairs),
+        'chunks': chunks,
+        'index_seconds': index_seconds,
+        'seconds': time.perf_counter() - start
+    }
+    return solved, stats
@@ -0,0 +1,86 @@
+"""Benchmark of the adjacency solving of a tower of box rooms.
+
+Compares Model.solve_adjacency(intersect=True), which considers every pair
+of rooms, with adjacency.solve_adjacency, which only intersects and matches
+the pairs of rooms whose bounding boxes overlap, split in chunks run in a
+pool of processes. Every other floor is shifted by half a room so the faces
+between floors have to be split.
+
+Example:
+    python benchmarks/bench_adjacency.py --floors 20 --rooms-x 4 --rooms-y 3 --chunks 4
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from honeybee.model import Model as HBModel
+from honeybee.room import Room
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from adjacency import solve_adjacency
+from face_table import hbjson_face_table
+from model_cache import solved_copy
+
+
+def tower(floors: int, rooms_x: int, rooms_y: int, width: float = 5, depth: float = 4, height: float = 3.5) -> dict:
+    """HBJSON dictionary of a tower of box rooms with windows on the south facade."""
+    rooms = []
+    for floor in range(floors):
+        shift = width / 2 if floor % 2 else 0
+        for i in range(rooms_x):
+            for j in range(rooms_y):
+                room = Room.from_box(f'Room_{floor}_{i}_{j}', width, depth, height,
+                                     origin=Point3D(i * width + shift, j * depth, floor * height))
+                for face in room.faces:
+                    if j == 0 and face.normal.y < -0.5:
+                        face.apertures_by_ratio(0.4)
+                rooms.append(room)
+    return HBModel('Tower', rooms, tolerance=0.01).to_dict()
+
+
+def timed(function) -> tuple:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--floors', type=int, default=20)
+    parser.add_argument('--rooms-x', type=int, default=4)
+    parser.add_argument('--rooms-y', type=int, default=3)
+    parser.add_argument('--chunks', type=int, default=4)
+    args = parser.parse_args(argv)
+
+    hbjson = tower(args.floors, args.rooms_x, args.rooms_y)
+    print(f"{len(hbjson['rooms'])} rooms on {args.floors} floors")
+
+    reference, all_pairs_time = timed(
+        lambda: [room.to_dict(abridged=True) for room in solved_copy(HBModel.from_dict(hbjson)).rooms])
+    print(f'  Model.solve_adjacency:  {all_pairs_time:9.2f} s')
+
+    rooms, stats = solve_adjacency(hbjson)
+    print(f"  candidate pairs:        {stats['candidate_pairs']:9d} of {stats['all_pairs']} "
+          f"(index in {stats['index_seconds'] * 1000:.1f} ms)")
+    print(f"  candidate pairs only:   {stats['seconds']:9.2f} s  ({all_pairs_time / stats['seconds']:6.1f}x)")
+
+    with ProcessPoolExecutor(args.chunks) as pool:
+        pool.submit(int).result()  # start the workers before timing
+        chunked, chunked_stats = solve_adjacency(hbjson, lambda fn, *a: pool.submit(fn, *a).result(), args.chunks)
+    print(f"  {args.chunks} chunks in processes: {chunked_stats['seconds']:9.2f} s  "
+          f"({all_pairs_time / chunked_stats['seconds']:6.1f}x)")
+
+    #chunked rooms are read back from dictionaries, which only moves the origin of the split face planes
+    tables = [hbjson_face_table({**hbjson, 'rooms': r}) for r in (reference, rooms, chunked)]
+    print(f'  identical rooms: {rooms == reference}')
+    print(f'  identical face tables: '
+          f'{all(np.array_equal(t.area, tables[0].area) and np.array_equal(t.boundary_condition, tables[0].boundary_condition) for t in tables)}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
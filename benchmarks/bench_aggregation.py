@@ -0,0 +1,115 @@
+"""Benchmark of the per-room aggregation of face areas.
+
+Compares the DataFrame construction the app used to run (one
+DataFrame([room_id, values]).transpose().sort_values().groupby().sum() per
+metric, on object columns) with the FaceTable.room_sums aggregation of all
+metrics at once, and with a single np.bincount over (room, metric) pairs.
+
+Example:
+    python benchmarks/bench_aggregation.py --faces 100000 --rooms 10000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pandas import DataFrame
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from face_table import FaceTable
+
+
+def random_table(faces: int, rooms: int, seed: int = 0) -> FaceTable:
+    """FaceTable of random faces grouped by room, a fifth of them apertures."""
+    rng = np.random.default_rng(seed)
+    room = np.sort(rng.integers(0, rooms, faces))
+    angle = rng.uniform(0, 2 * np.pi, faces)
+    normal = np.column_stack([np.sin(angle), np.cos(angle), np.zeros(faces)])
+    return FaceTable(
+        [f'Room {i}' for i in range(rooms)], rng.random(rooms) < 0.7, ['Office'] * rooms, rng.uniform(50, 500, rooms),
+        room, rng.random(faces) < 0.2, rng.integers(0, 3, faces), rng.integers(0, 3, faces),
+        rng.uniform(1, 40, faces), normal)
+
+
+def metric_columns(table: FaceTable) -> dict:
+    """Masks and values of the per-room metrics of envelope_from_table."""
+    face = ~table.is_aperture
+    outdoors = table.boundary_condition_mask('Outdoors')
+    ground = table.boundary_condition_mask('Ground')
+    wall = table.face_type_mask('Wall')
+    roof = table.face_type_mask('RoofCeiling')
+    area_2 = np.round(table.area, 2)
+    return {
+        'floor': (face & table.face_type_mask('Floor'), None),
+        'exterior_roof': (face & outdoors & roof, None),
+        'exterior_skylight': (table.is_aperture & outdoors & roof, None),
+        'exterior_wall': (face & outdoors & wall, None),
+        'exterior_aperture': (table.is_aperture & outdoors, None),
+        'internal_wall': (face & table.boundary_condition_mask('Surface') & (table.azimuth > 0), area_2),
+        'underground_wall': (face & ground & wall, area_2),
+        'underground_roof': (face & ground & roof, area_2)
+    }
+
+
+def legacy_sums(table: FaceTable, columns: dict) -> dict:
+    """The previous construction: per-face lists and one transposed groupby per metric."""
+    room_id = [table.room_names[i] for i in table.room.tolist()]
+    sums = {}
+    for name, (mask, values) in columns.items():
+        values = table.area if values is None else values
+        metric = [v if m else 0 for m, v in zip(mask.tolist(), values.tolist())]
+        frame = DataFrame([room_id, metric], ['ROOM_ID', name]).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
+        sums[name] = frame[name]
+    return sums
+
+
+def pair_sums(table: FaceTable, columns: dict) -> np.ndarray:
+    """All metrics in a single np.bincount over (room, metric) pairs."""
+    masks = np.stack([mask for mask, _ in columns.values()], axis=1)
+    values = np.stack([table.area if values is None else values for _, values in columns.values()], axis=1)
+    bins = table.room.astype(np.int64)[:, None] * len(columns) + np.arange(len(columns))
+    sums = np.bincount(bins.ravel(), weights=np.where(masks, values, 0.0).ravel(), minlength=len(table.room_names) * len(columns))
+    return sums.reshape(-1, len(columns))
+
+
+def best_of(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--faces', type=int, default=100000)
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    table = random_table(args.faces, args.rooms)
+    columns = metric_columns(table)
+    print(f'{args.faces} faces in {args.rooms} rooms, {len(columns)} metrics, '
+          f'{table.nbytes / table.rows:.0f} bytes per row')
+
+    legacy_time = best_of(lambda: legacy_sums(table, columns), max(1, args.repeat // 5))
+    print(f'  transposed groupbys:    {legacy_time * 1000:9.2f} ms')
+    room_sums_time = best_of(lambda: table.room_sums(list(columns.values())), args.repeat)
+    print(f'  FaceTable.room_sums:    {room_sums_time * 1000:9.2f} ms  ({legacy_time / room_sums_time:6.1f}x)')
+    pairs_time = best_of(lambda: pair_sums(table, columns), args.repeat)
+    print(f'  bincount of pairs:      {pairs_time * 1000:9.2f} ms  ({legacy_time / pairs_time:6.1f}x)')
+
+    #the legacy frames are sorted by room name, the aggregation is in room order
+    sums = table.room_sums(list(columns.values()))
+    legacy = legacy_sums(table, columns)
+    agree = all(np.allclose(legacy[name].reindex(table.room_names).fillna(0).astype(float), sums[:, i])
+                for i, name in enumerate(columns))
+    print(f'  agreement with the transposed groupbys: {agree}')
+    print(f'  bincount of pairs identical: {np.array_equal(pair_sums(table, columns), sums)}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Benchmark of the orientation binning of facade normals.
+
+Compares the per-face loop the app used to run (one Vector2D per face and a
+chained if/elif on the azimuth) with the vectorised envelope.orientation_bins
+for 4, 8 and 16 sectors.
+
+Example:
+    python benchmarks/bench_orientation.py --faces 50000 --north 30
+"""
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from ladybug_geometry.geometry2d.pointvector import Vector2D
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from envelope import SECTOR_NAMES, orientation_bins
+
+
+def random_normals(faces: int, seed: int = 0) -> np.ndarray:
+    """Unit normals of vertical faces, a quarter of them facing exactly N/E/S/W."""
+    rng = np.random.default_rng(seed)
+    angle = rng.uniform(0, 2 * np.pi, faces)
+    angle[::4] = rng.integers(0, 4, len(angle[::4])) * np.pi / 2
+    return np.column_stack([np.sin(angle), np.cos(angle), np.zeros(faces)])
+
+
+def legacy_bins(normals: np.ndarray, north: float) -> list:
+    """The previous loop: one Vector2D per face and the N/E/S/W if/elif chain."""
+    vectors = [math.cos(math.radians(north + 90)), math.sin(math.radians(north + 90))]
+    bins = []
+    for nx, ny, _ in normals.tolist():
+        azimuth = math.degrees(Vector2D(vectors[0], vectors[1]).angle_clockwise(Vector2D(nx, ny)))
+        if azimuth <= 45 or azimuth > 315:
+            bins.append('North')
+        elif azimuth > 45 and azimuth <= 135:
+            bins.append('East')
+        elif azimuth > 135 and azimuth <= 225:
+            bins.append('South')
+        elif azimuth > 225 and azimuth <= 315:
+            bins.append('West')
+    return bins
+
+
+def best_of(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--faces', type=int, default=50000)
+    parser.add_argument('--north', type=float, default=30.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    normals = random_normals(args.faces)
+    legacy_time = best_of(lambda: legacy_bins(normals, args.north), args.repeat)
+    print(f'{args.faces} faces, north {args.north}°')
+    print(f'  legacy loop (4 sectors):  {legacy_time * 1000:9.2f} ms')
+
+    for sectors in SECTOR_NAMES:
+        vector_time = best_of(lambda: orientation_bins(normals, args.north, sectors), args.repeat)
+        print(f'  vectorised ({sectors:2d} sectors): {vector_time * 1000:9.2f} ms  ({legacy_time / vector_time:6.1f}x)')
+
+    names = np.array(SECTOR_NAMES[4])[orientation_bins(normals, args.north, 4)]
+    agree = np.mean(names == np.array(legacy_bins(normals, args.north)))
+    print(f'  agreement with the legacy loop: {agree:.2%}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
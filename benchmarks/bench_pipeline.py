@@ -0,0 +1,199 @@
+"""Benchmark of the stages of the pipeline on synthetic buildings of increasing size.
+
+Each building of benchmarks/synthetic.py is run through the same code as an
+upload of the app: parse, upload (hash, HBJSON file and face table),
+adjacency, extraction, orientation binning, compliance, vtkjs and report.
+Every stage is timed with the StageRecorder of instrumentation, and the
+stages the library marks inside them are kept as 'stage/inner stage'. The
+best wall and CPU times of the repeats are written to a JSON file, which
+can be compared with a baseline written by an earlier run.
+
+Example:
+    python benchmarks/bench_pipeline.py --rooms 10 100 1000 20000 -o results.json
+    python benchmarks/bench_pipeline.py --rooms 10 100 1000 --baseline results.json --threshold 0.2
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+import charts
+import ncc19
+from adjacency import solve_adjacency
+from envelope import envelope_from_table, facade_sectors, orientation_sweep
+from instrumentation import StageRecorder, stage
+from model_cache import ModelCache, write_vtkjs
+from report import ReportDetails, ncc19_report, orientation_rows
+from synthetic import spec_for_rooms, write_building
+
+#stages the others do not depend on
+OPTIONAL_STAGES = ('adjacency', 'vtkjs', 'report')
+
+
+def clear_caches():
+    """Forget the results memoised by a previous repeat."""
+    ncc19._evaluate_cached.cache_clear()
+    charts.ncc19_charts.cache_clear()
+    charts._png_cache.clear()
+    ncc19_report.cache_clear()
+
+
+def run_pipeline(hbjson_path: Path, folder: Path, skip: tuple = (), adjacency_max_rooms: int = 2000) -> dict:
+    """Run the stages on one HBJSON file and return their records keyed by stage path.
+
+    A stage that fails is recorded with its error instead of its times, e.g.
+    the report without Kaleido, and the stages after it still run.
+    """
+    recorder = StageRecorder()
+    errors = {}
+
+    def run(name, function):
+        if name in skip:
+            return None
+        try:
+            with stage(name):
+                return function()
+        except Exception as e:
+            errors[name] = f'{type(e).__name__}: {" ".join(str(e).split())}'
+
+    with recorder:
+        hbjson = run('parse', lambda: json.loads(Path(hbjson_path).read_text()))
+        entry = run('upload', lambda: ModelCache(folder).get(hbjson))
+        table = entry.get_face_table() if entry is not None else None
+        if len(hbjson['rooms']) <= adjacency_max_rooms:
+            run('adjacency', lambda: solve_adjacency(hbjson))
+        envelope = run('extraction', lambda: envelope_from_table(table))
+
+        def orientation():
+            facade_sectors(table, sectors=16)
+            return orientation_sweep(table, np.arange(0, 360, 1.0))
+        sweep = run('orientation', orientation)
+
+        def compliance():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ncc19.evaluate_arrays(*sweep, 5, 2, 1.4, 3.5, 0.5)
+            return ncc19.evaluate_orientations(envelope['model_faces_vertical'].join(envelope['model_apertures']),
+                                               5, 2, 1.4, 3.5, 0.5)
+        ncc = run('compliance', compliance)
+        run('vtkjs', lambda: write_vtkjs(entry.hbjson_paths[False].as_posix(), folder.as_posix(), 'model'))
+        run('report', lambda: ncc19_report(
+            ncc, orientation_rows(envelope['model_faces_vertical'].join(envelope['model_apertures'])),
+            ReportDetails('Synthetic', 'Benchmark', '', '', 'Class 5', 'QLD', 'Climate Zone 2', 1.4, 3.5, 0.5)))
+
+    records, path = {}, []
+    for record in recorder.records():
+        path[record['depth']:] = [record['name']]
+        records.setdefault('/'.join(path), {'wall': record['wall'], 'cpu': record['cpu']})
+    for name, error in errors.items():
+        records[name] = {'error': error}
+    return records
+
+
+def best_records(runs: list) -> dict:
+    """Best wall and CPU time of each stage over the repeats, errors kept as they are."""
+    best = {}
+    for records in runs:
+        for name, record in records.items():
+            if name in best and 'error' not in best[name] and 'error' not in record:
+                best[name] = {key: min(best[name][key], record[key]) for key in ('wall', 'cpu')}
+            elif 'error' not in best.get(name, {}):
+                best[name] = dict(record)
+    return best
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> list:
+    """Stages of the results that are slower than the baseline.
+
+    A stage is a regression when its wall time is more than threshold (a
+    fraction) above the baseline and the difference is above min_seconds,
+    which keeps the noise of very short stages out.
+
+    Returns:
+        A list of (model, stage, baseline seconds, seconds) tuples.
+    """
+    regressions = []
+    for model, result in results['models'].items():
+        base = baseline['models'].get(model)
+        if base is None:
+            continue
+        for name, record in result['stages'].items():
+            base_record = base['stages'].get(name, {})
+            if 'wall' not in record or 'wall' not in base_record:
+                continue
+            if record['wall'] > base_record['wall'] * (1 + threshold) and record['wall'] - base_record['wall'] > min_seconds:
+                regressions.append((model, name, base_record['wall'], record['wall']))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--rooms-per-floor', type=int, default=None)
+    parser.add_argument('--underground', type=int, default=1)
+    parser.add_argument('--wwr', type=float, default=0.4)
+    parser.add_argument('--skylights', type=float, default=0.1)
+    parser.add_argument('--shade-depth', type=float, default=0.5)
+    parser.add_argument('--skip', nargs='+', choices=OPTIONAL_STAGES, default=[])
+    parser.add_argument('--adjacency-max-rooms', type=int, default=2000,
+                        help='Largest building whose adjacencies are solved.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--models', default=Path(tempfile.gettempdir()).joinpath('spacextract_bench').as_posix(),
+                        help='Folder where the synthetic buildings are kept between runs.')
+    parser.add_argument('-o', '--output', default=None, help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', default=None, help='Compare the results with this JSON file.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Slowdown over the baseline, as a fraction, flagged as a regression.')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='Slowdowns shorter than this are never flagged.')
+    args = parser.parse_args(argv)
+
+    results = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'models': {}
+    }
+    for rooms in args.rooms:
+        spec = spec_for_rooms(rooms, args.rooms_per_floor, underground=args.underground, wwr=args.wwr,
+                              skylights=args.skylights, shade_depth=args.shade_depth)
+        hbjson_path = write_building(spec, args.models)
+        runs = []
+        for _ in range(args.repeat):
+            clear_caches()
+            with tempfile.TemporaryDirectory() as folder:
+                runs.append(run_pipeline(hbjson_path, Path(folder), tuple(args.skip), args.adjacency_max_rooms))
+        stages = best_records(runs)
+        results['models'][spec.name] = {'rooms': spec.rooms, 'spec': asdict(spec), 'stages': stages}
+
+        print(f'{spec.name} ({spec.rooms} rooms)')
+        for name, record in stages.items():
+            if 'error' in record:
+                print(f"  {name:<30} failed: {record['error']}")
+            else:
+                print(f"  {name:<30} {record['wall'] * 1000:10.1f} ms  (CPU {record['cpu'] * 1000:.1f} ms)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for model, name, base_seconds, seconds in regressions:
+            print(f'REGRESSION {model} {name}: {base_seconds * 1000:.1f} ms -> {seconds * 1000:.1f} ms '
+                  f'(+{(seconds / base_seconds - 1) * 100:.0f}%)')
+        print(f'{len(regressions)} regression(s) above {args.threshold * 100:.0f}% against {args.baseline}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
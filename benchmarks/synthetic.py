@@ -0,0 +1,140 @@
+"""Synthetic Honeybee models of parametric buildings for the benchmarks.
+
+A building is a grid of box rooms repeated on every storey, with windows on
+the perimeter walls, optional skylights on the roof, optional shades around
+the windows and optional underground levels. The rooms above ground are
+conditioned offices and the underground levels are unconditioned. Honeybee
+gives the faces at or below the ground plane a Ground boundary condition,
+and the adjacencies between the rooms are left unsolved.
+
+Example:
+    python benchmarks/synthetic.py --rooms 1000 --wwr 0.5 --underground 2 -o ./models
+"""
+import argparse
+import math
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from honeybee.model import Model as HBModel
+from honeybee.room import Room
+from honeybee_energy.lib.programtypes import office_program
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from hbjson_stream import write_hbjson
+
+
+@dataclass(frozen=True)
+class BuildingSpec:
+    """Parameters of a synthetic building.
+
+    storeys is the number of storeys above ground and underground the number
+    of levels below it, each with rooms_per_floor rooms laid out on a grid as
+    close to square as possible. wwr is the window to wall ratio of the
+    perimeter walls, skylights the skylight to roof ratio of the top storey
+    and shade_depth the depth of the shades extruded around the windows (no
+    skylights or shades when 0).
+    """
+    storeys: int = 1
+    rooms_per_floor: int = 1
+    underground: int = 0
+    wwr: float = 0.4
+    skylights: float = 0.0
+    shade_depth: float = 0.0
+    room_width: float = 6.0
+    room_depth: float = 5.0
+    floor_height: float = 3.5
+
+    @property
+    def rooms(self) -> int:
+        return (self.storeys + self.underground) * self.rooms_per_floor
+
+    @property
+    def grid(self) -> tuple:
+        """Number of rooms along x and y of each floor."""
+        rooms_x = math.ceil(math.sqrt(self.rooms_per_floor))
+        return rooms_x, math.ceil(self.rooms_per_floor / rooms_x)
+
+    @property
+    def name(self) -> str:
+        return (f'building_{self.storeys}s{self.underground}u_{self.rooms_per_floor}r_wwr{self.wwr:g}'
+                f'_sky{self.skylights:g}_shade{self.shade_depth:g}')
+
+
+def spec_for_rooms(rooms: int, rooms_per_floor: int = None, **parameters) -> BuildingSpec:
+    """BuildingSpec with about the given number of rooms, the underground levels included.
+
+    By default the floor plates grow with the square root of the number of
+    rooms, from a single storey of 10 rooms to 71 levels of 283 rooms for
+    20,000 rooms. Buildings smaller than rooms_per_floor have a single storey
+    and the other parameters are passed on to BuildingSpec.
+    """
+    if rooms_per_floor is None:
+        rooms_per_floor = max(10, round(2 * math.sqrt(rooms)))
+    rooms_per_floor = max(1, min(rooms, rooms_per_floor))
+    levels = max(1, round(rooms / rooms_per_floor))
+    underground = min(parameters.pop('underground', 0), levels - 1)
+    return BuildingSpec(levels - underground, rooms_per_floor, underground, **parameters)
+
+
+def building(spec: BuildingSpec) -> dict:
+    """HBJSON dictionary of a synthetic building."""
+    rooms_x, rooms_y = spec.grid
+    rooms = []
+    for level in range(-spec.underground, spec.storeys):
+        for k in range(spec.rooms_per_floor):
+            i, j = k % rooms_x, k // rooms_x
+            room = Room.from_box(f'Room_L{level}_{i}_{j}', spec.room_width, spec.room_depth, spec.floor_height,
+                                 origin=Point3D(i * spec.room_width, j * spec.room_depth, level * spec.floor_height))
+            if level >= 0:
+                room.properties.energy.program_type = office_program
+                room.properties.energy.add_default_ideal_air()
+                for face in room.faces:
+                    normal = face.normal
+                    perimeter = (normal.x < -0.5 and i == 0) or (normal.x > 0.5 and (i == rooms_x - 1 or k == spec.rooms_per_floor - 1)) or \
+                        (normal.y < -0.5 and j == 0) or (normal.y > 0.5 and (j == rooms_y - 1 or k + rooms_x >= spec.rooms_per_floor))
+                    roof = normal.z > 0.5 and level == spec.storeys - 1
+                    if perimeter and spec.wwr > 0:
+                        face.apertures_by_ratio(spec.wwr)
+                    elif roof and spec.skylights > 0:
+                        face.apertures_by_ratio(spec.skylights)
+                    if spec.shade_depth > 0 and perimeter:
+                        for aperture in face.apertures:
+                            aperture.extruded_border(spec.shade_depth)
+            rooms.append(room)
+    return HBModel(spec.name, rooms, units='Meters', tolerance=0.01, angle_tolerance=1.0).to_dict()
+
+
+def write_building(spec: BuildingSpec, folder: Path) -> Path:
+    """Write the HBJSON file of a synthetic building to folder, unless it is there already."""
+    hbjson_path = Path(folder).joinpath(f'{spec.name}.hbjson')
+    if not hbjson_path.is_file():
+        Path(folder).mkdir(parents=True, exist_ok=True)
+        # written next to the target first so an interrupted run never leaves half a model
+        temp_path = hbjson_path.with_suffix('.tmp')
+        write_hbjson(building(spec), temp_path)
+        temp_path.replace(hbjson_path)
+    return hbjson_path
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rooms', type=int, nargs='+', default=[100])
+    parser.add_argument('--rooms-per-floor', type=int, default=None)
+    parser.add_argument('--underground', type=int, default=0)
+    parser.add_argument('--wwr', type=float, default=0.4)
+    parser.add_argument('--skylights', type=float, default=0.0)
+    parser.add_argument('--shade-depth', type=float, default=0.0)
+    parser.add_argument('-o', '--output', default='.')
+    args = parser.parse_args(argv)
+
+    for rooms in args.rooms:
+        spec = spec_for_rooms(rooms, args.rooms_per_floor, underground=args.underground, wwr=args.wwr,
+                              skylights=args.skylights, shade_depth=args.shade_depth)
+        print(write_building(spec, args.output), asdict(spec))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,188 @@
+"""Plotly figures of the NCC19 facade calculator.
+
+The figures only depend on an NCC19Result, so they are built once per result
+and reused on every rerun that does not change the compliance inputs, e.g.
+when the report header fields are edited. The cached figures are shared and
+must not be modified by the caller.
+
+PNG images are rendered in memory, never through files, by the Kaleido
+process that plotly keeps running for the whole server, and cached by the
+content hash of the figure.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import plotly.graph_objects as go
+import plotly.io.kaleido as pio_kaleido
+
+from ncc19 import ORIENTATIONS, NCC19Result
+
+
+def wall_glazing_u_chart(result: NCC19Result) -> go.Figure:
+    """Bar chart of the wall-glazing U-value per orientation (Method 1)."""
+    target_wall_glazing_U = result.target_wall_glazing_u
+    wall_glazing_u_value = list(result.wall_glazing_u)
+
+    wall_glazing_u_bar = go.Figure(data=[go.Bar(x=ORIENTATIONS,
+                                            y=wall_glazing_u_value,marker_color='lightslategray',text=wall_glazing_u_value)])
+
+    wall_glazing_u_bar.update_layout(
+                yaxis = dict(title = "Wall Glazing U-Value W/m².K"),
+                shapes=[
+                    {
+                        'type': 'line',
+                        'xref': 'paper',
+                        'x0': 0,
+                        'y0': target_wall_glazing_U,
+                        'x1': 1,
+                        'y1': target_wall_glazing_U,
+                        'line': {
+                            'color': 'rgb(50, 171, 96)',
+                            'width': 2,
+                            'dash': 'dash',
+                        },
+                    },
+                ],
+                    )
+    wall_glazing_u_bar.add_annotation(
+        x=0
+        , y=target_wall_glazing_U
+        , text=f'DtS Threshold'
+        , yanchor='bottom'
+        , showarrow=True
+        , arrowhead=1
+        , arrowsize=1
+        , arrowwidth=2
+        , arrowcolor="#636363"
+        , ax=-20
+        , ay=-30
+        , font=dict(size=15, color="black", family="Arial")
+        , align="left"
+        ,)
+    return wall_glazing_u_bar
+
+
+def solar_admittance_chart(result: NCC19Result) -> go.Figure:
+    """Bar chart of the solar admittance per orientation against the DtS threshold (Method 1)."""
+    solar_admittance = result.by_orientation('solar_admittance_targets')
+    solar_admittance_single = list(result.solar_admittance)
+
+    sa_bar = go.Figure(data=[go.Bar(x=list(solar_admittance.keys()),
+                                                y=solar_admittance_single,marker_color='lightslategray',text=solar_admittance_single)])
+
+    sa_bar.update_layout(
+                yaxis = dict(title = "Solar Admittance"), showlegend = False)
+
+    sa_bar.add_trace(
+        go.Scatter(
+            x=list(solar_admittance.keys()),
+            y=list(solar_admittance.values()),
+            name="DtS Threshold",
+            mode='lines+markers',
+        ),
+    )
+
+    sa_bar.add_annotation(
+        x=0
+        , y=solar_admittance['North']
+        , text=f'DtS Threshold'
+        , yanchor='bottom'
+        , showarrow=True
+        , arrowhead=1
+        , arrowsize=1
+        , arrowwidth=2
+        , arrowcolor="#636363"
+        , ax=-20
+        , ay=-30
+        , font=dict(size=15, color="black", family="Arial")
+        , align="right"
+        ,)
+    return sa_bar
+
+
+def wall_glazing_u_total_chart(result: NCC19Result) -> go.Figure:
+    """Bar chart of the total wall-glazing U-value against the DtS reference (Method 2)."""
+    target_wall_glazing_U = result.target_wall_glazing_u
+    wall_glazing_value_total = result.wall_glazing_u_total
+
+    wall_glazing_u_total_bar = go.Figure(data=[go.Bar(x=['Proposed Design','DtS Reference'],
+                                            y=[round(wall_glazing_value_total,2),target_wall_glazing_U],marker_color=['lightgreen','lightslategray'],text=[round(wall_glazing_value_total,2),target_wall_glazing_U])])
+    wall_glazing_u_total_bar.update_layout(
+                yaxis = dict(title = "Wall Glazing U-Value W/m².K Total"))
+    return wall_glazing_u_total_bar
+
+
+def ac_energy_chart(result: NCC19Result) -> go.Figure:
+    """Bar chart of the proposed AC energy against the DtS reference (Method 2)."""
+    proposed_ac_energy = result.proposed_ac_energy
+    reference_ac_energy = result.reference_ac_energy
+
+    AC_energy = go.Figure(data=[go.Bar(x=['Proposed Design','DtS Reference'],
+                                            y=[round(proposed_ac_energy,2),round(reference_ac_energy,2)],marker_color=['lightgreen','lightslategray'],text=[round(proposed_ac_energy,2),round(reference_ac_energy,2)])])
+    AC_energy.update_layout(
+                yaxis = dict(title = "AC Energy Value"))
+    AC_energy.update_traces(marker_color='rgb(158,202,225)', marker_line_color='rgb(8,48,107)',
+        marker_line_width=1.5, opacity=0.6)
+
+    AC_energy.update_yaxes(range=[0,50])
+    return AC_energy
+
+
+@lru_cache(maxsize=32)
+def ncc19_charts(result: NCC19Result) -> dict:
+    """The four NCC19 figures of a result, keyed by the names of their report images."""
+    return {
+        'wall_glazing_u_bar': wall_glazing_u_chart(result),
+        'sa_bar': solar_admittance_chart(result),
+        'wall_glazing_u_total_bar': wall_glazing_u_total_chart(result),
+        'AC_energy': ac_energy_chart(result)
+    }
+
+
+PNG_CACHE_SIZE = 64
+
+_png_cache = OrderedDict()
+#the Kaleido process is shared by all sessions and handles one figure at a time
+_kaleido_lock = threading.Lock()
+
+
+def figure_hash(figure: go.Figure) -> str:
+    """Content hash of a figure."""
+    return hashlib.sha256(figure.to_json().encode('utf-8')).hexdigest()
+
+
+def _kaleido_scope():
+    """The persistent Kaleido scope of plotly, or None when it is not available."""
+    return getattr(pio_kaleido, 'scope', None)
+
+
+def render_png(figures: dict) -> dict:
+    """Render figures to PNG bytes in one batch.
+
+    Args:
+        figures: Dictionary of Plotly figures.
+
+    Returns:
+        A dictionary of PNG bytes with the keys of figures. Images of figures
+        rendered before are taken from the cache.
+    """
+    keys = {name: figure_hash(figure) for name, figure in figures.items()}
+    with _kaleido_lock:
+        missing = {name: figures[name] for name, key in keys.items() if key not in _png_cache}
+        if missing:
+            scope = _kaleido_scope()
+            for name, figure in missing.items():
+                if scope is not None:
+                    #straight to the running Kaleido process, skipping the checks of to_image
+                    _png_cache[keys[name]] = scope.transform(figure.to_dict(), format='png')
+                else:
+                    _png_cache[keys[name]] = figure.to_image(format='png')
+        images = {}
+        for name, key in keys.items():
+            _png_cache.move_to_end(key)
+            images[name] = _png_cache[key]
+        while len(_png_cache) > PNG_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+    return images
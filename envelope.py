@@ -0,0 +1,273 @@
+"""Building envelope extraction from a Honeybee model.
+
+Room properties, envelope areas per orientation and the horizontal surfaces
+of the thermal envelope, independent of the Streamlit interface so they can
+be used by the app and by the batch command line. Everything is computed from
+the FaceTable of the model.
+"""
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from face_table import FaceTable, azimuth as normal_azimuth, face_table
+from ncc19 import ORIENTATIONS
+
+AREA_CALC_METHODS = ['Conditioned Zones', 'Entire Building']
+
+#north angles x faces held at once by orientation_sweep, about 32 MB of temporary arrays
+SWEEP_CHUNK_SIZE = 1 << 20
+
+
+SECTOR_NAMES = {
+    4: ['North', 'East', 'South', 'West'],
+    8: ['North', 'North-East', 'East', 'South-East', 'South', 'South-West', 'West', 'North-West'],
+    16: ['North', 'North-North-East', 'North-East', 'East-North-East',
+         'East', 'East-South-East', 'South-East', 'South-South-East',
+         'South', 'South-South-West', 'South-West', 'West-South-West',
+         'West', 'West-North-West', 'North-West', 'North-North-West']
+}
+
+
+def sector_index(azimuth, sectors: int = 4) -> np.ndarray:
+    """Index in SECTOR_NAMES[sectors] of azimuths in degrees, as int8 codes.
+
+    Sectors are counted clockwise from North and centred on their direction,
+    each one including its clockwise boundary. With 4 sectors North is
+    azimuth <= 45 or > 315, East is (45, 135], South is (135, 225] and West is
+    (225, 315].
+    """
+    if sectors not in SECTOR_NAMES:
+        raise ValueError(f'Sectors must be one of {list(SECTOR_NAMES)}, got {sectors!r}.')
+    width = 360 / sectors
+    #rounding avoids flipping facades that sit exactly on a sector boundary
+    azimuth = np.round(np.asarray(azimuth, dtype=float), 6)
+    return (np.ceil((azimuth - width / 2) / width).astype(int) % sectors).astype(np.int8)
+
+
+def orientation_bins(normals, north: float = 0.0, sectors: int = 4) -> np.ndarray:
+    """Sector index of an array of face normals for a north angle.
+
+    Args:
+        normals: Array of shape (faces, 2) or (faces, 3) of face normals.
+        north: Counter-clockwise north angle in degrees.
+        sectors: Number of sectors (4, 8 or 16).
+
+    Returns:
+        Index in SECTOR_NAMES[sectors] of each normal.
+    """
+    normals = np.asarray(normals, dtype=float).reshape(len(normals), -1)
+    return sector_index((normal_azimuth(normals[:, 0], normals[:, 1]) + north) % 360, sectors)
+
+
+_ORIENTATION_OF_SECTOR = np.array([ORIENTATIONS.index(o) for o in SECTOR_NAMES[4]], dtype=np.int8)
+
+
+def orientation_index(azimuth) -> np.ndarray:
+    """Index in ORIENTATIONS of azimuths in degrees, as int8 codes."""
+    return _ORIENTATION_OF_SECTOR[sector_index(azimuth, 4)]
+
+
+def orientation_sum(values, orientation, minlength: int = len(ORIENTATIONS)) -> np.ndarray:
+    """Sum values per orientation, ordered as ORIENTATIONS."""
+    return np.bincount(orientation, weights=values, minlength=minlength)
+
+
+def extract_envelope(model, area_calc_method: str = 'Conditioned Zones', internal_walls: bool = False, north: float = 0.0) -> dict:
+    """Extract the room details and the thermal envelope areas of a Honeybee model.
+
+    Args:
+        model: A Honeybee Model.
+        area_calc_method: Either 'Conditioned Zones' or 'Entire Building'.
+        internal_walls: Include all walls of the target rooms in the facade
+            areas instead of the outdoor walls only.
+        north: Counter-clockwise north angle in degrees.
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   model_data: DataFrame of room details indexed by room display name.
+        -   model_shade: DataFrame of the total outdoor shade area.
+        -   target_rooms_index: Indices of the rooms included in the envelope.
+        -   model_apertures: DataFrame of aperture areas per orientation.
+        -   model_faces_vertical: DataFrame of facade, external wall areas and
+            WWR per orientation.
+        -   model_roof: DataFrame of the roof-ceiling area of the target rooms.
+        -   model_floor: DataFrame of the floor area of the target rooms.
+    """
+    return envelope_from_table(face_table(model), area_calc_method, internal_walls, north)
+
+
+def envelope_from_table(table: FaceTable, area_calc_method: str = 'Conditioned Zones', internal_walls: bool = False, north: float = 0.0) -> dict:
+    """Extract the room details and the thermal envelope areas from a FaceTable.
+
+    See extract_envelope for the arguments and the returned dictionary.
+    """
+    face = ~table.is_aperture
+    aperture = table.is_aperture
+    outdoors = table.boundary_condition_mask('Outdoors')
+    ground = table.boundary_condition_mask('Ground')
+    wall = table.face_type_mask('Wall')
+    roof = table.face_type_mask('RoofCeiling')
+    floor = table.face_type_mask('Floor')
+    area_2 = np.round(table.area, 2)
+
+    #UG Roofs are only counted when they differ from the last underground floor before them
+    ground_floor = face & ground & floor
+    last_ground_floor = np.maximum.accumulate(np.where(ground_floor, np.arange(table.rows), -1)) if table.rows else np.zeros(0, dtype=int)
+    adjacent_ground_floor_area = np.where(last_ground_floor >= 0, area_2[np.maximum(last_ground_floor, 0)], np.nan)
+    ug_roof = face & ground & roof & (area_2 != adjacent_ground_floor_area)
+
+    #Extracting properties based on rooms, all of them in one aggregation over the room codes
+    (floor_area, exterior_roof_area, exterior_skylight_area, exterior_wall_area, exterior_aperture_area,
+     internal_wall_area, underground_wall_area, underground_roof_area) = table.room_sums([
+        (face & floor, None), #includes both Surface and Ground BC floors
+        (face & outdoors & roof, None),
+        (aperture & outdoors & roof, None), #exterior_roof_area includes BOTH the area of opaque and transparent parts of the roofs
+        (face & outdoors & wall, None),
+        (aperture & outdoors, None), #exterior_wall_area includes BOTH the area of opaque and transparent parts of the walls
+        (face & table.boundary_condition_mask('Surface') & (table.azimuth > 0) & ~table.face_type_mask('AirBoundary'), area_2),
+        (face & ground & wall, area_2),
+        (ug_roof, area_2)
+    ]).T
+
+    #room columns stay in the order of the rooms and are sorted by name once
+    model_data = DataFrame({
+        'display_name': table.room_names,
+        'Conditioning Status': table.room_conditioned,
+        'Program Type': table.room_programs,
+        'volume (m3)': np.round(table.room_volumes, 2),
+        'floor_area (m2)': np.round(floor_area, 2),
+        'roof_area (m2)': np.round(exterior_roof_area - exterior_skylight_area, 2),
+        'exterior_wall_area (m2)': np.round(exterior_wall_area - exterior_aperture_area, 2),
+        'exterior_aperture_area (m2)': np.round(exterior_aperture_area, 2),
+        'exterior_skylight_area (m2)': np.round(exterior_skylight_area, 2),
+        'internal_wall_area (m2)': internal_wall_area,
+        'underground_wall_area (m2)': underground_wall_area,
+        'underground_roof_area (m2)': underground_roof_area
+    }).sort_values('display_name', kind='stable').set_index('display_name')
+
+    model_shade = pd.DataFrame({f'Total Area (m2)': [table.shade_area]}, index=['External Shades'])
+
+    #Extracting room index based on facade calc methodology
+    target_rooms = _target_rooms(table, area_calc_method)
+    target_rooms_index = np.flatnonzero(target_rooms).tolist()
+    target = target_rooms[table.room] if table.rows else np.zeros(0, dtype=bool)
+
+    #Surface Areas based on directions
+    orientation = orientation_index((table.azimuth + north) % 360)
+    exterior_aperture, vertical = _facade_masks(table, target, internal_walls)
+    aperture_area = np.round(orientation_sum(table.area[exterior_aperture], orientation[exterior_aperture]), 2)
+    vertical_area = orientation_sum(np.trunc(table.area[vertical]), orientation[vertical]).astype(int)
+
+    model_apertures = DataFrame({'Aperture Area (m2)': aperture_area}, index=ORIENTATIONS)
+
+    model_faces_vertical = DataFrame({'Face Area (m2)': vertical_area}, index=ORIENTATIONS)
+    model_faces_vertical['ExWall Area (m2)'] = np.round(vertical_area - aperture_area, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        model_faces_vertical['WWR (%)'] = np.nan_to_num(np.round(aperture_area / vertical_area * 100, 2), nan=0.0)
+
+    #checking horizontal faces
+    model_roof = pd.DataFrame({f'Calculated {area_calc_method} Area (m2)': [area_2[target & face & roof].sum()]}, index=['Roof-Ceilings'])
+    model_floor = pd.DataFrame({f'Calculated {area_calc_method} Area (m2)': [area_2[target & face & floor].sum()]}, index=['Floors']) #if there is any exposed floor, if not returns 0
+
+    return {
+        'model_data': model_data,
+        'model_shade': model_shade,
+        'target_rooms_index': target_rooms_index,
+        'model_apertures': model_apertures,
+        'model_faces_vertical': model_faces_vertical,
+        'model_roof': model_roof,
+        'model_floor': model_floor
+    }
+
+
+def orientation_sweep(table: FaceTable, norths, area_calc_method: str = 'Conditioned Zones', internal_walls: bool = False) -> tuple:
+    """Facade and aperture areas per orientation for many north angles at once.
+
+    Args:
+        table: FaceTable of the model.
+        norths: Array of counter-clockwise north angles in degrees.
+        area_calc_method: Either 'Conditioned Zones' or 'Entire Building'.
+        internal_walls: Include all walls of the target rooms in the facade areas.
+
+    Returns:
+        A tuple of the facade areas and the aperture areas, both arrays of shape
+        (north angles, 4) ordered as ORIENTATIONS and rounded as in
+        envelope_from_table.
+    """
+    norths = np.asarray(norths, dtype=float).reshape(-1)
+    target_rooms = _target_rooms(table, area_calc_method)
+    target = target_rooms[table.room] if table.rows else np.zeros(0, dtype=bool)
+    exterior_aperture, vertical = _facade_masks(table, target, internal_walls)
+
+    def sweep_sum(mask, values):
+        #one bincount over (north angle, orientation) pairs per chunk of angles, so the
+        #(angles, faces) arrays stay the same size however large the model is
+        azimuth = table.azimuth[mask]
+        sums = np.zeros((len(norths), len(ORIENTATIONS)))
+        step = max(1, SWEEP_CHUNK_SIZE // max(1, len(azimuth)))
+        for start in range(0, len(norths), step):
+            chunk = norths[start:start + step]
+            orientation = orientation_index((azimuth[None, :] + chunk[:, None]) % 360)
+            pairs = orientation + np.arange(len(chunk))[:, None] * len(ORIENTATIONS)
+            weights = np.broadcast_to(values, pairs.shape)
+            sums[start:start + len(chunk)] = np.bincount(pairs.ravel(), weights=weights.ravel(),
+                                                         minlength=len(chunk) * len(ORIENTATIONS)).reshape(-1, len(ORIENTATIONS))
+        return sums
+
+    aperture_area = np.round(sweep_sum(exterior_aperture, table.area[exterior_aperture]), 2)
+    face_area = sweep_sum(vertical, np.trunc(table.area[vertical])).astype(int)
+    return face_area, aperture_area
+
+
+def _target_rooms(table: FaceTable, area_calc_method: str) -> np.ndarray:
+    if area_calc_method == 'Conditioned Zones':
+        return table.room_conditioned
+    elif area_calc_method == 'Entire Building':
+        return np.ones(len(table.room_names), dtype=bool)
+    return np.zeros(len(table.room_names), dtype=bool)
+
+
+def _facade_masks(table: FaceTable, target: np.ndarray, internal_walls: bool) -> tuple:
+    """Rows of the exterior apertures and of the vertical faces of the target rooms."""
+    face = ~table.is_aperture
+    outdoors = table.boundary_condition_mask('Outdoors')
+    exterior_aperture = target & table.is_aperture & outdoors & (table.normal_z != 1) #excluding skylights if any
+    if internal_walls:
+        vertical = target & face & table.face_type_mask('Wall')
+    else:
+        vertical = target & face & outdoors & ~table.face_type_mask('RoofCeiling', 'Floor')
+    return exterior_aperture, vertical
+
+
+def facade_sectors(table: FaceTable, area_calc_method: str = 'Conditioned Zones', internal_walls: bool = False,
+                   north: float = 0.0, sectors: int = 8) -> DataFrame:
+    """Facade, aperture and external wall areas and WWR of the target rooms per sector.
+
+    Uses the same faces as the orientation areas of envelope_from_table,
+    binned into 4, 8 or 16 sectors instead of the four NCC orientations.
+    """
+    target_rooms = _target_rooms(table, area_calc_method)
+    target = target_rooms[table.room] if table.rows else np.zeros(0, dtype=bool)
+    sector = sector_index((table.azimuth + north) % 360, sectors)
+    exterior_aperture, vertical = _facade_masks(table, target, internal_walls)
+
+    aperture_area = np.round(orientation_sum(table.area[exterior_aperture], sector[exterior_aperture], sectors), 2)
+    vertical_area = orientation_sum(np.trunc(table.area[vertical]), sector[vertical], sectors).astype(int)
+
+    facades = DataFrame({'Face Area (m2)': vertical_area, 'Aperture Area (m2)': aperture_area}, index=SECTOR_NAMES[sectors])
+    facades['ExWall Area (m2)'] = np.round(vertical_area - aperture_area, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        facades['WWR (%)'] = np.nan_to_num(np.round(aperture_area / vertical_area * 100, 2), nan=0.0)
+    facades.index.name = 'Facade Sector'
+    return facades
+
+
+def relative_compactness(model_data: DataFrame) -> float:
+    """Building Relative Compactness (RC) = 6 * Building Volume (V) ^ 2/3 / Building Surface Area (A)
+
+    Source: https://www.sciencedirect.com/science/article/abs/pii/S037877881400574X?via%3Dihub
+    """
+    building_volume = model_data['volume (m3)'].sum()
+    building_area = model_data[['floor_area (m2)','roof_area (m2)','exterior_wall_area (m2)','exterior_aperture_area (m2)','exterior_skylight_area (m2)']].sum().sum() #internal walls excluded
+    return (6 * (pow(building_volume,2/3))) / building_area
@@ -0,0 +1,173 @@
+"""Background GEM and IDF exports of the uploaded model.
+
+Exports run in the shared WorkerPool from a copy of the serialised HBJSON of
+the cached model and the finished files are kept on disk per model content
+hash, adjacency flag and export type, so exporting the same model again is
+free. The worker checks the hash of the copy before translating it, so a file
+that does not hold the model of the key is never cached under it.
+Workers report the stage they are in through a shared dictionary so the app
+can show the progress of each job.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import honeybee_ies as hb2ies
+from honeybee.model import Model as HBModel
+
+from model_cache import DiskCache, file_hash
+from workers import WorkerPool
+
+EXPORT_TYPES = {
+    'gem': {'label': '.GEM File (for IES Users)', 'suffix': '.gem'},
+    'idf': {'label': '.IDF File (for ENERGYPLUS Users)', 'suffix': '.idf'}
+}
+
+#progress shown for each stage of an export job
+STAGES = {'queued': 0.0, 'parse': 0.1, 'translate': 0.4, 'write': 0.9, 'done': 1.0}
+
+
+def _report(status, job: str, stage: str):
+    if status is not None:
+        status[job] = stage
+
+
+def _read_model(hbjson_path: str, expected_hash: str = None) -> HBModel:
+    data = Path(hbjson_path).read_bytes()
+    if expected_hash is not None and hashlib.sha256(data).hexdigest() != expected_hash:
+        raise ValueError(f'{Path(hbjson_path).name} does not hold the model it was exported for')
+    return HBModel.from_dict(json.loads(data))
+
+
+def export_gem(hbjson_path: str, target: str, status=None, job: str = None, expected_hash: str = None) -> str:
+    """Translate an HBJSON file to an IES GEM file at target. Runs in a worker process."""
+    _report(status, job, 'parse')
+    model = _read_model(hbjson_path, expected_hash)
+    _report(status, job, 'translate')
+    temp_folder = tempfile.mkdtemp(dir=Path(target).parent)
+    try:
+        gem_file = hb2ies.writer.model_to_ies(model = model, folder = temp_folder, name = Path(target).stem)
+        _report(status, job, 'write')
+        os.replace(gem_file, target)
+    finally:
+        shutil.rmtree(temp_folder, ignore_errors=True)
+    return target
+
+
+def export_idf(hbjson_path: str, target: str, status=None, job: str = None, expected_hash: str = None) -> str:
+    """Translate an HBJSON file to an EnergyPlus IDF file at target. Runs in a worker process."""
+    _report(status, job, 'parse')
+    model = _read_model(hbjson_path, expected_hash)
+    _report(status, job, 'translate')
+    data = model.to.idf(model)
+    _report(status, job, 'write')
+    temp_path = f'{target}.{os.getpid()}.tmp'
+    with open(temp_path, 'w') as file:
+        file.write(data)
+    os.replace(temp_path, target)
+    return target
+
+
+_EXPORTERS = {'gem': export_gem, 'idf': export_idf}
+
+
+class ExportJobs:
+    """GEM and IDF export jobs and their cached results.
+
+    Args:
+        folder: Folder of the exported files.
+        pool: WorkerPool running the exports.
+        max_bytes: Size of the exported files kept per export type.
+    """
+
+    def __init__(self, folder: Path, pool: WorkerPool, max_bytes: int = 512 * 1024 ** 2):
+        self.pool = pool
+        self.caches = {kind: DiskCache(folder, max_bytes, options['suffix']) for kind, options in EXPORT_TYPES.items()}
+        self.inputs = Path(folder).joinpath('inputs')
+        self.inputs.mkdir(parents=True, exist_ok=True)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._manager = None
+        self._status = None
+
+    @staticmethod
+    def job_key(model_key: str, solve_adjacency: bool) -> str:
+        return f"{model_key}{'_adjacency' if solve_adjacency else ''}"
+
+    def _job(self, model_key: str, solve_adjacency: bool, kind: str) -> str:
+        return f'{self.job_key(model_key, solve_adjacency)}{EXPORT_TYPES[kind]["suffix"]}'
+
+    def _shared_status(self):
+        #the manager process is only started with the first export
+        if self._status is None:
+            self._manager = multiprocessing.get_context('spawn').Manager()
+            self._status = self._manager.dict()
+        return self._status
+
+    def result(self, model_key: str, solve_adjacency: bool, kind: str) -> Path:
+        """Path of the exported file, or None when it has not been exported yet."""
+        cache = self.caches[kind]
+        path = cache.path(self.job_key(model_key, solve_adjacency))
+        if path.is_file():
+            cache.touch(path)
+            return path
+        return None
+
+    def submit(self, user: str, model_key: str, solve_adjacency: bool, kind: str, hbjson_path: Path,
+               hbjson_hash: str = None):
+        """Start an export unless its file exists or the same export is running.
+
+        The HBJSON file is copied next to the exports under the name of the
+        job first, so the session can drop its own file while the job waits.
+        The job fails without caching anything when the hash of the copy is
+        not hbjson_hash, the hash of the file of model_key. It defaults to the
+        hash of the file as it is now.
+        """
+        job = self._job(model_key, solve_adjacency, kind)
+        with self._lock:
+            future = self._jobs.get(job)
+            if future is not None and not future.done():
+                return
+            if self.result(model_key, solve_adjacency, kind) is not None:
+                return
+            status = self._shared_status()
+            status[job] = 'queued'
+            target = self.caches[kind].path(self.job_key(model_key, solve_adjacency))
+            job_input = self.inputs.joinpath(f'{job}.hbjson')
+            shutil.copyfile(hbjson_path, job_input)
+            future = self.pool.submit(user, _EXPORTERS[kind], job_input.as_posix(), target.as_posix(), status, job,
+                                      hbjson_hash or file_hash(job_input))
+            self._jobs[job] = future
+
+        def finished(_):
+            job_input.unlink(missing_ok=True)
+            self.caches[kind].evict(keep=target)
+        future.add_done_callback(finished)
+
+    def progress(self, model_key: str, solve_adjacency: bool, kind: str) -> tuple:
+        """Stage, fraction done and error message of an export.
+
+        The stage is None when the export was never started.
+        """
+        if self.result(model_key, solve_adjacency, kind) is not None:
+            return 'done', 1.0, None
+        job = self._job(model_key, solve_adjacency, kind)
+        with self._lock:
+            future = self._jobs.get(job)
+        if future is None:
+            return None, 0.0, None
+        if future.done() and future.exception() is not None:
+            e = future.exception()
+            return 'failed', 1.0, f'{type(e).__name__}: {e}'
+        stage = self._status.get(job, 'queued') if self._status is not None else 'queued'
+        return stage, STAGES.get(stage, 0.0), None
+
+    def pending(self, model_key: str, solve_adjacency: bool) -> bool:
+        """True while any export of the model is queued or running."""
+        stages = [self.progress(model_key, solve_adjacency, kind)[0] for kind in EXPORT_TYPES]
+        return any(stage not in (None, 'done', 'failed') for stage in stages)
@@ -0,0 +1,426 @@
+"""Columnar table of the faces and apertures of a Honeybee model.
+
+Each face and each aperture of the model is visited exactly once and stored as
+one row of NumPy columns. All envelope metrics are then computed from the
+table with masks and group sums instead of walking the rooms again.
+
+The table can be built from a Model or straight from HBJSON room
+dictionaries, one room at a time, without building the Model at all. Rows are
+kept in typed arrays, with face types and boundary conditions as small
+integer codes, so a row takes tens of bytes whatever the size of the model.
+"""
+import hashlib
+import json
+import math
+from array import array
+
+import numpy as np
+from honeybee.aperture import Aperture
+from honeybee.door import Door
+from honeybee.face import Face
+from honeybee.model import Model as HBModel
+from honeybee.room import Room
+from honeybee.shade import Shade
+from honeybee_energy.lib.programtypes import plenum_program
+
+#keys of the HBJSON lists of objects that do not belong to any room
+ORPHAN_KEYS = ('orphaned_shades', 'orphaned_faces', 'orphaned_apertures', 'orphaned_doors')
+
+#categories of the face type and boundary condition codes, extended by a table when it meets other names
+FACE_TYPES = ('Wall', 'RoofCeiling', 'Floor', 'AirBoundary')
+BOUNDARY_CONDITIONS = ('Outdoors', 'Surface', 'Ground', 'Adiabatic', 'OtherSideTemperature')
+_FACE_TYPE_CODES = {name: code for code, name in enumerate(FACE_TYPES)}
+_BOUNDARY_CONDITION_CODES = {name: code for code, name in enumerate(BOUNDARY_CONDITIONS)}
+
+
+class FaceRecord:
+    """One row of a FaceTable, with the codes of the row resolved to names."""
+    __slots__ = ('index', 'room', 'room_name', 'is_aperture', 'face_type', 'boundary_condition',
+                 'area', 'normal', 'azimuth', 'conditioned')
+
+    def __init__(self, index: int, room: int, room_name: str, is_aperture: bool, face_type: str,
+                 boundary_condition: str, area: float, normal: tuple, azimuth: float, conditioned: bool):
+        self.index = index
+        self.room = room
+        self.room_name = room_name
+        self.is_aperture = is_aperture
+        self.face_type = face_type
+        self.boundary_condition = boundary_condition
+        self.area = area
+        self.normal = normal
+        self.azimuth = azimuth
+        self.conditioned = conditioned
+
+    def __repr__(self):
+        kind = 'Aperture' if self.is_aperture else self.face_type
+        return f'FaceRecord({self.index}: {kind} of {self.room_name!r}, {self.boundary_condition}, {self.area:.2f} m2)'
+
+
+class FaceTable:
+    """Faces and apertures of a model, one row per face or aperture.
+
+    Room columns have one value per room, in the order of ``model.rooms``.
+
+    Args:
+        room_names: Display name of each room.
+        room_conditioned: Conditioning status of each room.
+        room_programs: Program type identifier of each room.
+        room_volumes: Volume of each room.
+        room: Index of the room of each row.
+        is_aperture: True for aperture rows and False for face rows.
+        face_type: Code in face_types of the face type of the row. Aperture
+            rows get the type of their parent face.
+        boundary_condition: Code in boundary_conditions of the boundary
+            condition of the row. Aperture rows get the boundary condition of
+            their parent face.
+        area: Area of the row.
+        normal: Array of shape (rows, 3) with the normal of each row.
+        shade_area: Total area of the outdoor shades of the model.
+        face_types: Face type names of the face_type codes.
+        boundary_conditions: Boundary condition names of the
+            boundary_condition codes.
+
+    Properties:
+        *   rows
+        *   nbytes: Memory used by the row columns.
+        *   normal_x, normal_y, normal_z
+        *   azimuth: Clockwise angle in degrees between the Y-axis and the
+            horizontal projection of the normal, 0 for horizontal rows.
+        *   conditioned: Conditioning status of the room of each row.
+    """
+
+    def __init__(self, room_names, room_conditioned, room_programs, room_volumes,
+                 room, is_aperture, face_type, boundary_condition, area, normal, shade_area=0.0,
+                 face_types=FACE_TYPES, boundary_conditions=BOUNDARY_CONDITIONS):
+        self.room_names = list(room_names)
+        self.room_conditioned = np.asarray(room_conditioned, dtype=bool)
+        self.room_programs = list(room_programs)
+        self.room_volumes = np.asarray(room_volumes, dtype=float)
+        self.face_types = tuple(face_types)
+        self.boundary_conditions = tuple(boundary_conditions)
+
+        self.room = np.asarray(room, dtype=np.int32)
+        self.is_aperture = np.asarray(is_aperture, dtype=bool)
+        self.face_type = np.asarray(face_type, dtype=np.int8)
+        self.boundary_condition = np.asarray(boundary_condition, dtype=np.int8)
+        self.area = np.asarray(area, dtype=float)
+        normal = np.asarray(normal, dtype=float).reshape(-1, 3)
+        self.normal_x, self.normal_y, self.normal_z = normal[:, 0], normal[:, 1], normal[:, 2]
+        self.shade_area = float(shade_area)
+
+        self.azimuth = azimuth(self.normal_x, self.normal_y)
+        self.conditioned = self.room_conditioned[self.room] if len(self.room) else np.zeros(0, dtype=bool)
+
+    @property
+    def rows(self) -> int:
+        return len(self.area)
+
+    @property
+    def nbytes(self) -> int:
+        columns = (self.room, self.is_aperture, self.face_type, self.boundary_condition, self.area,
+                   self.normal_x, self.normal_y, self.normal_z, self.azimuth, self.conditioned)
+        return sum(column.nbytes for column in columns)
+
+    def face_type_mask(self, *names) -> np.ndarray:
+        """Rows with one of the face type names."""
+        return _category_mask(self.face_type, self.face_types, names)
+
+    def boundary_condition_mask(self, *names) -> np.ndarray:
+        """Rows with one of the boundary condition names."""
+        return _category_mask(self.boundary_condition, self.boundary_conditions, names)
+
+    def record(self, index: int) -> FaceRecord:
+        """Get one row of the table as a FaceRecord."""
+        room = int(self.room[index])
+        return FaceRecord(
+            index, room, self.room_names[room], bool(self.is_aperture[index]),
+            self.face_types[self.face_type[index]], self.boundary_conditions[self.boundary_condition[index]],
+            float(self.area[index]), (float(self.normal_x[index]), float(self.normal_y[index]), float(self.normal_z[index])),
+            float(self.azimuth[index]), bool(self.conditioned[index]))
+
+    def room_sum(self, mask, values=None) -> np.ndarray:
+        """Sum values (the row areas by default) of the masked rows per room."""
+        values = self.area if values is None else values
+        return np.bincount(self.room[mask], weights=values[mask], minlength=len(self.room_names))
+
+    def room_sums(self, columns) -> np.ndarray:
+        """Sum several columns per room in one aggregation over the room codes.
+
+        Args:
+            columns: List of (mask, values) tuples, values being None for the
+                row areas. Each column sums its values over its masked rows.
+
+        Returns:
+            Array of shape (rooms, columns) with the sums, equal to calling
+            room_sum for each column.
+        """
+        #one bincount per column is faster than a single bincount over (room, column) pairs
+        sums = np.zeros((len(self.room_names), len(columns)))
+        for i, (mask, values) in enumerate(columns):
+            sums[:, i] = self.room_sum(mask, values)
+        return sums
+
+
+def azimuth(normal_x, normal_y) -> np.ndarray:
+    """Clockwise angle in degrees from the Y-axis to the horizontal projection of normals.
+
+    Computed like Face3D.azimuth (Vector2D.angle_clockwise from the Y-axis), so
+    the walls honeybee puts exactly at 0 (north) or 360 are the same here, up
+    to the last bits of arccos otherwise. Horizontal normals get an azimuth
+    of 0.
+    """
+    normal_x = np.asarray(normal_x, dtype=float)
+    normal_y = np.asarray(normal_y, dtype=float)
+    magnitude = np.sqrt(normal_x ** 2 + normal_y ** 2)
+    horizontal = magnitude == 0
+    # arccos gives exactly 0 for the walls a hair off north, arctan2 would give
+    # a tiny angle either side of 0 and flip the faces compared with azimuth > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        inner = np.arccos(np.clip(normal_y / magnitude, -1, 1))
+    angle = np.where(normal_x >= 0, inner, 2 * math.pi - inner)
+    return np.where(horizontal, 0.0, np.degrees(angle))
+
+
+def _category_mask(codes: np.ndarray, categories: tuple, names: tuple) -> np.ndarray:
+    return np.isin(codes, [categories.index(name) for name in names if name in categories])
+
+
+def _shade_area(shades) -> float:
+    return sum(shade.area for shade in shades)
+
+
+#honeybee objects that can be orphaned in a model, by HBJSON type
+_ORPHAN_TYPES = {'Face': Face, 'Aperture': Aperture, 'Door': Door, 'Shade': Shade}
+
+
+class RoomRows:
+    """Rows of one room, kept between uploads by a room cache.
+
+    Face types and boundary conditions are codes in the face_types and
+    boundary_conditions of the room, FACE_TYPES and BOUNDARY_CONDITIONS unless
+    the room has other names, which a FaceTableBuilder maps to its own.
+
+    Args:
+        name: Display name of the room.
+        conditioned: Conditioning status of the room, None when it has an
+            HVAC and takes its setpoint from its program.
+        program: Program type identifier of the room.
+        volume: Volume of the room.
+        shade_area: Area of the outdoor shades of the room and its faces.
+    """
+    __slots__ = ('name', 'conditioned', 'program', 'volume', 'shade_area', 'is_aperture',
+                 'face_type', 'boundary_condition', 'area', 'normal', 'face_types', 'boundary_conditions')
+
+    def __init__(self, name: str, conditioned, program: str, volume: float, shade_area: float = 0.0):
+        self.name = name
+        self.conditioned = conditioned
+        self.program = program
+        self.volume = volume
+        self.shade_area = shade_area
+        self.is_aperture, self.face_type, self.boundary_condition = array('b'), array('b'), array('b')
+        self.area, self.normal = array('d'), array('d')
+        self.face_types, self.boundary_conditions = FACE_TYPES, BOUNDARY_CONDITIONS
+
+    @property
+    def rows(self) -> int:
+        return len(self.area)
+
+    @classmethod
+    def from_room(cls, hb_room, conditioned, program: str):
+        """Get the rows of the faces and apertures of a honeybee Room."""
+        rows = cls(hb_room.display_name, conditioned, program, hb_room.volume, _shade_area(hb_room.outdoor_shades))
+        face_types, boundary_conditions = dict(_FACE_TYPE_CODES), dict(_BOUNDARY_CONDITION_CODES)
+        for face in hb_room.faces:
+            f_type = face_types.setdefault(face.type.name, len(face_types))
+            f_bc = boundary_conditions.setdefault(face.boundary_condition.name, len(boundary_conditions))
+            rows.is_aperture.append(False)
+            rows.face_type.append(f_type)
+            rows.boundary_condition.append(f_bc)
+            rows.area.append(face.area)
+            rows.normal.extend(face.normal)
+            rows.shade_area += _shade_area(face.outdoor_shades)
+
+            for aperture in face.apertures:
+                rows.is_aperture.append(True)
+                rows.face_type.append(f_type)
+                rows.boundary_condition.append(f_bc)
+                rows.area.append(aperture.area)
+                rows.normal.extend(aperture.normal)
+                rows.shade_area += _shade_area(aperture.outdoor_shades)
+
+            for door in face.doors:
+                rows.shade_area += _shade_area(door.outdoor_shades)
+
+        #rooms with other names than the defaults get their own categories
+        if len(face_types) > len(FACE_TYPES):
+            rows.face_types = tuple(face_types)
+        if len(boundary_conditions) > len(BOUNDARY_CONDITIONS):
+            rows.boundary_conditions = tuple(boundary_conditions)
+        return rows
+
+    @classmethod
+    def from_dict(cls, data: dict, tolerance: float = 0):
+        """Get the rows of an HBJSON room dictionary, building the Room for its geometry only."""
+        energy = data.get('properties', {}).get('energy', {})
+        program = energy.get('program_type') or plenum_program.identifier
+        if energy.get('hvac') is None:
+            conditioned = False
+        else:
+            conditioned = True if energy.get('setpoint') is not None else None
+        return cls.from_room(Room.from_dict(data, tolerance), conditioned, program)
+
+
+def room_fingerprint(data: dict, tolerance: float) -> str:
+    """Content hash of an HBJSON room dictionary and the tolerance it is built with.
+
+    Covers everything the rows of the room depend on: geometry, boundary
+    conditions, shades and the energy properties that set its conditioning.
+    """
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f'{tolerance!r}|{text}'.encode('utf-8')).hexdigest()
+
+
+class FaceTableBuilder:
+    """Collect the rows of a FaceTable one room at a time.
+
+    Rooms can be added as honeybee Rooms or as HBJSON room dictionaries. A
+    room dictionary is turned into a Room for its geometry only and dropped
+    as soon as its rows are taken, so the full model is never held in memory.
+    The energy properties of room dictionaries are read from the dictionary
+    and resolved against the program types of the model in ``table``.
+
+    Args:
+        tolerance: Tolerance of the model, used to build the Rooms of room
+            dictionaries like Model.from_dict does.
+        room_cache: Optional cache with get(key) and put(key, rows) methods
+            holding the RoomRows of room dictionaries by room_fingerprint.
+            Only the rooms that are not in it are built, so a new upload of
+            a model with a few edited rooms only rebuilds those rooms.
+    """
+
+    def __init__(self, tolerance: float = 0, room_cache=None):
+        self.tolerance = tolerance
+        self.room_cache = room_cache
+        self.rebuilt_rooms = 0
+        self.room_names, self.room_conditioned, self.room_programs, self.room_volumes = [], [], [], []
+        #rows go straight into typed arrays instead of lists of Python objects
+        self.room, self.is_aperture = array('i'), array('b')
+        self.face_type, self.boundary_condition = array('b'), array('b')
+        self.area, self.normal = array('d'), array('d')
+        self.shade_area = 0.0
+        self._face_types = dict(_FACE_TYPE_CODES)
+        self._boundary_conditions = dict(_BOUNDARY_CONDITION_CODES)
+        self._setpoint_programs = set()
+
+    def add_rows(self, rows: RoomRows):
+        """Add the rows of one room."""
+        room_index = len(self.room_names)
+        self.room_names.append(rows.name)
+        self.room_conditioned.append(rows.conditioned)
+        self.room_programs.append(rows.program)
+        self.room_volumes.append(rows.volume)
+        self.shade_area += rows.shade_area
+
+        self.room.extend([room_index] * rows.rows)
+        self.is_aperture.extend(rows.is_aperture)
+        self.face_type.extend(_recode(rows.face_type, rows.face_types, self._face_types))
+        self.boundary_condition.extend(_recode(rows.boundary_condition, rows.boundary_conditions, self._boundary_conditions))
+        self.area.extend(rows.area)
+        self.normal.extend(rows.normal)
+
+    def add_room(self, hb_room, conditioned: bool, program: str):
+        """Add the faces and apertures of a honeybee Room."""
+        self.add_rows(RoomRows.from_room(hb_room, conditioned, program))
+
+    def add_room_dict(self, data: dict, fingerprint: str = None):
+        """Add the faces and apertures of an HBJSON room dictionary.
+
+        fingerprint is the room_fingerprint of the room, if already known.
+        """
+        if self.room_cache is None:
+            self.rebuilt_rooms += 1
+            self.add_rows(RoomRows.from_dict(data, self.tolerance))
+            return
+
+        key = fingerprint or room_fingerprint(data, self.tolerance)
+        rows = self.room_cache.get(key)
+        if rows is None:
+            self.rebuilt_rooms += 1
+            rows = RoomRows.from_dict(data, self.tolerance)
+            self.room_cache.put(key, rows)
+        self.add_rows(rows)
+
+    def add_program_type(self, data: dict):
+        """Add an HBJSON program type dictionary of the model."""
+        if data.get('setpoint') is not None:
+            self._setpoint_programs.add(data['identifier'])
+
+    def add_orphan(self, orphan):
+        """Add the outdoor shades of an orphaned Face, Aperture, Door or Shade."""
+        if isinstance(orphan, Shade):
+            self.shade_area += orphan.area
+            return
+        self.shade_area += _shade_area(orphan.outdoor_shades)
+        for child in getattr(orphan, 'apertures', ()) + getattr(orphan, 'doors', ()):
+            self.shade_area += _shade_area(child.outdoor_shades)
+
+    def add_orphan_dict(self, data: dict):
+        """Add an HBJSON dictionary of an orphaned Face, Aperture, Door or Shade."""
+        self.add_orphan(_ORPHAN_TYPES[data['type']].from_dict(data))
+
+    def table(self) -> FaceTable:
+        #rooms with an HVAC and no setpoint of their own are conditioned by the setpoint of their program
+        room_conditioned = [self.room_programs[i] in self._setpoint_programs if conditioned is None else conditioned
+                            for i, conditioned in enumerate(self.room_conditioned)]
+        return FaceTable(self.room_names, room_conditioned, self.room_programs, self.room_volumes,
+                         np.array(self.room, dtype=np.int32), np.array(self.is_aperture, dtype=bool),
+                         np.array(self.face_type, dtype=np.int8), np.array(self.boundary_condition, dtype=np.int8),
+                         np.array(self.area, dtype=float), np.array(self.normal, dtype=float), self.shade_area,
+                         tuple(self._face_types), tuple(self._boundary_conditions))
+
+
+def _recode(codes: array, categories: tuple, target: dict) -> array:
+    """Codes of some categories translated to the codes of target, adding the missing names."""
+    if all(target.get(name) == code for code, name in enumerate(categories)):
+        return codes
+    lookup = [target.setdefault(name, len(target)) for name in categories]
+    return array('b', [lookup[code] for code in codes])
+
+
+def face_table(model) -> FaceTable:
+    """Build the FaceTable of a Honeybee Model in a single pass over its faces."""
+    builder = FaceTableBuilder(model.tolerance)
+    for hb_room in model.rooms:
+        builder.add_room(hb_room, hb_room.properties.energy.is_conditioned,
+                         hb_room.properties.energy.program_type._identifier)
+
+    #shades that do not belong to any room
+    for orphan in tuple(model.orphaned_shades) + tuple(model.orphaned_faces) + \
+            tuple(model.orphaned_apertures) + tuple(model.orphaned_doors):
+        builder.add_orphan(orphan)
+    return builder.table()
+
+
+def hbjson_tolerance(hbjson: dict) -> float:
+    """Get the tolerance of an HBJSON dictionary like Model.from_dict does."""
+    if hbjson.get('tolerance') is not None:
+        return hbjson['tolerance']
+    return HBModel.UNITS_TOLERANCES[hbjson.get('units') or 'Meters']
+
+
+def hbjson_face_table(hbjson: dict, room_cache=None, fingerprints: list = None) -> FaceTable:
+    """Build the FaceTable of an HBJSON dictionary without building its Model.
+
+    See FaceTableBuilder for the room_cache. fingerprints are the
+    room_fingerprint of the rooms, if already known.
+    """
+    builder = FaceTableBuilder(hbjson_tolerance(hbjson), room_cache)
+    for program in hbjson.get('properties', {}).get('energy', {}).get('program_types') or ():
+        builder.add_program_type(program)
+    rooms = hbjson.get('rooms') or ()
+    for room, fingerprint in zip(rooms, fingerprints or [None] * len(rooms)):
+        builder.add_room_dict(room, fingerprint)
+    for key in ORPHAN_KEYS:
+        for orphan in hbjson.get(key) or ():
+            builder.add_orphan_dict(orphan)
+    return builder.table()
@@ -0,0 +1,126 @@
+"""Streaming reader of HBJSON files.
+
+Campus models can be several hundred MB of HBJSON, and parsing them into a
+dictionary and then into a Model holds several copies of the file in memory.
+Here the file is read with the iterative parser of ijson instead: each room
+is built from its own dictionary, turned into FaceTable rows and dropped
+before the next one is read, so the memory in use stays close to the size of
+the largest room. Without ijson the file is read with the json module.
+"""
+import json
+from pathlib import Path
+
+try:
+    import ijson
+except ImportError:  # the whole file is parsed at once instead
+    ijson = None
+
+from face_table import ORPHAN_KEYS, FaceTable, FaceTableBuilder, hbjson_face_table, hbjson_tolerance
+
+#top level values of the HBJSON kept in the header
+HEADER_KEYS = ('identifier', 'display_name', 'units', 'tolerance', 'angle_tolerance')
+
+#ijson prefixes of the HBJSON lists fed to a FaceTableBuilder, with the method taking their items
+ITEM_PREFIXES = {
+    'properties.energy.program_types.item': 'add_program_type',
+    'rooms.item': 'add_room_dict',
+    **{f'{key}.item': 'add_orphan_dict' for key in ORPHAN_KEYS}
+}
+
+_START_EVENTS = ('start_map', 'start_array')
+_END_EVENTS = ('end_map', 'end_array')
+
+
+def iter_items(file, item_prefixes, scalar_prefixes=()):
+    """Iterate over the items under some prefixes of a JSON file in a single pass.
+
+    Args:
+        file: JSON file opened in binary mode.
+        item_prefixes: ijson prefixes of the objects to build, e.g. 'rooms.item'.
+        scalar_prefixes: ijson prefixes of the numbers and strings to return.
+
+    Yields:
+        (prefix, value) tuples in the order of the file. Only one object is
+        built at a time.
+    """
+    builder = None
+    for prefix, event, value in ijson.parse(file, use_float=True):
+        if builder is None:
+            if prefix in item_prefixes and event in _START_EVENTS:
+                builder, item_prefix, depth = ijson.ObjectBuilder(), prefix, 0
+            else:
+                if prefix in scalar_prefixes and event not in _START_EVENTS + _END_EVENTS:
+                    yield prefix, value
+                continue
+
+        builder.event(event, value)
+        if event in _START_EVENTS:
+            depth += 1
+        elif event in _END_EVENTS:
+            depth -= 1
+            if depth == 0:
+                yield item_prefix, builder.value
+                builder = None
+
+
+def write_hbjson(hbjson: dict, hbjson_path: Path):
+    """Write an HBJSON dictionary to a file, one item of its lists at a time.
+
+    Writes the same text as json.dumps, but json.dump only uses the fast
+    encoder for the whole text at once, and here only one room is held as
+    text at any time.
+    """
+    with open(hbjson_path, 'w') as f:
+        f.write('{')
+        for i, (key, value) in enumerate(hbjson.items()):
+            f.write(f'{", " if i else ""}{json.dumps(key)}: ')
+            if isinstance(value, list):
+                f.write('[')
+                for j, item in enumerate(value):
+                    f.write(f'{", " if j else ""}{json.dumps(item)}')
+                f.write(']')
+            else:
+                f.write(json.dumps(value))
+        f.write('}')
+
+
+def read_tolerance(hbjson_path: Path) -> float:
+    """Get the tolerance of an HBJSON file like Model.from_dict does.
+
+    Rooms are built with the tolerance of the model, which honeybee writes
+    after the rooms, so it is looked up before they are streamed.
+    """
+    with open(hbjson_path, 'rb') as f:
+        header = dict(iter_items(f, (), ('units', 'tolerance')))
+    return hbjson_tolerance(header)
+
+
+def _header(values: dict) -> dict:
+    header = {key: values.get(key) for key in HEADER_KEYS}
+    header['display_name'] = header['display_name'] or header['identifier']
+    return header
+
+
+def read_face_table(hbjson_path: Path, room_cache=None) -> tuple:
+    """Read the FaceTable of an HBJSON file one room at a time.
+
+    See FaceTableBuilder for the room_cache.
+
+    Returns:
+        A tuple with a header dictionary (the HEADER_KEYS of the model, with
+        the identifier as display name if the model has none) and the
+        FaceTable of the model.
+    """
+    if ijson is None:
+        hbjson = json.loads(Path(hbjson_path).read_text())
+        return _header(hbjson), hbjson_face_table(hbjson, room_cache)
+
+    builder = FaceTableBuilder(read_tolerance(hbjson_path), room_cache)
+    values = {}
+    with open(hbjson_path, 'rb') as f:
+        for prefix, value in iter_items(f, ITEM_PREFIXES, HEADER_KEYS):
+            if prefix in ITEM_PREFIXES:
+                getattr(builder, ITEM_PREFIXES[prefix])(value)
+            else:
+                values[prefix] = value
+    return _header(values), builder.table()
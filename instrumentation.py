@@ -0,0 +1,118 @@
+"""Wall time, CPU time and peak memory of the named stages of the pipeline.
+
+Stages are marked with ``with stage('adjacency'):`` wherever they run. They
+are recorded by the StageRecorder started in the current context (a run of
+the Streamlit script of a session, or the evaluation of one model in batch
+mode) and ignored when there is none, so marking a stage costs next to
+nothing outside of a measured run.
+
+CPU time is the time of the current thread, since Streamlit runs all the
+sessions in threads of one process. Jobs run in worker processes only count
+as wall time of the stage waiting for them. Peak memory is traced with
+tracemalloc, which slows down every allocation of the process, so it is only
+traced when asked for.
+"""
+import contextvars
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+
+_recorder = contextvars.ContextVar('stage_recorder', default=None)
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Measurements of one stage.
+
+    depth is the number of stages the stage is nested in, wall and cpu are in
+    seconds and peak_memory is the peak of the memory allocated during the
+    stage above the memory in use when it started, in bytes, or None when
+    memory was not traced.
+    """
+    name: str
+    depth: int
+    wall: float
+    cpu: float
+    peak_memory: int = None
+
+
+class StageRecorder:
+    """Records the stages run in the context it is started in.
+
+    Args:
+        trace_memory: Trace the peak memory of each stage with tracemalloc.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._peaks = []
+        self._started_tracing = False
+
+    def start(self) -> 'StageRecorder':
+        """Record the stages of the current context with this recorder.
+
+        Starting a recorder that is already recording does nothing, so a run
+        split in several calls, e.g. a Streamlit callback and the script, can
+        start the same recorder in each of them.
+        """
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _recorder.set(self)
+        return self
+
+    def stop(self):
+        """Stop recording, and stop tracing memory if this recorder started it."""
+        if _recorder.get() is self:
+            _recorder.set(None)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> 'StageRecorder':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Measure the code run in the with block as a stage called name."""
+        index = len(self.stages)
+        #the slot keeps the stages in the order they start, nested ones after their parent
+        self.stages.append(None)
+        depth = len(self._peaks)
+        memory = self.trace_memory and tracemalloc.is_tracing()
+        start_memory = 0
+        if memory:
+            start_memory, peak = tracemalloc.get_traced_memory()
+            # the peak of the enclosing stage is kept before it is reset for this one
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+        self._peaks.append(start_memory)
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - start_wall, time.thread_time() - start_cpu
+            peak = self._peaks.pop()
+            peak_memory = None
+            if memory and tracemalloc.is_tracing():
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                peak_memory = peak - start_memory
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            self.stages[index] = StageTiming(name, depth, wall, cpu, peak_memory)
+
+    def records(self, **fields) -> list:
+        """The finished stages as dictionaries, each one with the fields added in front."""
+        return [{**fields, **asdict(timing)} for timing in self.stages if timing is not None]
+
+
+def stage(name: str):
+    """Context manager measuring a stage with the recorder of the current context, if any."""
+    recorder = _recorder.get()
+    return recorder.stage(name) if recorder is not None else nullcontext()
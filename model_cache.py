@@ -0,0 +1,383 @@
+"""Session cache of the uploaded Honeybee model.
+
+The HBJSON handed over by ``get_hbjson`` is written to disk once per upload
+(plain and with solved adjacencies) and every part of the app works from
+those files until a different model is uploaded. The face tables are
+streamed from the files one room at a time and the full Model is only built
+where it is needed, by the viewer and the exports in the worker processes.
+Solved adjacencies are also kept on disk so the same geometry is never
+intersected twice, and the vtkjs files of the viewer are addressed by the
+content of the HBJSON they show.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from honeybee.model import Model as HBModel
+from honeybee_vtk.model import Model as VTKModel
+
+import adjacency
+from face_table import FaceTable, RoomRows, hbjson_face_table, hbjson_tolerance, room_fingerprint
+from hbjson_stream import read_face_table, write_hbjson
+from instrumentation import stage
+
+
+def hbjson_hash(hbjson: dict) -> str:
+    """Return a content hash of an HBJSON dictionary."""
+    text = json.dumps(hbjson, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """Return the SHA-256 hash of the bytes of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 ** 2), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_hash(hbjson: dict) -> tuple:
+    """Content hash of an HBJSON dictionary and the fingerprints of its rooms.
+
+    The hash is made of the room fingerprints and of the rest of the model,
+    so each room is only serialised once to get both.
+    """
+    tolerance = hbjson_tolerance(hbjson)
+    fingerprints = [room_fingerprint(room, tolerance) for room in hbjson.get('rooms') or ()]
+    rest = hbjson_hash({key: value for key, value in hbjson.items() if key != 'rooms'})
+    return hashlib.sha256('|'.join([rest] + fingerprints).encode('utf-8')).hexdigest(), fingerprints
+
+
+def solved_copy(hb_model: HBModel) -> HBModel:
+    """Return a copy of hb_model with intersected and solved adjacencies."""
+    solved_model = hb_model.duplicate()
+    solved_model.solve_adjacency(intersect=True, overwrite=False, air_boundary=False, adiabatic=False, tolerance=None, angle_tolerance=None)
+    return solved_model
+
+
+def write_vtkjs(hbjson_path: str, folder: str, name: str) -> str:
+    """Write the vtkjs file of an HBJSON file as {folder}/{name}.vtkjs.
+
+    The file is written in a temporary folder first so other sessions never
+    read half a file. Can run in a worker process.
+    """
+    vtkjs_file = Path(folder).joinpath(f'{name}.vtkjs')
+    temp_folder = tempfile.mkdtemp(dir=folder)
+    try:
+        VTKModel.from_hbjson(Path(hbjson_path).as_posix()).to_vtkjs(folder=temp_folder, name=name)
+        os.replace(Path(temp_folder).joinpath(f'{name}.vtkjs'), vtkjs_file)
+    finally:
+        shutil.rmtree(temp_folder, ignore_errors=True)
+    return vtkjs_file.as_posix()
+
+
+def run_here(fn, *args, **kwargs):
+    """Run a job in the current thread."""
+    return fn(*args, **kwargs)
+
+
+class DiskCache:
+    """Folder of cached files with least-recently-used eviction by total size.
+
+    Args:
+        folder: Folder holding the cached files.
+        max_bytes: Total size of the cached files. The least recently used
+            files are removed once it is exceeded.
+        suffix: File extension of the cached files.
+    """
+
+    def __init__(self, folder: Path, max_bytes: int, suffix: str):
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    def path(self, key: str) -> Path:
+        return self.folder.joinpath(f'{key}{self.suffix}')
+
+    def touch(self, path: Path):
+        """Mark a cached file as recently used."""
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+    def files(self) -> list:
+        return list(self.folder.glob(f'*{self.suffix}'))
+
+    @property
+    def size(self) -> int:
+        return sum(f.stat().st_size for f in self.files())
+
+    def evict(self, keep: Path = None):
+        """Remove the least recently used files until the cache fits in max_bytes."""
+        entries = []
+        for f in self.files():
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, f))
+        entries.sort(key=lambda e: e[0])
+
+        total = sum(e[1] for e in entries)
+        for _, size, f in entries:
+            if total <= self.max_bytes:
+                break
+            if f == keep:
+                continue
+            f.unlink(missing_ok=True)
+            total -= size
+
+
+class AdjacencyCache(DiskCache):
+    """Rooms of solved-adjacency models keyed by room geometry and tolerances.
+
+    Only the rooms are stored, since they are the only part of the model that
+    is changed by the intersection. The rest of the model always comes from
+    the current upload.
+    """
+
+    def __init__(self, folder: Path, max_bytes: int = 512 * 1024 ** 2):
+        super().__init__(folder, max_bytes, '.json')
+
+    @staticmethod
+    def geometry_hash(hbjson: dict, tolerance: float, angle_tolerance: float) -> str:
+        return hbjson_hash({
+            'rooms': hbjson.get('rooms', []),
+            'units': hbjson.get('units'),
+            'tolerance': tolerance,
+            'angle_tolerance': angle_tolerance
+        })
+
+    def solve(self, hbjson: dict, run=None, chunks: int = 1) -> tuple:
+        """Get the abridged room dictionaries of hbjson with solved adjacencies.
+
+        The rooms are only intersected on a miss, see adjacency.solve_adjacency
+        for run and chunks.
+
+        Returns:
+            A tuple with the room dictionaries and the statistics of the
+            intersection, or None when the rooms came from the cache.
+        """
+        angle_tolerance = hbjson.get('angle_tolerance')
+        key = self.geometry_hash(hbjson, hbjson_tolerance(hbjson), 1.0 if angle_tolerance is None else angle_tolerance)
+        rooms_path = self.path(key)
+
+        if rooms_path.is_file():
+            self.touch(rooms_path)
+            return json.loads(rooms_path.read_text()), None
+
+        rooms, stats = adjacency.solve_adjacency(hbjson, run, chunks)
+
+        # write next to the target first so other sessions never read half a file
+        temp_path = rooms_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        temp_path.write_text(json.dumps(rooms))
+        os.replace(temp_path, rooms_path)
+        self.evict(keep=rooms_path)
+        return rooms, stats
+
+
+class VTKJSCache(DiskCache):
+    """vtkjs files keyed by the content hash of the HBJSON file they were made from.
+
+    Two revisions of a model with the same identifier never share a file, and
+    the VTK model is only built when the vtkjs file does not exist yet.
+    """
+
+    def __init__(self, folder: Path, max_bytes: int = 256 * 1024 ** 2):
+        super().__init__(folder, max_bytes, '.vtkjs')
+
+    def get(self, hbjson_path: Path, run=None) -> Path:
+        """Get the vtkjs file of an HBJSON file, building it on a miss.
+
+        run is an optional function run(fn, *args) used to build the file
+        elsewhere, e.g. WorkerPool.run of a user.
+        """
+        key = hashlib.sha256(Path(hbjson_path).read_bytes()).hexdigest()
+        vtkjs_file = self.path(key)
+
+        if vtkjs_file.is_file():
+            self.touch(vtkjs_file)
+            return vtkjs_file
+
+        with stage('vtkjs'):
+            (run or run_here)(write_vtkjs, Path(hbjson_path).as_posix(), self.folder.as_posix(), key)
+        self.evict(keep=vtkjs_file)
+        return vtkjs_file
+
+
+class RoomRowsCache:
+    """FaceTable rows of the rooms of recent uploads keyed by room fingerprint.
+
+    Designers upload the same model again and again with a few rooms
+    changed, and only the rooms that are not in the cache are rebuilt.
+
+    Args:
+        max_rooms: Number of rooms kept. The least recently used rooms are
+            dropped first.
+    """
+
+    def __init__(self, max_rooms: int = 50000):
+        self.max_rooms = max_rooms
+        self.hits = 0
+        self.misses = 0
+        self._rows = OrderedDict()
+
+    def get(self, key: str) -> RoomRows:
+        rows = self._rows.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self._rows.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def put(self, key: str, rows: RoomRows):
+        self._rows[key] = rows
+        while len(self._rows) > self.max_rooms:
+            self._rows.popitem(last=False)
+
+
+class ModelEntry:
+    """Serialised HBJSON paths, face tables and models of one upload.
+
+    ``hbjson_paths``, ``file_hashes``, ``face_tables`` and ``models`` are
+    keyed by the adjacency flag so both variants of the model can be held at
+    the same time. ``file_hashes`` holds the hashes of the files as written,
+    so the jobs reading them can check they still hold this upload. Face tables are built by ModelCache from the uploaded rooms, or
+    streamed from the files when missing, and models are only read from the
+    files when asked for.
+    """
+
+    def __init__(self, key: str, identifier: str, display_name: str, room_cache: RoomRowsCache = None):
+        self.key = key
+        self.identifier = identifier
+        self.display_name = display_name
+        self.room_cache = room_cache
+        self.hbjson_paths = {}
+        self.file_hashes = {}
+        self.face_tables = {}
+        self.models = {}
+        self.adjacency_stats = None
+
+    def get_model(self, solve_adjacency: bool = False) -> HBModel:
+        """Get the full Model, building it from its HBJSON file on the first call only."""
+        if solve_adjacency not in self.models:
+            with stage('model from hbjson'):
+                self.models[solve_adjacency] = HBModel.from_hbjson(self.hbjson_paths[solve_adjacency].as_posix())
+        return self.models[solve_adjacency]
+
+    def get_face_table(self, solve_adjacency: bool = False) -> FaceTable:
+        """Get the FaceTable of the model, streaming its HBJSON file if it has none yet.
+
+        The table holds the areas and azimuths of the faces, which do not
+        depend on the north angle, so a new north angle only re-bins them.
+        """
+        if solve_adjacency not in self.face_tables:
+            with stage('face table'):
+                _, self.face_tables[solve_adjacency] = read_face_table(self.hbjson_paths[solve_adjacency], self.room_cache)
+        return self.face_tables[solve_adjacency]
+
+    def remove_files(self):
+        """Remove the HBJSON files of the entry, once it is dropped from the cache."""
+        for hbjson_path in self.hbjson_paths.values():
+            hbjson_path.unlink(missing_ok=True)
+        self.hbjson_paths.clear()
+        self.file_hashes.clear()
+
+
+class ModelCache:
+    """Models of the session keyed by HBJSON content hash and adjacency flag.
+
+    Args:
+        folder: Folder where the serialised HBJSON files are written.
+        max_entries: Number of uploads kept in memory. The least recently used
+            upload is dropped first, and its HBJSON files removed.
+        adjacency_cache: Optional AdjacencyCache used to skip the intersection
+            of models that have been solved before.
+        run: Optional function run(fn, *args) used to run the intersection
+            elsewhere, e.g. in a WorkerPool.
+        adjacency_chunks: Number of chunks of rooms intersected at the same
+            time, see adjacency.solve_adjacency.
+        room_cache: RoomRowsCache of the face table rows of the rooms of
+            previous uploads. Defaults to a new RoomRowsCache.
+    """
+
+    def __init__(self, folder: Path, max_entries: int = 2, adjacency_cache: AdjacencyCache = None, run=None,
+                 adjacency_chunks: int = 1, room_cache: RoomRowsCache = None):
+        self.folder = Path(folder)
+        self.max_entries = max_entries
+        self.adjacency_cache = adjacency_cache
+        self.run = run
+        self.adjacency_chunks = adjacency_chunks
+        self.room_cache = room_cache if room_cache is not None else RoomRowsCache()
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._last_hash = (None, None, None)
+
+    @property
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                'room_hits': self.room_cache.hits, 'room_misses': self.room_cache.misses}
+
+    def _hash(self, hbjson: dict) -> tuple:
+        # the component hands back the same dict object on every rerun, so
+        # only hash it again when a new object arrives
+        last_hbjson, last_key, last_fingerprints = self._last_hash
+        if hbjson is last_hbjson:
+            return last_key, last_fingerprints
+        with stage('hash'):
+            key, fingerprints = upload_hash(hbjson)
+        self._last_hash = (hbjson, key, fingerprints)
+        return key, fingerprints
+
+    def get(self, hbjson: dict, solve_adjacency: bool = False) -> ModelEntry:
+        """Get the cache entry of an HBJSON dictionary, writing it to disk on a miss."""
+        key, fingerprints = self._hash(hbjson)
+        entry = self._entries.get(key)
+
+        if entry is not None and solve_adjacency in entry.hbjson_paths:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if entry is None:
+            entry = ModelEntry(key, hbjson['identifier'], hbjson.get('display_name') or hbjson['identifier'], self.room_cache)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)[1].remove_files()
+        else:
+            self._entries.move_to_end(key)
+
+        if solve_adjacency:
+            with stage('adjacency'):
+                if self.adjacency_cache is not None:
+                    rooms, entry.adjacency_stats = self.adjacency_cache.solve(hbjson, self.run, self.adjacency_chunks)
+                else:
+                    rooms, entry.adjacency_stats = adjacency.solve_adjacency(hbjson, self.run, self.adjacency_chunks)
+            self._serialise(entry, {**hbjson, 'rooms': rooms}, solve_adjacency)
+        else:
+            self._serialise(entry, hbjson, solve_adjacency, fingerprints)
+        return entry
+
+    def _serialise(self, entry: ModelEntry, hbjson: dict, solve_adjacency: bool, fingerprints: list = None):
+        # the dictionary is written as it is, without building the Model or a second copy of the text
+        suffix = '_adjacency' if solve_adjacency else ''
+        #named by the content key, two revisions of a model with the same identifier never share a file
+        hbjson_path = self.folder.joinpath(f'{entry.key}{suffix}.hbjson')
+        with stage('write hbjson'):
+            write_hbjson(hbjson, hbjson_path)
+            entry.file_hashes[solve_adjacency] = file_hash(hbjson_path)
+        entry.hbjson_paths[solve_adjacency] = hbjson_path
+        # the rooms are at hand, so only the ones missing from the room cache are rebuilt
+        with stage('face table'):
+            entry.face_tables[solve_adjacency] = hbjson_face_table(hbjson, self.room_cache, fingerprints)
@@ -0,0 +1,501 @@
+"""NCC 2019 Deemed-to-Satisfy facade calculator (Specification J1.5a).
+
+Reference building fabric performance for Method 1 (single aspect) and
+Method 2 (multiple aspects) from the facade and aperture areas per
+orientation. Orientation values are always ordered as ``ORIENTATIONS``.
+
+The module has no Streamlit dependency: evaluate() is a pure function of the
+facade areas, the building class, the climate zone and the specification, and
+returns an NCC19Result.
+"""
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+import numpy as np
+
+ORIENTATIONS = ['East', 'North', 'South', 'West']
+
+BUILDING_CLASSES = {'Class 2 - apartment building (Common Area)':2,
+    'Class 3 - student accommodation':3,
+    'Class 3 - hotel':3,
+    'Class 3 - other':3,
+    'Class 5 - office building':5,
+    'Class 6 - department stores, shopping centres':6,
+    'Class 6 - display glazing':6,
+    'Class 6 - restaurants, cafes, bars':6,
+    'Class 8 - factory':8,
+    'Class 9a - health-care buildings':'9a',
+    'Class 9a - ward':'9a ward',
+    'Class 9b - churches, chapels or the like':'9b',
+    'Class 9b - early childhood centres':'9b',
+    'Class 9b - public halls, function rooms or the like':'9b',
+    'Class 9b - schools':'9b',
+    'Class 9b - single auditorium theatres and cinemas':'9b',
+    'Class 9b - sports venues or the like':'9b',
+    'Class 9b - theatres and cinemas with multiple auditoria, art galleries or the like':'9b',
+    'Class 9c - aged care building':'9c'}
+
+CLIMATE_ZONES = {'Climate Zone 1 - High humidity summer, warm winter':1,
+    'Climate Zone 2 - Warm humid summer, mild winter':2,
+    'Climate Zone 3 - Hot dry summer, warm winter':3,
+    'Climate Zone 4 - Hot dry summer, cool winter':4,
+    'Climate Zone 5 - Warm temperate':5,
+    'Climate Zone 6 - Mild temperate':6,
+    'Climate Zone 7 - Cool temperate':7,
+    'Climate Zone 8 - Alpine':8}
+
+#classes sharing the same reference values
+NON_RESIDENTIAL_CLASSES = (2, 5, 6, 7, 8, '9b', '9a')
+RESIDENTIAL_CLASSES = (3, '9c', '9a ward')
+
+NON_RESIDENTIAL = 'non-residential'
+RESIDENTIAL = 'residential'
+CLASS_GROUPS = {**{c: NON_RESIDENTIAL for c in NON_RESIDENTIAL_CLASSES}, **{c: RESIDENTIAL for c in RESIDENTIAL_CLASSES}}
+
+#WWR bands: the R-value target drops above 20% and the solar admittance
+#weights only apply from 20%
+WWR_BANDS = ('below 20%', '20%', 'above 20%')
+
+SHADING_MULTIPLIER = 1.0 #assuming no shades for reference buildings and will be equal for all orientations
+
+COMPLIANT = 'Compliant Solution'
+NON_COMPLIANT = 'Non-Compliant Solution'
+
+#Specification J1.5a reference values per class group and climate zone. Per
+#orientation values are ordered as ORIENTATIONS (East, North, South, West).
+_WALL_R = {
+    NON_RESIDENTIAL: {1: 2.4, 2: 1.4, 3: 1.4, 4: 1.4, 5: 1.4, 6: 1.4, 7: 1.4, 8: 1.4},
+    RESIDENTIAL: {1: 3.3, 2: 1.4, 3: 3.3, 4: 2.8, 5: 1.4, 6: 2.8, 7: 2.8, 8: 3.8}}
+_WALL_R_ABOVE_20 = 1.0
+
+_WALL_GLAZING_U = {
+    NON_RESIDENTIAL: {1: 2.0, 2: 2.0, 3: 2.0, 4: 2.0, 5: 2.0, 6: 2.0, 7: 2.0, 8: 2.0},
+    RESIDENTIAL: {1: 1.1, 2: 2.0, 3: 1.1, 4: 1.1, 5: 2.0, 6: 1.1, 7: 1.1, 8: 0.9}}
+
+_SOLAR_ADMITTANCE = {
+    NON_RESIDENTIAL: {1: (0.12, 0.12, 0.12, 0.12),
+                      2: (0.13, 0.13, 0.13, 0.13),
+                      3: (0.16, 0.16, 0.16, 0.16),
+                      4: (0.13, 0.13, 0.13, 0.13),
+                      5: (0.13, 0.13, 0.13, 0.13),
+                      6: (0.13, 0.13, 0.13, 0.13),
+                      7: (0.13, 0.13, 0.13, 0.13),
+                      8: (0.20, 0.20, 0.42, 0.36)},
+    RESIDENTIAL: {1: (0.07, 0.07, 0.10, 0.07),
+                  2: (0.10, 0.10, 0.10, 0.10),
+                  3: (0.07, 0.07, 0.07, 0.07),
+                  4: (0.07, 0.07, 0.07, 0.07),
+                  5: (0.10, 0.10, 0.10, 0.10),
+                  6: (0.07, 0.07, 0.07, 0.07),
+                  7: (0.07, 0.07, 0.08, 0.07),
+                  8: (0.08, 0.08, 0.08, 0.08)}}
+
+_SOLAR_ADMITTANCE_WEIGHTS = {
+    NON_RESIDENTIAL: {1: (1.39, 1.47, 1, 1.41),
+                      2: (1.58, 1.95, 1, 1.68),
+                      3: (1.63, 1.95, 1, 1.65),
+                      4: (1.72, 2.05, 1, 1.69),
+                      5: (1.72, 2.28, 1, 1.75),
+                      6: (1.62, 2.12, 1, 1.67),
+                      7: (1.84, 2.4, 1, 1.92),
+                      8: (1.92, 1.88, 1, 1.25)},
+    RESIDENTIAL: {1: (1.3, 1.47, 1, 1.37),
+                  2: (1.49, 1.77, 1, 1.54),
+                  3: (1.48, 1.72, 1, 1.5),
+                  4: (1.37, 1.55, 1, 1.36),
+                  5: (1.48, 1.88, 1, 1.52),
+                  6: (1.28, 1.52, 1, 1.33),
+                  7: (1.35, 1.6, 1, 1.4),
+                  8: (1.26, 1.24, 1, 1.05)}}
+
+
+class Rule:
+    """Reference values of one class group, climate zone and WWR band.
+
+    Args:
+        r_target: Reference external wall R-value.
+        target_wall_glazing_u: Maximum total wall-glazing U-value (W/m².K).
+        solar_admittance_target: Maximum solar admittance per orientation.
+        solar_admittance_coe: Solar admittance weighting coefficient per
+            orientation, 0 below 20% WWR.
+    """
+    __slots__ = ('r_target', 'target_wall_glazing_u', 'solar_admittance_target', 'solar_admittance_coe')
+
+    def __init__(self, r_target: float, target_wall_glazing_u: float, solar_admittance_target: tuple, solar_admittance_coe: tuple):
+        self.r_target = r_target
+        self.target_wall_glazing_u = target_wall_glazing_u
+        self.solar_admittance_target = solar_admittance_target
+        self.solar_admittance_coe = solar_admittance_coe
+
+
+def _build_rules() -> dict:
+    rules = {}
+    for group, zones in _WALL_R.items():
+        for zone in zones:
+            for band in WWR_BANDS:
+                rules[(group, zone, band)] = Rule(
+                    _WALL_R_ABOVE_20 if band == 'above 20%' else _WALL_R[group][zone],
+                    _WALL_GLAZING_U[group][zone],
+                    _SOLAR_ADMITTANCE[group][zone],
+                    (0.0,) * len(ORIENTATIONS) if band == 'below 20%' else _SOLAR_ADMITTANCE_WEIGHTS[group][zone])
+    return rules
+
+
+#rules table keyed by (class group, climate zone, WWR band), built once at import
+RULES = _build_rules()
+
+
+def _rule_arrays(rules: dict) -> dict:
+    """The rules of each (class group, climate zone) stacked along the WWR bands."""
+    arrays = {}
+    for group, zone in {(group, zone) for group, zone, _ in rules}:
+        band_rules = [rules[(group, zone, band)] for band in WWR_BANDS]
+        arrays[(group, zone)] = (
+            np.array([r.r_target for r in band_rules]),
+            band_rules[0].target_wall_glazing_u,
+            np.array(band_rules[0].solar_admittance_target),
+            np.array([r.solar_admittance_coe for r in band_rules]))
+    return arrays
+
+
+_RULE_ARRAYS = _rule_arrays(RULES)
+
+
+def wwr_band(wwr):
+    """Index in WWR_BANDS of WWRs (%)."""
+    wwr = np.asarray(wwr)
+    return (wwr >= 20).astype(int) + (wwr > 20)
+
+
+def rule(building_class, climate_zone: int, wwr: float = 0) -> Rule:
+    """Reference values of a building class, climate zone and WWR (%)."""
+    try:
+        return RULES[(CLASS_GROUPS[building_class], climate_zone, WWR_BANDS[int(wwr_band(wwr))])]
+    except (KeyError, TypeError):
+        raise ValueError(f'Unknown building class {building_class!r} or climate zone {climate_zone!r}.') from None
+
+
+def _rules_of(building_class, climate_zone: int) -> tuple:
+    try:
+        return _RULE_ARRAYS[(CLASS_GROUPS[building_class], climate_zone)]
+    except (KeyError, TypeError):
+        raise ValueError(f'Unknown building class {building_class!r} or climate zone {climate_zone!r}.') from None
+
+
+def r_target(building_class, climate_zone: int, wwr: float) -> float:
+    """Reference external wall R-value of a facade with a given WWR (%)."""
+    return rule(building_class, climate_zone, wwr).r_target
+
+
+def target_wall_glazing_u(building_class, climate_zone: int) -> float:
+    """Maximum total wall-glazing U-value (W/m².K)."""
+    return rule(building_class, climate_zone).target_wall_glazing_u
+
+
+def solar_admittance_targets(building_class, climate_zone: int) -> dict:
+    """Maximum solar admittance per orientation."""
+    return dict(zip(ORIENTATIONS, rule(building_class, climate_zone).solar_admittance_target))
+
+
+def solar_admittance_weights(building_class, climate_zone: int) -> dict:
+    """Solar admittance weighting coefficients per orientation (WWR of 20% or more)."""
+    return dict(zip(ORIENTATIONS, rule(building_class, climate_zone, 20).solar_admittance_coe))
+
+
+def compliance_text(compliant: bool) -> str:
+    return COMPLIANT if compliant else NON_COMPLIANT
+
+
+def _glazing_u_display(glazing_u: float, reference_glazing_u: float, orientation: str):
+    if glazing_u == 0:
+        return None
+    #the South metric of the calculator has always included the limits themselves
+    if orientation == 'South':
+        if glazing_u >= 5.8:
+            return 5.8
+        elif reference_glazing_u <= 1.5:
+            return 1.5
+    elif glazing_u > 5.8:
+        return 5.8
+    elif reference_glazing_u < 1.5:
+        return 1.5
+    return round(glazing_u, 2)
+
+
+def _shgc_display(shgc: float) -> float:
+    if shgc > 0.81:
+        return 0.81
+    elif shgc == 0:
+        return 0.0
+    elif shgc < 0.16:
+        return 0.16
+    return shgc
+
+
+def clamp_glazing_u(reference_glazing_u):
+    """Limit reference glazing U-values to 1.5 to 5.8, with 0 (no glazing) as 5.8."""
+    reference_glazing_u = np.asarray(reference_glazing_u, dtype=float)
+    return np.where((reference_glazing_u > 5.8) | (reference_glazing_u == 0), 5.8,
+                    np.where(reference_glazing_u < 1.5, 1.5, reference_glazing_u))
+
+
+def clamp_shgc(reference_shgc):
+    """Limit reference SHGCs to 0.16 to 0.81, with 0 (no glazing) as 0.81."""
+    reference_shgc = np.asarray(reference_shgc, dtype=float)
+    return np.where((reference_shgc > 0.81) | (reference_shgc == 0), 0.81,
+                    np.where((reference_shgc > 0) & (reference_shgc < 0.16), 0.16, np.round(reference_shgc, 2)))
+
+
+def evaluate_arrays(face_area, aperture_area, building_class, climate_zone: int, ex_wall_r: float, glass_u: float, glass_shgc: float) -> dict:
+    """Run the NCC19 DtS facade calculator on arrays of facades.
+
+    The last axis of face_area and aperture_area holds the four orientations
+    ordered as ORIENTATIONS and any leading axes are evaluated at once, e.g.
+    one row per north angle of a sweep. ex_wall_r, glass_u and glass_shgc can
+    also be arrays, broadcast against those leading axes.
+
+    Returns:
+        A dictionary of NumPy arrays. Per-orientation values keep the shape of
+        the inputs and totals drop the last axis. reference_glazing_u and
+        reference_shgc are not clamped to the NCC19 limits yet.
+    """
+    face_area = np.asarray(face_area, dtype=float)
+    aperture_area = np.asarray(aperture_area, dtype=float)
+    #specifications get a trailing axis to broadcast against the orientations
+    ex_wall_r = np.asarray(ex_wall_r, dtype=float)[..., None]
+    glass_u = np.asarray(glass_u, dtype=float)[..., None]
+    glass_shgc = np.asarray(glass_shgc, dtype=float)[..., None]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wwr = np.where(face_area > 0, np.round(aperture_area / face_area * 100, 2), 0.0)
+        ex_wall_area = np.round(face_area - aperture_area, 2)
+
+        #Method 1
+        band_r_target, target_u, sa_target, band_sa_coe = _rules_of(building_class, climate_zone)
+        band = wwr_band(wwr)
+        wall_u = np.minimum(1 / ex_wall_r, 1 / band_r_target[band])
+        glazing_u = np.where(aperture_area > 0, (target_u * face_area - wall_u * (face_area - aperture_area)) / aperture_area, 0.0)
+
+        ua = (1 / ex_wall_r) * ex_wall_area + glass_u * aperture_area
+        wall_glazing_u = np.where(face_area > 0, np.round(ua / face_area, 2), 0.0)
+        solar_admittance = np.where(aperture_area > 0, np.round(SHADING_MULTIPLIER * glass_shgc * aperture_area / face_area, 2), 0.0)
+
+        shgc = np.where(wwr == 0, 0.0, np.round(sa_target / (SHADING_MULTIPLIER * wwr / 100), 2))
+
+        #Method 2
+        weighted_glazing_u = (glazing_u * aperture_area).sum(axis=-1)
+        reference_glazing_u = np.where(weighted_glazing_u == 0, 0.0, np.round(weighted_glazing_u / aperture_area.sum(axis=-1), 2))
+        reference_wall_u = (wall_u * ex_wall_area).sum(axis=-1) / ex_wall_area.sum(axis=-1)
+
+        #SA COE based on WWR%
+        sa_coe = band_sa_coe[band, np.arange(len(ORIENTATIONS))]
+
+        reference_ac_energy = (face_area * sa_coe * sa_target).sum(axis=-1)
+        reference_shgc = np.where(reference_ac_energy == 0, 0.0, reference_ac_energy / (sa_coe * aperture_area * SHADING_MULTIPLIER).sum(axis=-1))
+        proposed_ac_energy = (face_area * sa_coe * solar_admittance).sum(axis=-1)
+        wall_glazing_u_total = ua.sum(axis=-1) / face_area.sum(axis=-1)
+
+    method1_wall_glazing = (wall_glazing_u < target_u).all(axis=-1)
+    method1_sa = solar_admittance.max(axis=-1) < sa_target.min()
+    method2_wall_glazing = wall_glazing_u_total <= target_u
+    method2_ac_energy = proposed_ac_energy <= reference_ac_energy
+
+    return {
+        'wwr': wwr,
+        'ex_wall_area': ex_wall_area,
+        'wall_u': wall_u,
+        'glazing_u': glazing_u,
+        'shgc': shgc,
+        'wall_glazing_u': wall_glazing_u,
+        'ua': ua,
+        'solar_admittance': solar_admittance,
+        'target_wall_glazing_u': target_u,
+        'solar_admittance_targets': dict(zip(ORIENTATIONS, sa_target.tolist())),
+        'reference_wall_u': reference_wall_u,
+        'reference_glazing_u': reference_glazing_u,
+        'reference_shgc': reference_shgc,
+        'wall_glazing_u_total': wall_glazing_u_total,
+        'reference_ac_energy': reference_ac_energy,
+        'proposed_ac_energy': proposed_ac_energy,
+        'method1_wall_glazing': method1_wall_glazing,
+        'method1_sa': method1_sa,
+        'method2_wall_glazing': method2_wall_glazing,
+        'method2_ac_energy': method2_ac_energy,
+        'method1_compliance': method1_wall_glazing & method1_sa,
+        'method2_compliance': method2_wall_glazing & method2_ac_energy
+    }
+
+
+@dataclass(frozen=True)
+class NCC19Result:
+    """Result of the NCC19 DtS facade calculator for one facade and specification.
+
+    Per-orientation values are tuples ordered as ORIENTATIONS. The result is
+    immutable and hashable, and to_dict gives the JSON-serialisable schema
+    written by the batch command line.
+    """
+    wwr: tuple
+    ex_wall_area: tuple
+    wall_u: tuple
+    glazing_u: tuple
+    glazing_u_display: tuple
+    shgc: tuple
+    shgc_display: tuple
+    wall_glazing_u: tuple
+    solar_admittance: tuple
+    target_wall_glazing_u: float
+    solar_admittance_targets: tuple
+    reference_wall_u: float
+    reference_glazing_u: float
+    reference_shgc: float
+    wall_glazing_u_total: float
+    reference_ac_energy: float
+    proposed_ac_energy: float
+    method1_wall_glazing: bool
+    method1_sa: bool
+    method2_wall_glazing: bool
+    method2_ac_energy: bool
+    method1_compliance: bool
+    method2_compliance: bool
+
+    def by_orientation(self, name: str) -> dict:
+        """Per-orientation value keyed by orientation, e.g. by_orientation('wwr')."""
+        return dict(zip(ORIENTATIONS, getattr(self, name)))
+
+    def to_dict(self) -> dict:
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        for name, value in values.items():
+            if isinstance(value, tuple):
+                values[name] = list(value)
+        values['solar_admittance_targets'] = self.by_orientation('solar_admittance_targets')
+        return values
+
+
+def evaluate(face_area, aperture_area, building_class, climate_zone: int, ex_wall_r: float, glass_u: float, glass_shgc: float) -> NCC19Result:
+    """Run the NCC19 DtS facade calculator.
+
+    Args:
+        face_area: Facade area per orientation (m2), including the apertures.
+        aperture_area: Aperture area per orientation (m2).
+        building_class: NCC building class code (the values of BUILDING_CLASSES).
+        climate_zone: Australian climate zone (1 to 8).
+        ex_wall_r: Proposed external wall R-value.
+        glass_u: Proposed glass U-value.
+        glass_shgc: Proposed glass SHGC.
+
+    Returns:
+        An NCC19Result.
+    """
+    result = evaluate_arrays(face_area, aperture_area, building_class, climate_zone, ex_wall_r, glass_u, glass_shgc)
+
+    reference_glazing_u = float(result['reference_glazing_u'])
+
+    return NCC19Result(
+        wwr=tuple(result['wwr'].tolist()),
+        ex_wall_area=tuple(result['ex_wall_area'].tolist()),
+        wall_u=tuple(result['wall_u'].tolist()),
+        glazing_u=tuple(result['glazing_u'].tolist()),
+        glazing_u_display=tuple(_glazing_u_display(u, reference_glazing_u, orientation)
+                                for u, orientation in zip(result['glazing_u'].tolist(), ORIENTATIONS)),
+        shgc=tuple(result['shgc'].tolist()),
+        shgc_display=tuple(_shgc_display(s) for s in result['shgc'].tolist()),
+        wall_glazing_u=tuple(result['wall_glazing_u'].tolist()),
+        solar_admittance=tuple(result['solar_admittance'].tolist()),
+        target_wall_glazing_u=result['target_wall_glazing_u'],
+        solar_admittance_targets=tuple(result['solar_admittance_targets'].values()),
+        reference_wall_u=float(result['reference_wall_u']),
+        reference_glazing_u=float(clamp_glazing_u(result['reference_glazing_u'])),
+        reference_shgc=float(clamp_shgc(result['reference_shgc'])),
+        wall_glazing_u_total=float(result['wall_glazing_u_total']),
+        reference_ac_energy=float(result['reference_ac_energy']),
+        proposed_ac_energy=float(result['proposed_ac_energy']),
+        method1_wall_glazing=bool(result['method1_wall_glazing']),
+        method1_sa=bool(result['method1_sa']),
+        method2_wall_glazing=bool(result['method2_wall_glazing']),
+        method2_ac_energy=bool(result['method2_ac_energy']),
+        method1_compliance=bool(result['method1_compliance']),
+        method2_compliance=bool(result['method2_compliance']))
+
+
+@lru_cache(maxsize=256)
+def _evaluate_cached(face_area: tuple, aperture_area: tuple, building_class, climate_zone: int,
+                     ex_wall_r: float, glass_u: float, glass_shgc: float) -> NCC19Result:
+    return evaluate(face_area, aperture_area, building_class, climate_zone, ex_wall_r, glass_u, glass_shgc)
+
+
+def cached_evaluate(face_area, aperture_area, building_class, climate_zone: int, ex_wall_r: float, glass_u: float, glass_shgc: float) -> NCC19Result:
+    """evaluate() memoised on the facade areas, class, zone and specification.
+
+    The last 256 distinct inputs are kept. Results are immutable, so the same
+    NCC19Result can be handed out for every call with equal inputs.
+    """
+    return _evaluate_cached(tuple(float(a) for a in face_area), tuple(float(a) for a in aperture_area),
+                            building_class, int(climate_zone), float(ex_wall_r), float(glass_u), float(glass_shgc))
+
+
+def evaluate_orientations(orientations, building_class, climate_zone: int, ex_wall_r: float, glass_u: float, glass_shgc: float) -> NCC19Result:
+    """Run the NCC19 DtS facade calculator on an orientation table.
+
+    orientations is a DataFrame indexed by orientation with the 'Face Area (m2)'
+    and 'Aperture Area (m2)' columns of extract_envelope. The WWR is
+    recalculated from the areas. Results are memoised with cached_evaluate.
+    """
+    orientations = orientations.loc[ORIENTATIONS]
+    return cached_evaluate(orientations['Face Area (m2)'].to_numpy(), orientations['Aperture Area (m2)'].to_numpy(),
+                    building_class, climate_zone, ex_wall_r, glass_u, glass_shgc)
+
+
+def specification_sweep(face_area, aperture_area, building_class, climate_zone: int, ex_wall_r, glass_u, glass_shgc) -> dict:
+    """Run the NCC19 DtS facade calculator for every combination of specifications.
+
+    Args:
+        face_area: Facade area per orientation (m2), including the apertures.
+        aperture_area: Aperture area per orientation (m2).
+        building_class: NCC building class code (the values of BUILDING_CLASSES).
+        climate_zone: Australian climate zone (1 to 8).
+        ex_wall_r: Candidate external wall R-values.
+        glass_u: Candidate glass U-values.
+        glass_shgc: Candidate glass SHGCs.
+
+    Returns:
+        The dictionary of evaluate_arrays with one row per combination, plus
+        the ex_wall_r, glass_u and glass_shgc of each row, 'compliance' (either
+        method is compliant) and 'pareto' (the compliant combinations with no
+        other compliant combination that has a lower or equal R-value, a
+        higher or equal glass U-value and a higher or equal SHGC).
+    """
+    ex_wall_r = np.unique(np.asarray(ex_wall_r, dtype=float))
+    glass_u = np.unique(np.asarray(glass_u, dtype=float))
+    glass_shgc = np.unique(np.asarray(glass_shgc, dtype=float))
+    grid = np.meshgrid(ex_wall_r, glass_u, glass_shgc, indexing='ij')
+
+    result = evaluate_arrays(np.asarray(face_area, dtype=float)[None, :], np.asarray(aperture_area, dtype=float)[None, :],
+                             building_class, climate_zone, grid[0].ravel(), grid[1].ravel(), grid[2].ravel())
+    compliance = result['method1_compliance'] | result['method2_compliance']
+
+    result['ex_wall_r'], result['glass_u'], result['glass_shgc'] = (g.ravel() for g in grid)
+    result['compliance'] = compliance
+    result['pareto'] = pareto_front(compliance.reshape(grid[0].shape)).ravel()
+    return result
+
+
+def pareto_front(compliant: np.ndarray) -> np.ndarray:
+    """Least demanding compliant specifications of a grid.
+
+    compliant is a boolean array over sorted R-values, glass U-values and
+    SHGCs. A specification is dominated when another compliant specification
+    has a lower or equal R-value, a higher or equal U-value and a higher or
+    equal SHGC.
+    """
+    #any compliant specification with R' <= R, U' >= U and SHGC' >= SHGC
+    reachable = np.logical_or.accumulate(compliant, axis=0)
+    reachable = np.flip(np.logical_or.accumulate(np.flip(reachable, axis=1), axis=1), axis=1)
+    reachable = np.flip(np.logical_or.accumulate(np.flip(reachable, axis=2), axis=2), axis=2)
+
+    #the same region without the specification itself is the union of the
+    #regions of its three neighbours towards less demanding values
+    dominated = np.zeros_like(compliant)
+    dominated[1:, :, :] |= reachable[:-1, :, :]
+    dominated[:, :-1, :] |= reachable[:, 1:, :]
+    dominated[:, :, :-1] |= reachable[:, :, 1:]
+    return compliant & ~dominated
@@ -0,0 +1,156 @@
+"""Profiles of whole runs of the Streamlit script, for uploads that are slow.
+
+Profiling is opt-in: every run of every session is profiled when the server
+is started with SPACEXTRACT_PROFILE=1, and the runs of one session while the
+"Profile Runs" toggle of its Diagnostics panel is on. A run is profiled from
+the upload callback to the end of the script with two profilers:
+
+- cProfile, which counts every call of the thread of the session and is
+  written as a .prof file for pstats, snakeviz or gprof2dot.
+- A sampling profiler, which reads the Python stack of that thread at a fixed
+  interval from a background thread and is written as collapsed stacks
+  ("outer;inner;innermost count" lines) for flamegraph.pl or speedscope.
+  It does not slow down the calls, so the time it shows is closer to the
+  time of the run without profiling.
+
+Jobs run in the worker processes are not profiled, they only show as the
+time the script waits for them.
+"""
+import cProfile
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+PROFILE_RUNS = os.environ.get('SPACEXTRACT_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+
+class StackSampler:
+    """Counts the Python stacks of one thread, sampled from a background thread.
+
+    Args:
+        interval: Seconds between two samples.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.thread_id = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id: int = None) -> 'StackSampler':
+        """Sample the given thread, the current one by default, until stop is called."""
+        self.thread_id = thread_id or threading.get_ident()
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._sample, name='stack-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def _sample(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def collapsed(self) -> str:
+        """The stacks in the collapsed format of flamegraph.pl, the most frequent first."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class RunProfiler:
+    """cProfile and sampling profiles of a run split in several calls of the same thread.
+
+    Like StageRecorder, starting a profiler that is already running does
+    nothing, so the upload callback and the script can both start it.
+
+    Args:
+        interval: Seconds between two samples of the sampling profiler.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(interval)
+        self.error = None
+        self._profiling = False
+        self._start = None
+        self.seconds = 0.0
+
+    def start(self) -> 'RunProfiler':
+        if self._start is None:
+            self._start = time.perf_counter()
+        if not self._profiling and self.error is None:
+            try:
+                self.profile.enable()
+                self._profiling = True
+            except ValueError as e:
+                #only one cProfile can run at once from Python 3.12, the sampling profile is still taken
+                self.error = str(e)
+        self.sampler.start()
+        return self
+
+    def stop(self):
+        if self._profiling:
+            self.profile.disable()
+            self._profiling = False
+        self.sampler.stop()
+        if self._start is not None:
+            self.seconds = time.perf_counter() - self._start
+
+    def __enter__(self) -> 'RunProfiler':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def write(self, folder: Path, name: str, **metadata) -> dict:
+        """Write the profiles of a stopped profiler to folder.
+
+        Args:
+            folder: Folder of the files.
+            name: Name of the files, without suffix.
+            metadata: Fields written to the JSON file next to the profiles,
+                e.g. the key of the model and the parameters of the run.
+
+        Returns:
+            The paths of the files keyed by kind: 'prof' (missing when cProfile
+            could not run), 'collapsed' and 'json'.
+        """
+        folder = Path(folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        paths = {}
+        if self.error is None:
+            paths['prof'] = folder.joinpath(f'{name}.prof')
+            self.profile.dump_stats(paths['prof'].as_posix())
+        paths['collapsed'] = folder.joinpath(f'{name}.collapsed')
+        paths['collapsed'].write_text(self.sampler.collapsed(), encoding='utf-8')
+        paths['json'] = folder.joinpath(f'{name}.json')
+        paths['json'].write_text(json.dumps({
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'seconds': self.seconds,
+            'samples': self.sampler.samples,
+            'interval': self.sampler.interval,
+            'cprofile_error': self.error,
+            **metadata
+        }, indent=2, default=str), encoding='utf-8')
+        return paths
@@ -0,0 +1,153 @@
+"""NCC19 Facade Calculator report (.docx).
+
+The report is only assembled when it is requested, and the finished bytes are
+memoised on the compliance result, the orientation table and the report
+details, so downloading it again with unchanged inputs does not rebuild it.
+"""
+import io
+from dataclasses import dataclass
+from functools import lru_cache
+
+from docx import Document
+from docx.shared import Inches, Mm, Pt
+
+import ncc19
+from charts import ncc19_charts, render_png
+from instrumentation import stage
+
+
+@dataclass(frozen=True)
+class ReportDetails:
+    """Project details and proposed specification printed in the report."""
+    project_name: str
+    approved_by: str
+    date: str
+    levels: str
+    building_class: str
+    building_state: str
+    climate_zone: str
+    ex_wall_r: float
+    glass_u: float
+    glass_shgc: float
+
+
+def orientation_rows(orientations) -> tuple:
+    """Header and rows of the orientation table of the report as a hashable tuple.
+
+    orientations is a DataFrame indexed by orientation, e.g. the facade and
+    aperture tables of extract_envelope joined together.
+    """
+    entire_model = orientations.reset_index()
+    entire_model = entire_model.rename(columns={entire_model.columns[0]: 'Face Direction'})
+    return (tuple(entire_model.columns),) + tuple(tuple(str(v) for v in row) for row in entire_model.values)
+
+
+def chart_images(result: ncc19.NCC19Result) -> dict:
+    """PNG images of the NCC19 figures of a result, keyed by figure name."""
+    return render_png(ncc19_charts(result))
+
+
+@lru_cache(maxsize=8)
+def ncc19_report(result: ncc19.NCC19Result, orientations: tuple, details: ReportDetails) -> bytes:
+    """Build the NCC19 Facade Calculator report.
+
+    Args:
+        result: NCC19Result of the proposed design.
+        orientations: Table of facade areas per orientation from orientation_rows.
+        details: ReportDetails of the project.
+
+    Returns:
+        The .docx file as bytes.
+    """
+    method1_compliance = ncc19.compliance_text(result.method1_compliance)
+    method2_compliance = ncc19.compliance_text(result.method2_compliance)
+    with stage('report charts'):
+        images = chart_images(result)
+
+    NCC19 = Document()
+    section = NCC19.sections[0]
+    section.page_height = Mm(350)
+    section.page_width = Mm(297)
+    section.left_margin = Mm(20)
+    section.right_margin = Mm(20)
+    section.top_margin = Mm(25.4)
+    section.bottom_margin = Mm(25.4)
+    section.header_distance = Mm(12.7)
+    section.footer_distance = Mm(12.7)
+    style = NCC19.styles['Normal']
+    font = style.font
+    font.name = 'Arial'
+    font.size = Pt(12)
+
+    x = 2.5
+    h_res = x
+    w_res = 2*x
+
+    header = NCC19.sections[0].header
+
+    header.paragraphs[0].text = f'NCC19 Facade Calculator | Date: {details.date} | Approved by: {details.approved_by}'
+    NCC19.add_heading(f'NCC 2019 DtS Project Summary for {details.project_name}', 0)
+    NCC19.add_paragraph('The summary below provides an overview of where compliance has been achieved for Specification J1.5a - Calculation of U-Value and solar admittance - Method 1 (Single Aspect) and Method 2 (Multiple Apects).')
+    NCC19.add_paragraph(f'This {details.building_class} located in {details.building_state} with a {details.climate_zone} in {details.levels} level(s)')
+
+    paragraph = NCC19.add_paragraph()
+    columns, rows = orientations[0], orientations[1:]
+    t = NCC19.add_table(len(rows)+1, len(columns))
+
+    # Adding style to a table
+    t.style = 'Medium Shading 1'
+
+    # add the header rows.
+    for j in range(len(columns)):
+        t.cell(0,j).text = columns[j]
+
+    # add the rest of the data frame
+    for i in range(len(rows)):
+        for j in range(len(columns)):
+            t.cell(i+1,j).text = rows[i][j]
+
+
+    NCC19.add_heading('METHOD 1:', 1)
+    paragraph = NCC19.add_paragraph()
+    run = paragraph.add_run()
+    run.add_picture(io.BytesIO(images['wall_glazing_u_bar']), width=Inches(w_res), height= Inches(h_res))
+    run_2 = paragraph.add_run()
+    run_2.add_picture(io.BytesIO(images['sa_bar']), width=Inches(w_res), height= Inches(h_res))
+
+    NCC19.add_heading('METHOD 2:', 1)
+    paragraph = NCC19.add_paragraph()
+    run = paragraph.add_run()
+    run.add_picture(io.BytesIO(images['wall_glazing_u_total_bar']), width=Inches(w_res), height= Inches(h_res))
+    run_2 = paragraph.add_run()
+    run_2.add_picture(io.BytesIO(images['AC_energy']), width=Inches(w_res), height= Inches(h_res))
+
+    NCC19.add_paragraph('The minimum NCC19 DtS thermal envelope requirements are as follows:')
+
+    t2 = NCC19.add_table(rows=1, cols=3)
+    t2_cells = t2.rows[0].cells
+    t2_cells[0].text = 'External Walls R-value'
+    t2_cells[1].text = 'Glass U-value'
+    t2_cells[2].text = 'Glass SHGC'
+
+    row_cells = t2.add_row().cells
+    row_cells[0].text = f'{round(1/result.reference_wall_u,2)}'
+    row_cells[1].text = f'{result.reference_glazing_u}'
+    row_cells[2].text = f'{round(result.reference_shgc,2)}'
+
+    t2.style = 'Medium Shading 1'
+
+    NCC19.add_paragraph('')
+
+    p0 = NCC19.add_paragraph(f'Therefore, the proposed thermal envelope performance including an ')
+
+    p0.add_run(f'External Wall R-value of {details.ex_wall_r}, and Glass U-value & SHGC of {details.glass_u} / {details.glass_shgc}').bold= True
+    p0.add_run(' is a ')
+    p0.add_run(f'{method1_compliance}').bold= True
+    p0.add_run(' against NCC19 DtS Reference Method 1, and ')
+    p0.add_run(f'{method2_compliance}').bold= True
+    p0.add_run(' against NCC19 DtS Reference Method 2.')
+
+    buffer = io.BytesIO()
+    with stage('report save'):
+        NCC19.save(buffer)
+    return buffer.getvalue()
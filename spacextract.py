@@ -0,0 +1,398 @@
+"""SpaceXtract command line: envelope extraction and NCC19 compliance of many models.
+
+Runs the same calculations as the Streamlit app without importing streamlit,
+writing one CSV (room details) and one JSON (envelope and NCC19 results) per
+model plus a summary CSV of all models. Models are spread over a pool of
+worker processes. Models found in sub-folders of the inputs are written to
+the same sub-folders of the output folder, so models with the same file name
+never overwrite each other.
+
+Example:
+    python spacextract.py ./options/*.hbjson --building-class 5 --climate-zone 2 -o ./results -j 16
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
+from multiprocessing import Manager
+from pathlib import Path
+
+from pandas import DataFrame
+
+import ncc19
+from adjacency import solve_adjacency
+from envelope import AREA_CALC_METHODS, ORIENTATIONS, envelope_from_table, relative_compactness
+from face_table import hbjson_face_table
+from hbjson_stream import read_face_table
+from instrumentation import StageRecorder, stage
+
+DEFAULT_PARAMETERS = {
+    'north': 0.0,
+    'area_calc_method': 'Conditioned Zones',
+    'internal_walls': False,
+    'solve_adjacency': False,
+    'building_class': 5,
+    'climate_zone': 2,
+    'ex_wall_r': 1.4,
+    'glass_u': 3.5,
+    'glass_shgc': 0.5
+}
+
+
+def find_models(inputs: list) -> list:
+    """Get the HBJSON files from a list of folders, searched with their sub-folders, files and glob patterns."""
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(sorted(path.rglob('*.hbjson')))
+        elif path.is_file():
+            paths.append(path)
+        else:
+            paths.extend(Path(p) for p in sorted(glob.glob(item, recursive=True)))
+    # keep the first occurrence of files matched more than once
+    return list(dict.fromkeys(p.resolve() for p in paths))
+
+
+def model_names(paths: list) -> list:
+    """Names of the result files of models, their paths relative to the folder holding all of them.
+
+    The names have no suffix and use forward slashes, e.g. 'a/model' and
+    'b/model' for a/model.hbjson and b/model.hbjson.
+    """
+    paths = [Path(p).resolve() for p in paths]
+    if not paths:
+        return []
+    root = Path(os.path.commonpath([p.parent for p in paths]))
+    return [p.relative_to(root).with_suffix('').as_posix() for p in paths]
+
+
+def building_class_code(value: str):
+    """Parse a building class code (2, 3, 5, 6, 8, 9a, 9a ward, 9b, 9c) or label."""
+    if value in ncc19.BUILDING_CLASSES:
+        return ncc19.BUILDING_CLASSES[value]
+    code = int(value) if value.isdigit() else value
+    if code not in set(ncc19.BUILDING_CLASSES.values()):
+        raise argparse.ArgumentTypeError(f'unknown building class: {value!r}')
+    return code
+
+
+def evaluate_model(hbjson_path: Path, parameters: dict, progress=None) -> tuple:
+    """Extract the envelope of an HBJSON file and check it against NCC19.
+
+    Args:
+        hbjson_path: Path to the HBJSON file.
+        parameters: Dictionary with the keys of DEFAULT_PARAMETERS.
+        progress: Optional function called with the name of each stage
+            (parse and adjacency with solve_adjacency, extract, ncc19) when
+            it starts.
+
+    Returns:
+        A tuple with a JSON-serialisable result dictionary and the DataFrame of
+        room details.
+    """
+    progress = progress or (lambda stage: None)
+    start = time.perf_counter()
+    hbjson_path = Path(hbjson_path)
+    adjacency = None
+
+    if parameters['solve_adjacency']:
+        # the intersection needs the whole model
+        progress('parse')
+        with stage('parse'):
+            hbjson = json.loads(hbjson_path.read_text())
+        progress('adjacency')
+        with stage('adjacency'):
+            hbjson['rooms'], adjacency = solve_adjacency(hbjson)
+        progress('extract')
+        display_name = hbjson.get('display_name') or hbjson['identifier']
+        with stage('face table'):
+            table = hbjson_face_table(hbjson)
+    else:
+        # the rooms are streamed from the file one at a time
+        progress('extract')
+        with stage('face table'):
+            header, table = read_face_table(hbjson_path)
+        display_name = header['display_name']
+
+    with stage('envelope'):
+        envelope = envelope_from_table(table, parameters['area_calc_method'], parameters['internal_walls'], parameters['north'])
+    model_faces_vertical = envelope['model_faces_vertical']
+    model_apertures = envelope['model_apertures']
+    face_area = model_faces_vertical['Face Area (m2)'].values
+    aperture_area = model_apertures['Aperture Area (m2)'].values
+
+    result = {
+        'model': hbjson_path.stem,
+        'path': hbjson_path.as_posix(),
+        'display_name': display_name,
+        'parameters': parameters,
+        'rooms': len(table.room_names),
+        'faces': table.rows,
+        'target_rooms': len(envelope['target_rooms_index']),
+        'relative_compactness': float(relative_compactness(envelope['model_data'])),
+        'shade_area': float(envelope['model_shade'].iloc[0, 0]),
+        'roof_area': float(envelope['model_roof'].iloc[0, 0]),
+        'floor_area': float(envelope['model_floor'].iloc[0, 0]),
+        'orientations': {
+            o: {
+                'face_area': float(face_area[i]),
+                'aperture_area': float(aperture_area[i]),
+                'ex_wall_area': float(model_faces_vertical['ExWall Area (m2)'].iloc[i]),
+                'wwr': float(model_faces_vertical['WWR (%)'].iloc[i])
+            } for i, o in enumerate(ORIENTATIONS)
+        },
+        'adjacency': adjacency,
+        'ncc19': None
+    }
+
+    if envelope['target_rooms_index']:
+        progress('ncc19')
+        with stage('ncc19'):
+            result['ncc19'] = ncc19.evaluate(
+                face_area, aperture_area, parameters['building_class'], parameters['climate_zone'],
+                parameters['ex_wall_r'], parameters['glass_u'], parameters['glass_shgc']).to_dict()
+
+    result['seconds'] = time.perf_counter() - start
+    return result, envelope['model_data']
+
+
+def write_results(result: dict, model_data: DataFrame, output_folder: Path):
+    """Write the room details CSV and the result JSON of one model, named after result['model']."""
+    output_folder.joinpath(result['model']).parent.mkdir(parents=True, exist_ok=True)
+    model_data.to_csv(output_folder.joinpath(f"{result['model']} Space Calculations.csv"), index=True)
+    output_folder.joinpath(f"{result['model']}.json").write_text(json.dumps(result, indent=2))
+
+
+def summary_row(result: dict) -> dict:
+    row = {
+        'model': result['model'],
+        'display_name': result['display_name'],
+        'rooms': result['rooms'],
+        'target_rooms': result['target_rooms'],
+        'relative_compactness': round(result['relative_compactness'], 2),
+        'error': result.get('error')
+    }
+    for o, values in result.get('orientations', {}).items():
+        row[f'WWR {o} (%)'] = values['wwr']
+    ncc = result.get('ncc19')
+    if ncc:
+        row['Method 1'] = ncc19.compliance_text(ncc['method1_compliance'])
+        row['Method 2'] = ncc19.compliance_text(ncc['method2_compliance'])
+        row['Wall Glazing U-Value Total'] = round(ncc['wall_glazing_u_total'], 2)
+        row['Proposed AC Energy'] = round(ncc['proposed_ac_energy'], 2)
+        row['Reference AC Energy'] = round(ncc['reference_ac_energy'], 2)
+    adjacency = result.get('adjacency')
+    if adjacency:
+        row['candidate_pairs'] = adjacency['candidate_pairs']
+        row['all_pairs'] = adjacency['all_pairs']
+        row['adjacency_seconds'] = round(adjacency['seconds'], 3)
+    row['seconds'] = round(result.get('seconds', 0), 3)
+    return row
+
+
+def _error_result(name: str, error: Exception) -> dict:
+    return {'model': name, 'display_name': None, 'rooms': 0,
+            'target_rooms': 0, 'relative_compactness': 0, 'error': f'{type(error).__name__}: {error}'}
+
+
+def _run_model(hbjson_path: Path, name: str, parameters: dict, output_folder: Path, status=None, timings: bool = False,
+               trace_memory: bool = False) -> dict:
+    """Evaluate and write one model, returning its summary row.
+
+    name is the name of the model in the result files and the summary, see
+    model_names. status is an optional shared dictionary where the stage of the model is
+    recorded under the process id of the worker. With timings the row also
+    holds the records of the StageRecorder of the model under 'stages'.
+    """
+    def progress(name):
+        if status is not None:
+            status[os.getpid()] = f'{Path(hbjson_path).name}: {name}'
+
+    recorder = StageRecorder(trace_memory).start() if timings else None
+    try:
+        result, model_data = evaluate_model(hbjson_path, parameters, progress)
+        result['model'] = name
+        progress('write')
+        with stage('write'):
+            write_results(result, model_data, output_folder)
+    except Exception as e:
+        result = _error_result(name, e)
+    finally:
+        progress('idle')
+        if recorder is not None:
+            recorder.stop()
+
+    row = summary_row(result)
+    if recorder is not None:
+        row['stages'] = recorder.records(model=result['model'], rooms=result['rooms'], faces=result.get('faces', 0),
+                                         solve_adjacency=parameters['solve_adjacency'])
+    return row
+
+
+def evaluate_many(paths: list, parameters: dict, output_folder: Path, workers: int = 1, max_in_flight: int = None,
+                  on_status=None, status_interval: float = 10.0, timings: bool = False, trace_memory: bool = False):
+    """Evaluate HBJSON files in a pool of worker processes.
+
+    Each worker writes the result files of its model and only sends the summary
+    row back, and at most max_in_flight models are submitted or waiting to be
+    yielded at any time, which bounds the memory in use whatever the number of
+    models.
+
+    A model whose worker dies, e.g. killed when out of memory, gets an error
+    row like a model that fails. The other models in the pool at that time
+    get the same error row, since the pool cannot tell which model killed
+    it, and the remaining models run in a new pool.
+
+    Args:
+        paths: List of HBJSON files.
+        parameters: Dictionary with the keys of DEFAULT_PARAMETERS.
+        output_folder: Folder for the result files.
+        workers: Number of worker processes. With 1 the models are evaluated
+            in this process.
+        max_in_flight: Maximum number of models in flight. Defaults to twice
+            the number of workers.
+        on_status: Optional function called every status_interval seconds
+            without a finished model, with a dictionary of the current stage of
+            each worker keyed by process id.
+        status_interval: Seconds between two on_status calls.
+        timings: Record the stages of each model in the 'stages' of its row.
+        trace_memory: Also trace the peak memory of the stages, see StageRecorder.
+
+    Yields:
+        Summary rows in the order of paths.
+    """
+    names = model_names(paths)
+    if workers <= 1:
+        for hbjson_path, name in zip(paths, names):
+            yield _run_model(hbjson_path, name, parameters, output_folder, None, timings, trace_memory)
+        return
+
+    max_in_flight = max(max_in_flight or 2 * workers, workers)
+    with Manager() as manager:
+        status = manager.dict()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = {}
+            finished = {}
+            next_submit = 0
+            next_yield = 0
+            while next_yield < len(paths):
+                while next_submit < len(paths) and len(pending) + len(finished) < max_in_flight:
+                    try:
+                        future = pool.submit(_run_model, paths[next_submit], names[next_submit], parameters,
+                                             output_folder, status, timings, trace_memory)
+                    except BrokenProcessPool:
+                        pool.shutdown(wait=False)
+                        pool = ProcessPoolExecutor(max_workers=workers)
+                        continue
+                    pending[next_submit] = future
+                    next_submit += 1
+
+                done, _ = wait(pending.values(), timeout=status_interval, return_when=FIRST_COMPLETED)
+                if not done and on_status is not None:
+                    on_status(dict(status))
+
+                broken = False
+                for i in [i for i, future in pending.items() if future.done()]:
+                    try:
+                        finished[i] = pending.pop(i).result()
+                    except Exception as e:
+                        # _run_model catches the errors of the model, these come from the pool
+                        finished[i] = summary_row(_error_result(names[i], e))
+                        broken = broken or isinstance(e, BrokenProcessPool)
+                if broken:
+                    # the models still pending in the dead pool fail in the next rounds, the others go to a new pool
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+
+                # hand back the results in submission order
+                while next_yield in finished:
+                    yield finished.pop(next_yield)
+                    next_yield += 1
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+
+def _print_status(status: dict):
+    busy = [f'  [{pid}] {stage}' for pid, stage in sorted(status.items()) if not stage.endswith(': idle')]
+    print('Workers:\n' + '\n'.join(busy))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='spacextract',
+        description='Extract building envelope information and check NCC19 DtS facade '
+                    'compliance for a set of .hbjson models.')
+    parser.add_argument('inputs', nargs='+', help='Folders (searched with their sub-folders), .hbjson files or glob patterns.')
+    parser.add_argument('-o', '--output', default='./spacextract_results', help='Folder for the result files.')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help='Maximum number of models held at once. Defaults to twice the workers.')
+    parser.add_argument('--north', type=float, default=DEFAULT_PARAMETERS['north'],
+                        help='North angle in degrees, counter-clockwise from the Y-axis.')
+    parser.add_argument('--method', dest='area_calc_method', choices=AREA_CALC_METHODS,
+                        default=DEFAULT_PARAMETERS['area_calc_method'], help='Facade area calculation methodology.')
+    parser.add_argument('--internal-walls', action='store_true', help='Include internal walls in the facade areas.')
+    parser.add_argument('--solve-adjacency', action='store_true', help='Solve adjacencies between rooms first.')
+    parser.add_argument('--building-class', type=building_class_code, default=DEFAULT_PARAMETERS['building_class'],
+                        help='NCC building class (2, 3, 5, 6, 8, 9a, "9a ward", 9b or 9c).')
+    parser.add_argument('--climate-zone', type=int, choices=range(1, 9), default=DEFAULT_PARAMETERS['climate_zone'],
+                        help='Australian climate zone.')
+    parser.add_argument('--wall-r', dest='ex_wall_r', type=float, default=DEFAULT_PARAMETERS['ex_wall_r'],
+                        help='External wall R-value.')
+    parser.add_argument('--glass-u', type=float, default=DEFAULT_PARAMETERS['glass_u'], help='Glass U-value.')
+    parser.add_argument('--glass-shgc', type=float, default=DEFAULT_PARAMETERS['glass_shgc'], help='Glass SHGC.')
+    parser.add_argument('--timings', default=None,
+                        help='Append the wall time, CPU time and peak memory of each stage of each model to this '
+                             'file as JSON lines.')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Trace the peak memory of each stage for --timings. Slows down the evaluation.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    parameters = {key: getattr(args, key) for key in DEFAULT_PARAMETERS}
+
+    paths = find_models(args.inputs)
+    if not paths:
+        print('No .hbjson files found.')
+        return 1
+
+    output_folder = Path(args.output)
+    output_folder.mkdir(parents=True, exist_ok=True)
+
+    workers = max(1, min(args.workers, len(paths)))
+    #the lines of every run are appended to the same file, told apart by the start time of the run
+    run = datetime.datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+    rows = []
+    with ExitStack() as stack:
+        timings = stack.enter_context(open(args.timings, 'a')) if args.timings else None
+        for row in evaluate_many(paths, parameters, output_folder, workers, args.max_in_flight, on_status=_print_status,
+                                 timings=timings is not None, trace_memory=args.trace_memory):
+            for record in row.pop('stages', ()):
+                timings.write(json.dumps({'run': run, **record}) + '\n')
+            rows.append(row)
+            if row.get('error'):
+                print(f"[{len(rows)}/{len(paths)}] {row['model']}: failed - {row['error']}")
+            else:
+                print(f"[{len(rows)}/{len(paths)}] {row['model']}: {row['seconds']:.2f} s")
+    elapsed = time.perf_counter() - start
+
+    DataFrame(rows).to_csv(output_folder.joinpath('summary.csv'), index=False)
+    failed = sum(1 for row in rows if row.get('error'))
+    print(f'{len(rows)} models in {elapsed:.1f} s on {workers} worker(s) '
+          f'({len(rows) / elapsed * 60:.1f} models/min), {failed} failed.')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
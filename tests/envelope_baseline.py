@@ -0,0 +1,216 @@
+"""Envelope extraction of the original app, kept as the oracle of test_envelope.
+
+The loops over the honeybee rooms and the pandas aggregation of the
+"Calculating Building Geometry Areas/Details" block of SpaceXtract_AUS.py at
+the baseline commit (0804a3c), moved into a function of the model and the
+sidebar inputs and otherwise unchanged.
+"""
+import math
+
+import pandas as pd
+from ladybug_geometry.geometry2d.pointvector import Vector2D
+from pandas import DataFrame
+
+
+def baseline_envelope(model, area_calc_method: str = 'Conditioned Zones', internal_walls: bool = False,
+                      north_: float = 0.0) -> dict:
+    """The DataFrames of the original app for a Honeybee model, keyed like envelope.extract_envelope."""
+    vectors = [math.cos(math.radians(north_+90)), math.sin(math.radians(north_+90))]
+
+    #Extracting properties based on rooms
+    model_data = {'display_name':[], 'Conditioning Status':[], 'Program Type': [], 'volume (m3)': [],'floor_area (m2)': [],'roof_area (m2)':[],  'exterior_wall_area (m2)': [],
+                    'exterior_aperture_area (m2)': [], 'exterior_skylight_area (m2)':[]}
+
+    internal_srf_area = []
+    UG_wall_area = []
+    UG_roof_area = []
+    adjacent_Gfloors = []
+    room_id = []
+
+    for room in model.rooms:
+        model_data['display_name'].append(room.display_name)
+        model_data['Conditioning Status'].append(room.properties.energy.is_conditioned)
+        model_data['Program Type'].append(room.properties.energy.program_type._identifier)
+        model_data['volume (m3)'].append(round(room.volume,2))
+        model_data['floor_area (m2)'].append(round(room.floor_area,2)) #includes both Surface and Ground BC floors
+        model_data['roof_area (m2)'].append(round((room.exterior_roof_area - room.exterior_skylight_aperture_area),2))#exterior_roof_area includes BOTH the area of opaque and transparent parts of the roofs
+        model_data['exterior_wall_area (m2)'].append(round((room.exterior_wall_area - room.exterior_aperture_area),2)) #exterior_wall_area includes BOTH the area of opaque and transparent parts of the walls
+        model_data['exterior_aperture_area (m2)'].append(round(room.exterior_aperture_area,2))
+        model_data['exterior_skylight_area (m2)'].append(round(room.exterior_skylight_aperture_area,2))
+
+        for face in room.faces:
+            room_id.append(room.display_name)
+            #internal walls
+            if face.boundary_condition.name == 'Surface' and face.azimuth > 0 and face.type.name != 'AirBoundary':
+                internal_srf_area.append(round(face.area,2))
+            else:
+                internal_srf_area.append(0)
+            #UG walls
+            if face.boundary_condition.name == 'Ground' and face.type.name == 'Wall':
+                UG_wall_area.append(round(face.area,2))
+            else:
+                UG_wall_area.append(0)
+            #UG Roofs
+            if face.boundary_condition.name == 'Ground' and face.type.name == 'Floor':
+                adjacent_Gfloors = round(face.area,2)
+            if face.boundary_condition.name == 'Ground' and face.type.name == 'RoofCeiling' and round(face.area,2) != adjacent_Gfloors:
+                UG_roof_area.append(round(face.area,2))
+            else:
+                UG_roof_area.append(0)
+
+    internal = DataFrame([room_id,internal_srf_area],['ROOM_ID','Internal_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
+    UndergroundWalls = DataFrame([room_id,UG_wall_area],['ROOM_ID','UG_Wall_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
+    UndergroundRoofs = DataFrame([room_id,UG_roof_area],['ROOM_ID','UG_Roof_Faces']).transpose().sort_values('ROOM_ID').groupby('ROOM_ID').sum()
+
+    model_data = DataFrame.from_dict(model_data).sort_values('display_name').set_index('display_name')
+
+
+    model_data['internal_wall_area (m2)'] = internal['Internal_Faces']
+    model_data['underground_wall_area (m2)'] = UndergroundWalls['UG_Wall_Faces']
+    model_data['underground_roof_area (m2)'] = UndergroundRoofs['UG_Roof_Faces']
+
+    model_shade = {'External Shades':[]}
+
+    for shade in model.outdoor_shades:
+        model_shade['External Shades'].append(shade.area)
+
+    model_shade = DataFrame.from_dict(model_shade).sum()
+    model_shade = pd.DataFrame(model_shade, columns = [f'Total Area (m2)'])
+
+    #Extracting room index based on facade calc methodology
+
+    target_rooms_index = []
+
+    for i,room in enumerate(range(len(model_data.index))):
+
+        if (area_calc_method == 'Conditioned Zones') and (model.rooms[room].properties.energy.is_conditioned == True):
+            target_rooms_index.append(i)
+
+        elif area_calc_method == 'Entire Building':
+            target_rooms_index.append(i)
+
+    #Surface Areas based on directions
+    roof_faces_area = []
+    floor_faces_area = []
+    vert_face_area = []
+    face_orientation = []
+
+    aperture_orientation = {'North':[],'East':[],'South':[],'West':[]}
+    aperture_area_north = []
+    aperture_area_south = []
+    aperture_area_east = []
+    aperture_area_west = []
+
+    model_roof = {'Roof-Ceilings':[]}
+    model_floor = {'Floors':[]}
+
+
+    for room_index in target_rooms_index:
+
+        for aperture in range(len(model.rooms[room_index].exterior_apertures)):
+            if model.rooms[room_index].exterior_apertures[aperture].normal.z != 1: #excluding skylights if any
+
+                aper_azimuth = model.rooms[room_index].exterior_apertures[aperture].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
+
+                if  aper_azimuth <= 45 or aper_azimuth > 315:
+                    aperture_area_north.append(model.rooms[room_index].exterior_apertures[aperture].area)
+
+                elif aper_azimuth > 45 and aper_azimuth <= 135:
+                    aperture_area_east.append(model.rooms[room_index].exterior_apertures[aperture].area)
+
+                elif 135 < aper_azimuth <= 225:
+                    aperture_area_south.append(model.rooms[room_index].exterior_apertures[aperture].area)
+
+                elif 225 < aper_azimuth <= 315:
+                    aperture_area_west.append(model.rooms[room_index].exterior_apertures[aperture].area)
+
+
+
+        for face in range(len(model.rooms[room_index].faces)):
+            if internal_walls:
+                if (model.rooms[room_index].faces[face].type.name == 'Wall'):
+
+                    vert_face_azimuth = model.rooms[room_index].faces[face].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
+
+                    if vert_face_azimuth <= 45 or vert_face_azimuth > 315:
+                        face_orientation.append('North')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 45 and vert_face_azimuth <= 135:
+                        face_orientation.append('East')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 135 and vert_face_azimuth <= 225:
+                        face_orientation.append('South')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 225 and vert_face_azimuth <= 315:
+                        face_orientation.append('West')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+            else:
+                if (model.rooms[room_index].faces[face].boundary_condition.name == 'Outdoors') and (model.rooms[room_index].faces[face].type.name != 'RoofCeiling') and (model.rooms[room_index].faces[face].type.name != 'Floor'):
+
+                    vert_face_azimuth = model.rooms[room_index].faces[face].horizontal_orientation(north_vector=Vector2D(vectors[0],vectors[1]))
+
+                    if vert_face_azimuth <= 45 or vert_face_azimuth > 315:
+                        face_orientation.append('North')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 45 and vert_face_azimuth <= 135:
+                        face_orientation.append('East')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 135 and vert_face_azimuth <= 225:
+                        face_orientation.append('South')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+                    elif vert_face_azimuth > 225 and vert_face_azimuth <= 315:
+                        face_orientation.append('West')
+                        vert_face_area.append(int(model.rooms[room_index].faces[face].area))
+
+            #checking horizontal faces
+            if model.rooms[room_index].faces[face].type.name == 'RoofCeiling':
+                horiz_face_area = model.rooms[room_index].faces[face].area
+                roof_faces_area.append(round(horiz_face_area,2))
+
+            if model.rooms[room_index].faces[face].type.name == 'Floor': #if there is any exposed floor, if not returns 0
+                horiz_face_area = model.rooms[room_index].faces[face].area
+                floor_faces_area.append(round(horiz_face_area,2))
+
+
+    aperture_orientation['North'] = round(sum(aperture_area_north),2)
+    aperture_orientation['East'] = round(sum(aperture_area_east),2)
+    aperture_orientation['South'] = round(sum(aperture_area_south),2)
+    aperture_orientation['West'] = round(sum(aperture_area_west),2)
+    model_apertures = DataFrame.from_dict([aperture_orientation]).transpose()
+    model_apertures.rename(columns = {0:'Aperture Area (m2)'}, inplace= True)
+    model_apertures = model_apertures.sort_index()
+
+
+    model_faces_vertical = DataFrame([face_orientation,vert_face_area]).transpose()
+    model_faces_vertical.rename(columns = {0:'Face Orientation', 1:'Face Area (m2)'}, inplace= True)
+    model_faces_vertical = model_faces_vertical.groupby('Face Orientation').sum()
+    model_faces_vertical = model_faces_vertical.sort_index()
+
+
+    model_faces_vertical['ExWall Area (m2)'] = round((model_faces_vertical['Face Area (m2)'] - model_apertures['Aperture Area (m2)']).astype(float),2)
+    model_faces_vertical['WWR (%)'] = round(((model_apertures['Aperture Area (m2)'] / model_faces_vertical['Face Area (m2)'])*100).astype(float),2)
+    model_faces_vertical['WWR (%)'].fillna(0, inplace=True)
+
+    model_roof['Roof-Ceilings'] = roof_faces_area
+    model_roof_DF = DataFrame.from_dict(model_roof).sum()
+    model_roof_DF = pd.DataFrame(model_roof_DF, columns = [f'Calculated {area_calc_method} Area (m2)'])
+
+    model_floor['Floors'] = floor_faces_area
+    model_floor_DF = DataFrame.from_dict(model_floor).sum()
+    model_floor_DF = pd.DataFrame(model_floor_DF, columns = [f'Calculated {area_calc_method} Area (m2)'])
+
+    return {
+        'model_data': model_data,
+        'model_shade': model_shade,
+        'target_rooms_index': target_rooms_index,
+        'model_apertures': model_apertures,
+        'model_faces_vertical': model_faces_vertical,
+        'model_roof': model_roof_DF,
+        'model_floor': model_floor_DF
+    }
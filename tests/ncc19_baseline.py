@@ -0,0 +1,417 @@
+"""NCC19 facade calculator of the original app, kept as the oracle of test_ncc19.
+
+The building class and climate zone options of the sidebar and the "DtS
+Facade Calculation NCC2019 (AUSTRALIA)" block of SpaceXtract_AUS.py at the
+baseline commit (0804a3c), moved into a function of the facade DataFrames
+and the sidebar inputs. The if/elif blocks are unchanged. The Streamlit
+layout, charts and report are left out, and the values the block showed
+with st.metric are collected in lists instead.
+"""
+import numpy as np
+from pandas import DataFrame
+
+bldg_classes_ncc19 = {'Class 2 - apartment building (Common Area)':2,
+'Class 3 - student accommodation':3,
+'Class 3 - hotel':3,
+'Class 3 - other':3,
+'Class 5 - office building':5,
+'Class 6 - department stores, shopping centres':6,
+'Class 6 - display glazing':6,
+'Class 6 - restaurants, cafes, bars':6,
+'Class 8 - factory':8,
+'Class 9a - health-care buildings':'9a',
+'Class 9a - ward':'9a ward',
+'Class 9b - churches, chapels or the like':'9b',
+'Class 9b - early childhood centres':'9b',
+'Class 9b - public halls, function rooms or the like':'9b',
+'Class 9b - schools':'9b',
+'Class 9b - single auditorium theatres and cinemas':'9b',
+'Class 9b - sports venues or the like':'9b',
+'Class 9b - theatres and cinemas with multiple auditoria, art galleries or the like':'9b',
+'Class 9c - aged care building':'9c'}
+
+aus_climate_zone = {'Climate Zone 1 - High humidity summer, warm winter':1,
+'Climate Zone 2 - Warm humid summer, mild winter':2,
+'Climate Zone 3 - Hot dry summer, warm winter':3,
+'Climate Zone 4 - Hot dry summer, cool winter':4,
+'Climate Zone 5 - Warm temperate':5,
+'Climate Zone 6 - Mild temperate':6,
+'Climate Zone 7 - Cool temperate':7,
+'Climate Zone 8 - Alpine':8}
+
+
+def baseline_ncc19(model_faces_vertical: DataFrame, model_apertures: DataFrame, building_class: str, climate_zone: str,
+                   ex_wall_dts: float, glass_u_dts: float, glass_shgc_dts: float) -> dict:
+    """The values of the original calculator for the facades of the envelope, keyed by their names in the app.
+
+    model_faces_vertical and model_apertures hold the four orientations in
+    the order of the app (East, North, South, West), building_class and
+    climate_zone are keys of bldg_classes_ncc19 and aus_climate_zone.
+    """
+    #R Target
+    R_target = []
+    for i in range(0,4):
+        if model_faces_vertical['WWR (%)'].iloc[i] <= 20:
+            if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
+                if aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 5 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7 or aus_climate_zone[climate_zone] == 8:
+                    R_target.append(1.4)
+                elif aus_climate_zone[climate_zone] == 1:
+                    R_target.append(2.4)
+            elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+                if aus_climate_zone[climate_zone] == 1 or aus_climate_zone[climate_zone] == 3:
+                    R_target.append(3.3)
+                elif aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5:
+                    R_target.append(1.4)
+                elif aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
+                    R_target.append(2.8)
+                elif aus_climate_zone[climate_zone] == 8:
+                    R_target.append(3.8)
+        elif model_faces_vertical['WWR (%)'].iloc[i] > 20:
+            R_target.append(1.0)
+
+    Wall_U_Value = []
+    for i in range(0,4):
+        if model_faces_vertical['WWR (%)'].iloc[i] <= 20 and 1/ex_wall_dts >= 1/R_target[i]:
+            Wall_U_Value.append(1/R_target[i])
+        else:
+            if model_faces_vertical['WWR (%)'].iloc[i] > 20 and 1/ex_wall_dts >= 1/R_target[i]:
+                Wall_U_Value.append(1/R_target[i])
+            else:
+                Wall_U_Value.append(1/ex_wall_dts)
+
+
+    shading_multi = 1.0 #assuming no shades for reference buildings and will be equal for all orientations
+
+    #Target Wall Glazing U-values
+    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
+        target_wall_glazing_U = 2.0
+    else:
+        if aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5:
+            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+                target_wall_glazing_U = 2.0
+        elif aus_climate_zone[climate_zone] == 1 or aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
+            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+                target_wall_glazing_U = 1.1
+        elif aus_climate_zone[climate_zone] == 8:
+            if bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+                target_wall_glazing_U = 0.9
+
+    u_value_glazing = []
+    wall_glazing_u_value = []
+    solar_admittance_single = []
+    sum_UA = []
+
+    for i in range(0,4):
+        x = (target_wall_glazing_U*model_faces_vertical['Face Area (m2)'].iloc[i]-(Wall_U_Value[i]*(model_faces_vertical['Face Area (m2)'].iloc[i]-model_apertures['Aperture Area (m2)'].iloc[i])))/model_apertures['Aperture Area (m2)'].iloc[i]
+        UA = ((1/ex_wall_dts)*model_faces_vertical['ExWall Area (m2)'].iloc[i]) + (glass_u_dts*model_apertures['Aperture Area (m2)'].iloc[i])
+        sum_UA.append(((1/ex_wall_dts)*model_faces_vertical['ExWall Area (m2)'].iloc[i]) + (glass_u_dts*model_apertures['Aperture Area (m2)'].iloc[i]))
+        wall_glazing_u_value.append(round(UA/model_faces_vertical['Face Area (m2)'].iloc[i],2))
+
+        if x == np.inf:
+            u_value_glazing.append(0) #Y66
+        else:
+            u_value_glazing.append(x)
+        #----
+        if model_apertures['Aperture Area (m2)'].iloc[i] == 0 :
+            solar_admittance_single.append(0)
+        elif model_apertures['Aperture Area (m2)'].iloc[i] > 0 :
+            solar_admittance_single.append(round((shading_multi*glass_shgc_dts*model_apertures['Aperture Area (m2)'].iloc[i]) / model_faces_vertical['Face Area (m2)'].iloc[i],2))
+
+
+    dts_glazing_U = DataFrame([u_value_glazing,model_apertures['Aperture Area (m2)'].values]).transpose()
+    dts_glazing_U.rename(columns = {0:'U-Value Glazing', 1:'Vision Area'},index = {0:'East',1:'North',2:'South',3:'West'}, inplace= True)
+
+    dts_glazing_U['Area Weighted U-value Glazing'] = dts_glazing_U['U-Value Glazing']*model_apertures['Aperture Area (m2)']
+    if dts_glazing_U['Area Weighted U-value Glazing'].sum() == 0:
+        Reference_Building_glazing_U_value = 0
+    else:
+        Reference_Building_glazing_U_value = round(dts_glazing_U['Area Weighted U-value Glazing'].sum()/model_apertures['Aperture Area (m2)'].sum(),2)
+    Reference_Building_wall_U_value = (Wall_U_Value[0]*model_faces_vertical['ExWall Area (m2)'].iloc[0]+Wall_U_Value[1]*model_faces_vertical['ExWall Area (m2)'].iloc[1]+Wall_U_Value[2]*model_faces_vertical['ExWall Area (m2)'].iloc[2]+Wall_U_Value[3]*model_faces_vertical['ExWall Area (m2)'].iloc[3]) / model_faces_vertical['ExWall Area (m2)'].sum()
+
+    #Solar admittancce targets
+    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
+        if aus_climate_zone[climate_zone] ==2 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] == 5 or aus_climate_zone[climate_zone] == 6 or aus_climate_zone[climate_zone] == 7:
+            solar_admittance = {'East':0.13, 'North':0.13,'South':0.13, 'West':0.13}
+        elif aus_climate_zone[climate_zone] ==1:
+            solar_admittance = {'East':0.12, 'North':0.12,'South':0.12, 'West':0.12}
+        elif aus_climate_zone[climate_zone] ==3:
+            solar_admittance = {'East':0.16, 'North':0.16,'South':0.16, 'West':0.16}
+        elif aus_climate_zone[climate_zone] ==8:
+            solar_admittance = {'East':0.20, 'North':0.20,'South':0.42, 'West':0.36}
+    elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+        if aus_climate_zone[climate_zone] ==1:
+            solar_admittance = {'East':0.07, 'North':0.07,'South':0.10, 'West':0.07}
+        elif aus_climate_zone[climate_zone] == 3 or aus_climate_zone[climate_zone] == 4 or aus_climate_zone[climate_zone] ==6:
+            solar_admittance = {'East':0.07, 'North':0.07,'South':0.07, 'West':0.07}
+        elif aus_climate_zone[climate_zone] == 2 or aus_climate_zone[climate_zone] == 5 :
+            solar_admittance = {'East':0.10, 'North':0.10,'South':0.10, 'West':0.10}
+        elif aus_climate_zone[climate_zone] == 7:
+            solar_admittance = {'East':0.07, 'North':0.07,'South':0.08, 'West':0.07}
+        elif aus_climate_zone[climate_zone] == 8:
+            solar_admittance = {'East':0.08, 'North':0.08,'South':0.08, 'West':0.08}
+    if bldg_classes_ncc19[building_class] == 2 or bldg_classes_ncc19[building_class] == 5 or bldg_classes_ncc19[building_class] == 6 or bldg_classes_ncc19[building_class] == 7 or bldg_classes_ncc19[building_class] == 8 or bldg_classes_ncc19[building_class] == '9b' or bldg_classes_ncc19[building_class] == '9a':
+        if aus_climate_zone[climate_zone] == 1:
+            solar_admittance_weight_coe = {'East':1.39, 'North':1.47,'South':1, 'West':1.41}
+        elif aus_climate_zone[climate_zone] == 2:
+            solar_admittance_weight_coe = {'East':1.58, 'North':1.95,'South':1, 'West':1.68}
+        elif aus_climate_zone[climate_zone] == 3:
+            solar_admittance_weight_coe = {'East':1.63, 'North':1.95,'South':1, 'West':1.65}
+        elif aus_climate_zone[climate_zone] == 4:
+            solar_admittance_weight_coe = {'East':1.72, 'North':2.05,'South':1, 'West':1.69}
+        elif aus_climate_zone[climate_zone] == 5:
+            solar_admittance_weight_coe = {'East':1.72, 'North':2.28,'South':1, 'West':1.75}
+        elif aus_climate_zone[climate_zone] == 6:
+            solar_admittance_weight_coe = {'East':1.62, 'North':2.12,'South':1, 'West':1.67}
+        elif aus_climate_zone[climate_zone] == 7:
+            solar_admittance_weight_coe = {'East':1.84, 'North':2.4,'South':1, 'West':1.92}
+        elif aus_climate_zone[climate_zone] == 8:
+            solar_admittance_weight_coe = {'East':1.92, 'North':1.88,'South':1, 'West':1.25}
+    elif bldg_classes_ncc19[building_class] == 3 or bldg_classes_ncc19[building_class] == '9c' or bldg_classes_ncc19[building_class] == '9a ward':
+        if aus_climate_zone[climate_zone] == 1:
+            solar_admittance_weight_coe = {'East':1.3, 'North':1.47,'South':1, 'West':1.37}
+        elif aus_climate_zone[climate_zone] == 2:
+            solar_admittance_weight_coe = {'East':1.49, 'North':1.77,'South':1, 'West':1.54}
+        elif aus_climate_zone[climate_zone] == 3:
+            solar_admittance_weight_coe = {'East':1.48, 'North':1.72,'South':1, 'West':1.5}
+        elif aus_climate_zone[climate_zone] == 4:
+            solar_admittance_weight_coe = {'East':1.37, 'North':1.55,'South':1, 'West':1.36}
+        elif aus_climate_zone[climate_zone] == 5:
+            solar_admittance_weight_coe = {'East':1.48, 'North':1.88,'South':1, 'West':1.52}
+        elif aus_climate_zone[climate_zone] == 6:
+            solar_admittance_weight_coe = {'East':1.28, 'North':1.52,'South':1, 'West':1.33}
+        elif aus_climate_zone[climate_zone] == 7:
+            solar_admittance_weight_coe = {'East':1.35, 'North':1.6,'South':1, 'West':1.4}
+        elif aus_climate_zone[climate_zone] == 8:
+            solar_admittance_weight_coe = {'East':1.26, 'North':1.24,'South':1, 'West':1.05}
+
+
+    if model_faces_vertical['WWR (%)'].iloc[0] == 0:
+        East = 0
+    else:
+        East = [round(solar_admittance['East']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[0]/100)),2)]
+
+    if model_faces_vertical['WWR (%)'].iloc[1] == 0:
+        North = 0
+    else:
+        North = [round(solar_admittance['North']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[1]/100)),2)]
+
+    if model_faces_vertical['WWR (%)'].iloc[2] == 0:
+        South = 0
+    else:
+        South = [round(solar_admittance['South']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[2]/100)),2)]
+
+    if model_faces_vertical['WWR (%)'].iloc[3] == 0:
+        West = 0
+    else:
+        West = [round(solar_admittance['West']/(shading_multi*(model_faces_vertical['WWR (%)'].iloc[3]/100)),2)]
+
+
+    dts_shgc_single = {'East':East,
+                'North':North,
+                'South':South,
+                'West':West}
+
+
+    dts_shgc_single = DataFrame.from_dict(dts_shgc_single).transpose()
+    dts_shgc_single.rename(columns = {0:'SHGC'},inplace= True)
+
+
+    #SA COE based on WWR%
+    if model_faces_vertical['WWR (%)'].iloc[0] < 20: #East
+        solar_admittance_weight_coe_east = 0
+    elif model_faces_vertical['WWR (%)'].iloc[0] >= 20:
+        solar_admittance_weight_coe_east = solar_admittance_weight_coe['East']
+    if model_faces_vertical['WWR (%)'].iloc[1] < 20: #North
+        solar_admittance_weight_coe_north = 0
+    elif model_faces_vertical['WWR (%)'].iloc[1] >= 20:
+        solar_admittance_weight_coe_north = solar_admittance_weight_coe['North']
+    if model_faces_vertical['WWR (%)'].iloc[2] < 20: #South
+        solar_admittance_weight_coe_south = 0
+    elif model_faces_vertical['WWR (%)'].iloc[2] >= 20:
+        solar_admittance_weight_coe_south = solar_admittance_weight_coe['South']
+    if model_faces_vertical['WWR (%)'].iloc[3] < 20: #West
+        solar_admittance_weight_coe_west = 0
+    elif model_faces_vertical['WWR (%)'].iloc[3] >= 20:
+        solar_admittance_weight_coe_west = solar_admittance_weight_coe['West']
+
+
+    #Total Values
+    reference_ac_energy = model_faces_vertical['Face Area (m2)'].iloc[0]*solar_admittance_weight_coe_east*solar_admittance['East'] + model_faces_vertical['Face Area (m2)'].iloc[1]*solar_admittance_weight_coe_north*solar_admittance['North'] + model_faces_vertical['Face Area (m2)'].iloc[2]*solar_admittance_weight_coe_south*solar_admittance['South'] + model_faces_vertical['Face Area (m2)'].iloc[3]*solar_admittance_weight_coe_west*solar_admittance['West']
+    if reference_ac_energy == 0:
+        dts_shgc_total = 0
+    else:
+        dts_shgc_total = reference_ac_energy/((solar_admittance_weight_coe_east*dts_glazing_U['Vision Area'].iloc[0]*shading_multi)+(solar_admittance_weight_coe_north*dts_glazing_U['Vision Area'].iloc[1]*shading_multi)+(solar_admittance_weight_coe_south*dts_glazing_U['Vision Area'].iloc[2]*shading_multi)+(solar_admittance_weight_coe_west*dts_glazing_U['Vision Area'].iloc[3]*shading_multi))
+
+    wall_glazing_value_total = sum(sum_UA) / model_faces_vertical['Face Area (m2)'].sum()
+    proposed_ac_energy = model_faces_vertical['Face Area (m2)'].iloc[0]*solar_admittance_weight_coe_east*solar_admittance_single[0]+model_faces_vertical['Face Area (m2)'].iloc[1]*solar_admittance_weight_coe_north*solar_admittance_single[1]+model_faces_vertical['Face Area (m2)'].iloc[2]*solar_admittance_weight_coe_south*solar_admittance_single[2]+model_faces_vertical['Face Area (m2)'].iloc[3]*solar_admittance_weight_coe_west*solar_admittance_single[3]
+
+    glazing_u_display = []
+    if dts_glazing_U['U-Value Glazing'].iloc[0] == 0:
+        glazing_u_display.append(None)
+    else:
+        if dts_glazing_U['U-Value Glazing'].iloc[0] > 5.8:
+            glazing_u_display.append(5.8)
+        elif Reference_Building_glazing_U_value < 1.5:
+            glazing_u_display.append(1.5)
+        else:
+            glazing_u_display.append(round(dts_glazing_U['U-Value Glazing'].iloc[0],2))
+    if dts_glazing_U['U-Value Glazing'].iloc[1] == 0:
+        glazing_u_display.append(None)
+    else:
+        if dts_glazing_U['U-Value Glazing'].iloc[1] > 5.8:
+            glazing_u_display.append(5.8)
+        elif Reference_Building_glazing_U_value < 1.5:
+            glazing_u_display.append(1.5)
+        else:
+            glazing_u_display.append(round(dts_glazing_U['U-Value Glazing'].iloc[1],2))
+    if dts_glazing_U['U-Value Glazing'].iloc[2] == 0:
+        glazing_u_display.append(None)
+    else:
+        if dts_glazing_U['U-Value Glazing'].iloc[2] >= 5.8:
+            glazing_u_display.append(5.8)
+        elif Reference_Building_glazing_U_value <= 1.5:
+            glazing_u_display.append(1.5)
+        else:
+            glazing_u_display.append(round(dts_glazing_U['U-Value Glazing'].iloc[2],2))
+    if dts_glazing_U['U-Value Glazing'].iloc[3] == 0:
+        glazing_u_display.append(None)
+    else:
+        if dts_glazing_U['U-Value Glazing'].iloc[3] > 5.8:
+            glazing_u_display.append(5.8)
+        elif Reference_Building_glazing_U_value < 1.5:
+            glazing_u_display.append(1.5)
+        else:
+            glazing_u_display.append(round(dts_glazing_U['U-Value Glazing'].iloc[3],2))
+
+    shgc_display = []
+    if dts_shgc_single['SHGC'].iloc[0] > 0.81:
+        shgc_display.append(0.81)
+    elif dts_shgc_single['SHGC'].iloc[0] == 0:
+        shgc_display.append(0.0)
+    elif dts_shgc_single['SHGC'].iloc[0] < 0.16:
+        shgc_display.append(0.16)
+    else:
+        shgc_display.append(dts_shgc_single.iloc[0])
+    if dts_shgc_single['SHGC'].iloc[1] > 0.81:
+        shgc_display.append(0.81)
+    elif dts_shgc_single['SHGC'].iloc[1] == 0:
+        shgc_display.append(0.0)
+    elif dts_shgc_single['SHGC'].iloc[1] < 0.16:
+        shgc_display.append(0.16)
+    else:
+        shgc_display.append(dts_shgc_single.iloc[1])
+    if dts_shgc_single['SHGC'].iloc[2] > 0.81:
+        shgc_display.append(0.81)
+    elif dts_shgc_single['SHGC'].iloc[2] == 0:
+        shgc_display.append(0.0)
+    elif dts_shgc_single['SHGC'].iloc[2] < 0.16:
+        shgc_display.append(0.16)
+    else:
+        shgc_display.append(dts_shgc_single.iloc[2])
+    if dts_shgc_single['SHGC'].iloc[3] > 0.81:
+        shgc_display.append(0.81)
+    elif dts_shgc_single['SHGC'].iloc[3] == 0:
+        shgc_display.append(0.0)
+    elif dts_shgc_single['SHGC'].iloc[3] < 0.16:
+        shgc_display.append(0.16)
+    else:
+        shgc_display.append(dts_shgc_single.iloc[3])
+
+    def CheckForLess_WallGlazing(list, val):
+
+            # traverse in the list
+            for x in list:
+
+                # compare with all the
+                # values with value
+                if val <= x:
+                    return False
+            return True
+
+    def CheckForLess_SA(list1, list2):
+
+            # traverse in the list
+            for x in list1:
+                for y in list2:
+
+                    # compare with all the
+                    # values with value
+                    if y <= x:
+                        return False
+            return True
+
+    if (CheckForLess_WallGlazing(wall_glazing_u_value, target_wall_glazing_U)):
+        method1_wall_glazing = 'Compliant Solution'
+    else:
+        method1_wall_glazing = 'Non-Compliant Solution'
+
+
+    if CheckForLess_SA(solar_admittance_single,list(solar_admittance.values())):
+        method1_sa = 'Compliant Solution'
+    else:
+        method1_sa = 'Non-Compliant Solution'
+
+    if Reference_Building_glazing_U_value > 5.8 or Reference_Building_glazing_U_value == 0:
+        Reference_Building_glazing_U_value = 5.8
+    elif Reference_Building_glazing_U_value < 1.5:
+        Reference_Building_glazing_U_value = 1.5
+    else:
+        Reference_Building_glazing_U_value = Reference_Building_glazing_U_value
+    if dts_shgc_total > 0.81 or dts_shgc_total == 0:
+        dts_shgc_total = 0.81
+    elif dts_shgc_total == np.inf:
+        dts_shgc_total = 0
+    elif dts_shgc_total < 0.16 and  dts_shgc_total > 0:
+        dts_shgc_total = 0.16
+    else:
+        dts_shgc_total = round(dts_shgc_total,2)
+
+    if wall_glazing_value_total <= target_wall_glazing_U:
+        method2_wall_glazing = 'Compliant Solution'
+    else:
+        method2_wall_glazing = 'Non-Compliant Solution'
+
+    if proposed_ac_energy <= reference_ac_energy:
+        method2_ac_energy = 'Compliant Solution'
+    else:
+        method2_ac_energy  = 'Non-Compliant Solution'
+
+    #Generating the report
+    if method1_wall_glazing == 'Compliant Solution' and method1_sa == 'Compliant Solution':
+        method1_compliance = 'Compliant Solution'
+    else:
+        method1_compliance = 'Non-Compliant Solution'
+
+    if method2_wall_glazing == 'Compliant Solution' and method2_ac_energy == 'Compliant Solution':
+        method2_compliance = 'Compliant Solution'
+    else:
+        method2_compliance = 'Non-Compliant Solution'
+
+    return {
+        'R_target': R_target,
+        'Wall_U_Value': Wall_U_Value,
+        'target_wall_glazing_U': target_wall_glazing_U,
+        'u_value_glazing': u_value_glazing,
+        'wall_glazing_u_value': wall_glazing_u_value,
+        'solar_admittance_single': solar_admittance_single,
+        'sum_UA': sum_UA,
+        'solar_admittance': solar_admittance,
+        'solar_admittance_weight_coe': solar_admittance_weight_coe,
+        'solar_admittance_weight_coe_orientations': [solar_admittance_weight_coe_east, solar_admittance_weight_coe_north,
+                                                     solar_admittance_weight_coe_south, solar_admittance_weight_coe_west],
+        'dts_shgc_single': dts_shgc_single['SHGC'],
+        'glazing_u_display': glazing_u_display,
+        'shgc_display': shgc_display,
+        'Reference_Building_wall_U_value': Reference_Building_wall_U_value,
+        'Reference_Building_glazing_U_value': Reference_Building_glazing_U_value,
+        'dts_shgc_total': dts_shgc_total,
+        'wall_glazing_value_total': wall_glazing_value_total,
+        'reference_ac_energy': reference_ac_energy,
+        'proposed_ac_energy': proposed_ac_energy,
+        'method1_wall_glazing': method1_wall_glazing,
+        'method1_sa': method1_sa,
+        'method2_wall_glazing': method2_wall_glazing,
+        'method2_ac_energy': method2_ac_energy,
+        'method1_compliance': method1_compliance,
+        'method2_compliance': method2_compliance
+    }
@@ -0,0 +1,164 @@
+"""The face table and the envelope metrics against the loops of the original app.
+
+The models are small synthetic buildings of benchmarks/synthetic.py, rotated
+so their walls are a hair off the axes, as exported models are, and compared
+with envelope_baseline on the Model read back from their HBJSON, like the
+app did.
+"""
+import functools
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from honeybee.model import Model as HBModel
+from ladybug_geometry.geometry3d.pointvector import Point3D
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, ROOT.as_posix())
+sys.path.insert(0, ROOT.joinpath('benchmarks').as_posix())
+from adjacency import solve_adjacency
+from envelope import ORIENTATIONS, envelope_from_table, facade_sectors, orientation_sweep
+from envelope_baseline import baseline_envelope
+from face_table import azimuth, face_table, hbjson_face_table
+from model_cache import RoomRowsCache
+from synthetic import BuildingSpec, building
+
+#the inplace fillna of the original app warns under copy-on-write, it only fills orientations without facades
+pytestmark = pytest.mark.filterwarnings('ignore:A value is being set on a copy')
+
+SPEC = BuildingSpec(storeys=2, rooms_per_floor=4, underground=1, wwr=0.4, skylights=0.1, shade_depth=0.5)
+SPECS = (
+    SPEC,
+    BuildingSpec(storeys=1, rooms_per_floor=3, wwr=0.3),
+    BuildingSpec(storeys=3, rooms_per_floor=2, underground=2, wwr=0.6, skylights=0.2, shade_depth=1.0,
+                 room_width=4.3, room_depth=7.1, floor_height=3.1),
+)
+ROTATIONS = (0, 30, 90, 180, 270)
+#off the sector boundaries, where the original app binned walls by the float noise of horizontal_orientation
+NORTHS = (0, 10, 100, 250, 320.5)
+METHODS = ('Conditioned Zones', 'Entire Building')
+
+
+@functools.lru_cache(maxsize=None)
+def rotated_hbjson(spec: BuildingSpec, rotation: float, solved: bool) -> dict:
+    """HBJSON of a synthetic building rotated counter-clockwise, with adjacencies solved by the app's path."""
+    hb_model = HBModel.from_dict(building(spec))
+    hb_model.rotate_xy(rotation, Point3D(0, 0, 0))
+    hbjson = hb_model.to_dict()
+    if solved:
+        hbjson['rooms'], _ = solve_adjacency(hbjson)
+    return hbjson
+
+
+def tables(hbjson: dict) -> dict:
+    """Face tables of the HBJSON, of its Model and of a second build reusing the rows of the first."""
+    room_cache = RoomRowsCache()
+    hbjson_face_table(hbjson, room_cache)
+    return {
+        'hbjson': hbjson_face_table(hbjson),
+        'model': face_table(HBModel.from_dict(hbjson)),
+        'room_cache': hbjson_face_table(hbjson, room_cache)
+    }
+
+
+def baseline_orientations(baseline: dict) -> tuple:
+    """Facade and aperture areas of the original app ordered as ORIENTATIONS."""
+    face_area = baseline['model_faces_vertical']['Face Area (m2)'].reindex(ORIENTATIONS, fill_value=0)
+    aperture_area = baseline['model_apertures']['Aperture Area (m2)'].reindex(ORIENTATIONS)
+    return face_area.to_numpy(dtype=int), aperture_area.to_numpy(dtype=float)
+
+
+def assert_envelope_equal(envelope: dict, baseline: dict):
+    pd.testing.assert_frame_equal(envelope['model_data'], baseline['model_data'], check_dtype=False)
+    assert envelope['target_rooms_index'] == baseline['target_rooms_index']
+    #the original groupby leaves out the orientations without facades
+    faces_vertical = baseline['model_faces_vertical']
+    pd.testing.assert_frame_equal(envelope['model_faces_vertical'].loc[faces_vertical.index], faces_vertical,
+                                  check_dtype=False, check_names=False)
+    assert (envelope['model_faces_vertical'].drop(faces_vertical.index)['Face Area (m2)'] == 0).all()
+    for name in ('model_apertures', 'model_roof', 'model_floor', 'model_shade'):
+        pd.testing.assert_frame_equal(envelope[name], baseline[name], check_dtype=False, check_names=False)
+
+
+def test_azimuth_of_walls_off_north_is_honeybee_azimuth():
+    hb_model = HBModel.from_dict(rotated_hbjson(SPEC, 90, False))
+    faces = [face for room in hb_model.rooms for face in room.faces]
+    normals = np.array([tuple(face.normal) for face in faces])
+    expected = np.array([face.azimuth for face in faces])
+    np.testing.assert_array_equal(azimuth(normals[:, 0], normals[:, 1]) > 0, expected > 0)
+    np.testing.assert_allclose(azimuth(normals[:, 0], normals[:, 1]), expected, rtol=0, atol=1e-9)
+    #the north walls of the rotated model have a normal x of float noise and honeybee puts them at 0
+    assert any(face.normal.x != 0 and face.azimuth == 0 for face in faces)
+
+
+@pytest.mark.parametrize('rotation', ROTATIONS)
+@pytest.mark.parametrize('internal_walls', [False, True])
+def test_rotated_model_with_solved_adjacency(rotation, internal_walls):
+    hbjson = rotated_hbjson(SPEC, rotation, True)
+    baseline = baseline_envelope(HBModel.from_dict(hbjson), 'Entire Building', internal_walls)
+    for table in (hbjson_face_table(hbjson), face_table(HBModel.from_dict(hbjson))):
+        assert_envelope_equal(envelope_from_table(table, 'Entire Building', internal_walls), baseline)
+
+
+MODELS = pytest.mark.parametrize('spec, rotation, solved', list(itertools.product(SPECS, ROTATIONS, [False, True])))
+
+
+@MODELS
+@pytest.mark.parametrize('north', NORTHS)
+def test_envelope_from_table(spec, rotation, solved, north):
+    hbjson = rotated_hbjson(spec, rotation, solved)
+    hb_model = HBModel.from_dict(hbjson)
+    for name, table in tables(hbjson).items():
+        for method, internal_walls in itertools.product(METHODS, [False, True]):
+            envelope = envelope_from_table(table, method, internal_walls, north)
+            try:
+                assert_envelope_equal(envelope, baseline_envelope(hb_model, method, internal_walls, north))
+            except AssertionError as e:
+                raise AssertionError(f'{name} table, {method}, internal walls {internal_walls}: {e}') from e
+
+
+@MODELS
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('internal_walls', [False, True])
+def test_orientation_sweep(spec, rotation, solved, method, internal_walls):
+    hbjson = rotated_hbjson(spec, rotation, solved)
+    hb_model = HBModel.from_dict(hbjson)
+    face_area, aperture_area = orientation_sweep(hbjson_face_table(hbjson), NORTHS, method, internal_walls)
+    assert face_area.shape == aperture_area.shape == (len(NORTHS), len(ORIENTATIONS))
+    for row, north in enumerate(NORTHS):
+        expected_face_area, expected_aperture_area = baseline_orientations(
+            baseline_envelope(hb_model, method, internal_walls, north))
+        np.testing.assert_array_equal(face_area[row], expected_face_area, err_msg=f'north {north}')
+        np.testing.assert_array_equal(aperture_area[row], expected_aperture_area, err_msg=f'north {north}')
+
+
+@MODELS
+@pytest.mark.parametrize('north', NORTHS)
+def test_facade_sectors(spec, rotation, solved, north):
+    hbjson = rotated_hbjson(spec, rotation, solved)
+    table = hbjson_face_table(hbjson)
+    baseline = baseline_envelope(HBModel.from_dict(hbjson), 'Entire Building', False, north)
+    sectors = facade_sectors(table, 'Entire Building', False, north, sectors=4)
+    assert list(sectors.index) == ['North', 'East', 'South', 'West']
+    sectors = sectors.loc[list(ORIENTATIONS)]
+    expected_face_area, expected_aperture_area = baseline_orientations(baseline)
+    np.testing.assert_array_equal(sectors['Face Area (m2)'].to_numpy(), expected_face_area)
+    np.testing.assert_array_equal(sectors['Aperture Area (m2)'].to_numpy(), expected_aperture_area)
+    #the same areas as the orientation table of the app, with 0 WWR on the orientations without facades
+    orientations = envelope_from_table(table, 'Entire Building', False, north)['model_faces_vertical']
+    pd.testing.assert_frame_equal(sectors[orientations.columns], orientations, check_dtype=False, check_names=False)
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+@pytest.mark.parametrize('north', [45, 135, 225, 315])
+def test_walls_on_sector_boundaries(rotation, north):
+    #walls exactly on a boundary go to the sector on its counter-clockwise side, as azimuth <= 45 is North
+    hbjson = rotated_hbjson(SPEC, rotation, True)
+    baseline = baseline_envelope(HBModel.from_dict(hbjson), 'Entire Building', False, north - 45)
+    expected_face_area, expected_aperture_area = baseline_orientations(baseline)
+    face_area, aperture_area = orientation_sweep(hbjson_face_table(hbjson), [north], 'Entire Building')
+    np.testing.assert_array_equal(face_area[0], expected_face_area)
+    np.testing.assert_array_equal(aperture_area[0], expected_aperture_area)
@@ -0,0 +1,153 @@
+"""The NCC19 rules table and engine against the calculator of the original app.
+
+Every building class and climate zone of the sidebar is checked on facades
+whose four orientations sit on both sides of the 20% WWR band edges, for a
+few wall and glass specifications. These facades have walls on every
+orientation and apertures on at least one, the original app could not
+evaluate the others.
+"""
+import itertools
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+import ncc19
+from ncc19_baseline import aus_climate_zone, baseline_ncc19, bldg_classes_ncc19
+
+#one sidebar option per building class code and climate zone
+CLASS_OPTIONS = {code: option for option, code in reversed(list(bldg_classes_ncc19.items()))}
+ZONE_OPTIONS = {zone: option for option, zone in aus_climate_zone.items()}
+#band edges of the R-value target (above 20%) and of the solar admittance weights (20% or more)
+WWR_EDGES = (0, 0.01, 19.99, 20, 20.01, 50, 100)
+#facade and aperture areas ordered as ORIENTATIONS
+FACADES = [((100, 100, 100, 100), tuple(WWR_EDGES[(i + o) % len(WWR_EDGES)] for o in range(4))) for i in range(len(WWR_EDGES))] + [
+    ((37, 120, 64, 9), (7.4, 35.5, 0, 1.8)),
+    ((1250, 830, 1249, 410), (250, 166.2, 620.4, 0.4)),
+]
+#external wall R-value, glass U-value and glass SHGC
+SPECIFICATIONS = [(0.5, 5.8, 0.2), (2.8, 1.5, 0.5), (4.0, 3.0, 0.81)]
+
+CLASSES_AND_ZONES = pytest.mark.parametrize('building_class, climate_zone', list(itertools.product(CLASS_OPTIONS, ZONE_OPTIONS)))
+
+
+def baseline(face_area, aperture_area, building_class, climate_zone: int, ex_wall_r: float, glass_u: float, glass_shgc: float) -> dict:
+    """The original calculator on the facade DataFrames the original envelope extraction made of the areas."""
+    model_apertures = pd.DataFrame({'Aperture Area (m2)': np.asarray(aperture_area, dtype=float)}, index=list(ncc19.ORIENTATIONS))
+    model_faces_vertical = pd.DataFrame({'Face Area (m2)': np.asarray(face_area, dtype=int)}, index=list(ncc19.ORIENTATIONS))
+    model_faces_vertical['ExWall Area (m2)'] = round((model_faces_vertical['Face Area (m2)'] - model_apertures['Aperture Area (m2)']).astype(float),2)
+    model_faces_vertical['WWR (%)'] = round(((model_apertures['Aperture Area (m2)'] / model_faces_vertical['Face Area (m2)'])*100).astype(float),2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return baseline_ncc19(model_faces_vertical, model_apertures, CLASS_OPTIONS[building_class], ZONE_OPTIONS[climate_zone],
+                              ex_wall_r, glass_u, glass_shgc)
+
+
+def scalar(value) -> float:
+    """A value the original app kept in a list or a one-row Series."""
+    return float(np.asarray(value).reshape(-1)[0])
+
+
+def test_options_of_the_app():
+    assert ncc19.BUILDING_CLASSES == bldg_classes_ncc19
+    assert ncc19.CLIMATE_ZONES == aus_climate_zone
+    assert set(CLASS_OPTIONS) <= set(ncc19.NON_RESIDENTIAL_CLASSES + ncc19.RESIDENTIAL_CLASSES)
+
+
+@CLASSES_AND_ZONES
+@pytest.mark.parametrize('face_area, aperture_area', FACADES)
+def test_rules(building_class, climate_zone, face_area, aperture_area):
+    expected = baseline(face_area, aperture_area, building_class, climate_zone, *SPECIFICATIONS[0])
+    wwr = np.round(np.array(aperture_area) / np.array(face_area) * 100, 2)
+
+    assert [ncc19.r_target(building_class, climate_zone, w) for w in wwr] == expected['R_target']
+    assert ncc19.target_wall_glazing_u(building_class, climate_zone) == expected['target_wall_glazing_U']
+    assert ncc19.solar_admittance_targets(building_class, climate_zone) == expected['solar_admittance']
+    assert ncc19.solar_admittance_weights(building_class, climate_zone) == expected['solar_admittance_weight_coe']
+    coe = [ncc19.rule(building_class, climate_zone, w).solar_admittance_coe[o] for o, w in enumerate(wwr)]
+    assert coe == expected['solar_admittance_weight_coe_orientations']
+
+
+@pytest.mark.parametrize('building_class, climate_zone', [(4, 5), ('9d', 1), (5, 0), (3, 9), (5, None)])
+def test_unknown_class_or_zone(building_class, climate_zone):
+    with pytest.raises(ValueError):
+        ncc19.target_wall_glazing_u(building_class, climate_zone)
+    with pytest.raises(ValueError):
+        ncc19.r_target(building_class, climate_zone, 10)
+
+
+@CLASSES_AND_ZONES
+def test_evaluate(building_class, climate_zone):
+    for (face_area, aperture_area), specification in itertools.product(FACADES, SPECIFICATIONS):
+        result = ncc19.evaluate(face_area, aperture_area, building_class, climate_zone, *specification)
+        expected = baseline(face_area, aperture_area, building_class, climate_zone, *specification)
+        case = f'facade {face_area} {aperture_area}, specification {specification}'
+
+        per_orientation = {
+            'wall_u': expected['Wall_U_Value'],
+            'glazing_u': expected['u_value_glazing'],
+            'glazing_u_display': expected['glazing_u_display'],
+            'shgc': [scalar(s) for s in expected['dts_shgc_single']],
+            'shgc_display': [scalar(s) for s in expected['shgc_display']],
+            'wall_glazing_u': expected['wall_glazing_u_value'],
+            'solar_admittance': expected['solar_admittance_single'],
+            'solar_admittance_targets': list(expected['solar_admittance'].values()),
+        }
+        for name, value in per_orientation.items():
+            assert list(getattr(result, name)) == value, f'{name}, {case}'
+
+        totals = {
+            'target_wall_glazing_u': expected['target_wall_glazing_U'],
+            'reference_wall_u': expected['Reference_Building_wall_U_value'],
+            'reference_glazing_u': expected['Reference_Building_glazing_U_value'],
+            'reference_shgc': expected['dts_shgc_total'],
+            'wall_glazing_u_total': expected['wall_glazing_value_total'],
+            'reference_ac_energy': expected['reference_ac_energy'],
+            'proposed_ac_energy': expected['proposed_ac_energy'],
+        }
+        for name, value in totals.items():
+            assert getattr(result, name) == value, f'{name}, {case}'
+
+        for name in ('method1_wall_glazing', 'method1_sa', 'method2_wall_glazing', 'method2_ac_energy',
+                     'method1_compliance', 'method2_compliance'):
+            assert ncc19.compliance_text(getattr(result, name)) == expected[name], f'{name}, {case}'
+
+
+@CLASSES_AND_ZONES
+def test_evaluate_arrays(building_class, climate_zone):
+    # all the facades and specifications at once, and a facade without apertures or walls
+    rows = list(itertools.product(FACADES, SPECIFICATIONS))
+    face_area = np.array([facade[0] for facade, _ in rows], dtype=float)
+    aperture_area = np.array([facade[1] for facade, _ in rows], dtype=float)
+    face_area[-1, 0] = aperture_area[-1, 0] = 0.0
+    ex_wall_r, glass_u, glass_shgc = np.array([specification for _, specification in rows]).T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = ncc19.evaluate_arrays(face_area, aperture_area, building_class, climate_zone, ex_wall_r, glass_u, glass_shgc)
+        expected = [ncc19.evaluate(face_area[i], aperture_area[i], building_class, climate_zone, *specification)
+                    for i, (_, specification) in enumerate(rows)]
+
+    for name in ('wwr', 'ex_wall_area', 'wall_u', 'glazing_u', 'shgc', 'wall_glazing_u', 'solar_admittance',
+                 'reference_wall_u', 'wall_glazing_u_total', 'reference_ac_energy', 'proposed_ac_energy',
+                 'method1_compliance', 'method2_compliance'):
+        np.testing.assert_array_equal(result[name], [getattr(e, name) for e in expected], err_msg=name)
+    np.testing.assert_array_equal(ncc19.clamp_glazing_u(result['reference_glazing_u']), [e.reference_glazing_u for e in expected])
+    np.testing.assert_array_equal(ncc19.clamp_shgc(result['reference_shgc']), [e.reference_shgc for e in expected])
+
+
+@pytest.mark.parametrize('orientation', ncc19.ORIENTATIONS)
+@pytest.mark.parametrize('glazing_u, reference_glazing_u', [(0, 3), (5.8, 3), (6.1, 1.2), (3.456, 3), (3.456, 1.5), (3.456, 1.2)])
+def test_glazing_u_display(orientation, glazing_u, reference_glazing_u):
+    # the South metric clamped at the limits themselves, the other orientations only beyond them
+    inclusive = orientation == 'South'
+    if glazing_u == 0:
+        expected = None
+    elif glazing_u > 5.8 or (inclusive and glazing_u == 5.8):
+        expected = 5.8
+    elif reference_glazing_u < 1.5 or (inclusive and reference_glazing_u == 1.5):
+        expected = 1.5
+    else:
+        expected = round(glazing_u, 2)
+    assert ncc19._glazing_u_display(glazing_u, reference_glazing_u, orientation) == expected
@@ -0,0 +1,38 @@
+"""The batch command line around the evaluation of the models."""
+import builtins
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+import spacextract
+
+
+def test_timings_file_is_closed_when_the_batch_fails(tmp_path, monkeypatch):
+    tmp_path.joinpath('model.hbjson').write_text('{}')
+    opened = []
+
+    def tracked_open(*args, **kwargs):
+        opened.append(builtins.open(*args, **kwargs))
+        return opened[-1]
+
+    def failing_evaluate_many(*args, **kwargs):
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr(spacextract, 'open', tracked_open, raising=False)
+    monkeypatch.setattr(spacextract, 'evaluate_many', failing_evaluate_many)
+    with pytest.raises(KeyboardInterrupt):
+        spacextract.main([tmp_path.as_posix(), '-o', tmp_path.joinpath('out').as_posix(),
+                          '--timings', tmp_path.joinpath('timings.jsonl').as_posix()])
+    assert len(opened) == 1 and opened[0].closed
+
+
+def test_find_models_in_sub_folders(tmp_path):
+    for name in ('b/model.hbjson', 'a/model.hbjson', 'a/deeper/other.hbjson', 'top.hbjson', 'a/notes.json'):
+        tmp_path.joinpath(name).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.joinpath(name).write_text('{}')
+
+    paths = spacextract.find_models([tmp_path.as_posix(), tmp_path.joinpath('top.hbjson').as_posix()])
+    assert spacextract.model_names(paths) == ['a/deeper/other', 'a/model', 'b/model', 'top']
@@ -0,0 +1,46 @@
+"""The shared worker pool when one of its worker processes dies."""
+import os
+import signal
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, Path(__file__).resolve().parents[1].as_posix())
+from workers import WorkerPool
+
+
+def kill_worker():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=1, max_per_user=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_killed_worker_fails_its_job_only(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.run('user', kill_worker)
+    assert pool.run('user', pow, 2, 10) == 1024
+    assert pool.run('other', pow, 3, 2) == 9
+    assert pool.stats['jobs'] == 0
+
+
+def test_jobs_queued_behind_a_killed_worker_run_in_a_fresh_pool(pool):
+    killed = pool.submit('user', kill_worker)
+    queued = [pool.submit('user', pow, 2, n) for n in range(3)]
+    with pytest.raises(BrokenProcessPool):
+        killed.result(timeout=60)
+    assert [future.result(timeout=60) for future in queued] == [1, 2, 4]
+
+
+def test_submit_to_a_pool_broken_since_the_last_job(pool):
+    broken = pool._executor
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(kill_worker).result(timeout=60)
+    assert pool.run('user', pow, 2, 3) == 8
+    assert pool._executor is not broken
@@ -0,0 +1,189 @@
+"""Per-session scratch folders and the shared worker pool of the Streamlit server.
+
+One server serves every user of the office. Each session writes its files to
+its own scratch folder, removed when the session ends, and heavy stages
+(adjacency intersection, VTK export) run in a pool of worker processes shared
+by all sessions. The pool has a fixed number of workers and every user can
+only have a few jobs in it at once, so one large upload queues behind its own
+jobs instead of taking the whole server.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+SCRATCH_ROOT = Path(os.environ.get('SPACEXTRACT_TEMP', Path(tempfile.gettempdir()).joinpath('spacextract')))
+WORKERS = int(os.environ.get('SPACEXTRACT_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+JOBS_PER_USER = int(os.environ.get('SPACEXTRACT_JOBS_PER_USER', 1))
+
+
+class SessionScratch:
+    """Scratch folder of one session.
+
+    The folder is removed when the object is garbage collected, which happens
+    when Streamlit drops the state of a closed session, or at the latest when
+    the server exits.
+
+    Args:
+        root: Folder holding the session folders.
+    """
+
+    def __init__(self, root: Path = SCRATCH_ROOT):
+        sessions = Path(root).joinpath('sessions')
+        sessions.mkdir(parents=True, exist_ok=True)
+        self.folder = Path(tempfile.mkdtemp(prefix='session_', dir=sessions))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self.folder, ignore_errors=True)
+
+    def joinpath(self, *parts) -> Path:
+        """Get a sub-folder of the scratch folder, creating it if needed."""
+        folder = self.folder.joinpath(*parts)
+        folder.mkdir(parents=True, exist_ok=True)
+        return folder
+
+    @property
+    def alive(self) -> bool:
+        return self._finalizer.alive
+
+    def cleanup(self):
+        """Remove the scratch folder now."""
+        self._finalizer()
+
+
+def remove_stale_sessions(root: Path = SCRATCH_ROOT, max_age: float = 24 * 3600):
+    """Remove session folders older than max_age seconds, e.g. left by a killed server."""
+    sessions = Path(root).joinpath('sessions')
+    if not sessions.is_dir():
+        return
+    now = time.time()
+    for folder in sessions.glob('session_*'):
+        try:
+            if now - folder.stat().st_mtime > max_age:
+                shutil.rmtree(folder, ignore_errors=True)
+        except FileNotFoundError:
+            continue
+
+
+class WorkerPool:
+    """Process pool shared by all sessions with a cap on the jobs of each user.
+
+    Jobs beyond the number of workers wait in the pool queue. Jobs of a user
+    that already has max_per_user jobs in the pool wait in a queue of that
+    user and are only handed to the pool when one of them finishes, so the
+    pool queue is shared fairly between users. Submitting never blocks.
+
+    A worker that dies, e.g. killed for its memory, breaks the whole process
+    pool. The jobs that were in it fail with BrokenProcessPool and the pool is
+    replaced by a fresh one for the next jobs.
+
+    Args:
+        max_workers: Number of worker processes.
+        max_per_user: Number of jobs a user can have in the pool at once.
+    """
+
+    def __init__(self, max_workers: int = WORKERS, max_per_user: int = JOBS_PER_USER):
+        self.max_workers = max_workers
+        self.max_per_user = max_per_user
+        self._executor = self._new_executor()
+        self._lock = threading.Lock()
+        self._active = {}
+        self._waiting = {}
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        #workers are spawned, forking the threads of the server is not safe
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _replace_broken(self, executor: ProcessPoolExecutor):
+        """Replace a broken executor, unless another job already did."""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._new_executor()
+        executor.shutdown(wait=False)
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = sum(self._active.values())
+            return {
+                'workers': self.max_workers,
+                'jobs': jobs,
+                'queued': max(0, jobs - self.max_workers) + sum(len(w) for w in self._waiting.values())
+            }
+
+    def submit(self, user: str, fn, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) for a user and return its Future.
+
+        fn and its arguments must be picklable, i.e. fn is a module-level function.
+        """
+        future = Future()
+        with self._lock:
+            if self._active.get(user, 0) >= self.max_per_user:
+                self._waiting.setdefault(user, deque()).append((future, fn, args, kwargs))
+                return future
+            self._active[user] = self._active.get(user, 0) + 1
+        self._start(user, future, fn, args, kwargs)
+        return future
+
+    def run(self, user: str, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in the pool and wait for its result."""
+        return self.submit(user, fn, *args, **kwargs).result()
+
+    def _start(self, user: str, future: Future, fn, args: tuple, kwargs: dict):
+        if not future.set_running_or_notify_cancel():
+            self._finished(user)
+            return
+        job = None
+        for _ in range(2):
+            executor = self._executor
+            try:
+                job = executor.submit(fn, *args, **kwargs)
+                break
+            except BrokenProcessPool as e:
+                #a worker died since the last job finished, the job is sent to a fresh pool once
+                self._replace_broken(executor)
+                error = e
+            except BaseException as e:
+                error = e
+                break
+        if job is None:
+            future.set_exception(error)
+            self._finished(user)
+            return
+        job.add_done_callback(lambda done: self._done(user, future, executor, done))
+
+    def _done(self, user: str, future: Future, executor: ProcessPoolExecutor, job: Future):
+        if job.cancelled():
+            # the wrapper is already running and can no longer be cancelled itself
+            future.set_exception(CancelledError())
+        elif job.exception() is not None:
+            if isinstance(job.exception(), BrokenProcessPool):
+                self._replace_broken(executor)
+            future.set_exception(job.exception())
+        else:
+            future.set_result(job.result())
+        self._finished(user)
+
+    def _finished(self, user: str):
+        """Free the slot of a finished job and start the next job of the user."""
+        with self._lock:
+            waiting = self._waiting.get(user)
+            if waiting:
+                next_job = waiting.popleft()
+            else:
+                next_job = None
+                self._active[user] -= 1
+                if not self._active[user]:
+                    del self._active[user]
+                self._waiting.pop(user, None)
+        if next_job is not None:
+            self._start(user, *next_job)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)